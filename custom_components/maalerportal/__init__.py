@@ -1,7 +1,11 @@
 """The Målerportal integration."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
 import logging
+import time
 from typing import Any
 
 import aiohttp
@@ -19,9 +23,25 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.storage import Store
 import homeassistant.helpers.config_validation as cv
 
-from datetime import timedelta
-from .const import DOMAIN, DEFAULT_POLLING_INTERVAL, CONF_CURRENCY, DEFAULT_CURRENCY
-from .coordinator import MaalerportalCoordinator
+from datetime import datetime, timedelta, timezone
+from .api import ApiError, MaalerportalApiClient
+from .const import (
+    DOMAIN,
+    DEFAULT_POLLING_INTERVAL,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_CURRENCY,
+    DEFAULT_CURRENCY,
+    CONF_HISTORY_PARALLELISM,
+    DEFAULT_HISTORY_PARALLELISM,
+    CONF_READINGS_LOG_BACKEND,
+    DEFAULT_READINGS_LOG_BACKEND,
+)
+from .coordinator import CoordinatorSnapshotStore, MaalerportalCoordinator
+from .history_cache import HistoryDayCache
+from .history_service import HistoricalReadingsService
+from .import_cursor import ImportCursor
+from .ratelimit import AimdRateLimiter
 from .readings_log import ReadingsLog
 from .reconcile import (
     TRACKED_INSTALLATION_FIELDS,
@@ -29,6 +49,7 @@ from .reconcile import (
     is_safe_installation_id,
     reconcile_installations,
 )
+from .scheduler import DEFAULT_RESERVED, RequestScheduler
 from .stale_monitor import (
     StaleDataStore,
     async_check_stale_data,
@@ -40,8 +61,22 @@ from .stale_monitor import (
 _OFFSET_STORE_VERSION = 1
 _OFFSET_STORE_KEY_FMT = f"{DOMAIN}.meter_offsets.{{entry_id}}"
 
+# Last /addresses answer plus meter swaps not yet applied, so setup can
+# reconcile without waiting for the API.
+_ADDRESSES_STORE_VERSION = 1
+_ADDRESSES_STORE_KEY_FMT = f"{DOMAIN}.addresses.{{entry_id}}"
+_ADDRESSES_SAVE_DELAY = 10
+
+# Per-statistic import cursors for delta imports (see import_cursor.py).
+_CURSOR_STORE_VERSION = 1
+_CURSOR_STORE_KEY_FMT = f"{DOMAIN}.statistics_cursor.{{entry_id}}"
+_CURSOR_SAVE_DELAY = 30
+
 _LOGGER = logging.getLogger(__name__)
 
+# Installations initialized at the same time during entry setup.
+_SETUP_CONCURRENCY = 4
+
 # List the platforms that you want to support.
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR]
 
@@ -82,8 +117,102 @@ SERVICE_RESET_METER_OFFSET_SCHEMA = vol.Schema(
 )
 
 
+@contextmanager
+def _log_phase(entry: ConfigEntry, phase: str) -> Iterator[None]:
+    """Log how long one phase of the entry's setup took."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        _LOGGER.debug(
+            "Setup of %s: %s took %.2fs",
+            entry.title,
+            phase,
+            time.monotonic() - started,
+        )
+
+
+async def _async_start_stale_monitors(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    entry_store: dict[str, Any],
+    stale_store: StaleDataStore,
+) -> None:
+    """Evaluate stale data once per installation, then keep it current."""
+    with _log_phase(entry, "stale-data checks"):
+        for coordinator in list(entry_store["coordinators"].values()):
+            # Evaluate before subscribing so the listener doesn't
+            # double-fire on the first run.
+            await async_check_stale_data(hass, entry, coordinator, stale_store)
+            if hass.data.get(DOMAIN, {}).get(entry.entry_id) is not entry_store:
+                # Unloaded meanwhile.
+                return
+            entry_store["stale_monitor_unsubs"].append(
+                attach_stale_monitor(hass, entry, coordinator, stale_store)
+            )
+
+
+def _apply_reconciliation(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    fresh_installations: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], set[str], set[str]]:
+    """Reconcile the entry's installations against a fresh list.
+
+    Surfaces the changes, persists merged fields to the entry and the
+    device registry, and returns ``(installations, missing_ids,
+    serial_changed_ids)``.
+    """
+    saved = entry.data["installations"]
+    merged, missing_ids, serial_changes, changed = reconcile_installations(
+        saved, fresh_installations
+    )
+    _surface_reconciliation_changes(
+        hass, missing_ids, serial_changes, saved, fresh_installations
+    )
+    if changed:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, "installations": merged}
+        )
+        _update_device_registry(hass, entry, merged)
+    return merged, missing_ids, set(serial_changes)
+
+
+async def _async_revalidate_installations(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    client: MaalerportalApiClient,
+    cache: AddressesCache,
+    setup_missing_ids: set[str],
+) -> None:
+    """Refresh the cached ``/addresses`` answer and apply what changed."""
+    with _log_phase(entry, "installation revalidation"):
+        fresh_installations = await _fetch_fresh_installations(client)
+    if fresh_installations is None:
+        return
+    cache.async_set_installations(fresh_installations)
+    store = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if store is None:
+        return
+    installations, missing_ids, serial_changed_ids = _apply_reconciliation(
+        hass, entry, fresh_installations
+    )
+    store["installations"] = installations
+    if serial_changed_ids:
+        pending = set(store["pending_swap_installations"]) | serial_changed_ids
+        store["pending_swap_installations"] = pending
+        cache.async_set_pending_swaps(pending)
+    if missing_ids != setup_missing_ids:
+        # An installation disappeared or came back: set the coordinators
+        # up again for the new list. Pending swaps survive in the cache.
+        _LOGGER.info(
+            "Installations of %s changed upstream, reloading", entry.title
+        )
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+
+
 async def _fetch_fresh_installations(
-    session: aiohttp.ClientSession, base_url: str, api_key: str
+    client: MaalerportalApiClient,
 ) -> list[dict[str, Any]] | None:
     """Fetch the current installation list from the API.
 
@@ -92,18 +221,13 @@ async def _fetch_fresh_installations(
     None signals callers to fall back to cached data.
     """
     try:
-        async with session.get(
-            f"{base_url}/addresses",
-            headers={"ApiKey": api_key},
-            timeout=aiohttp.ClientTimeout(total=20),
-        ) as response:
-            if not response.ok:
-                _LOGGER.warning(
-                    "Could not refresh installations from API: HTTP %s", response.status
-                )
-                return None
-            addresses = await response.json()
-    except (aiohttp.ClientError, TimeoutError) as err:
+        addresses = await client.async_get("/addresses", timeout=20)
+    except ApiError as err:
+        _LOGGER.warning(
+            "Could not refresh installations from API: HTTP %s", err.status
+        )
+        return None
+    except (aiohttp.ClientError, TimeoutError, ValueError) as err:
         _LOGGER.warning("Could not refresh installations from API: %s", err)
         return None
 
@@ -289,6 +413,81 @@ def _update_device_registry(
             device_registry.async_update_device(device.id, **updates)
 
 
+class AddressesCache:
+    """Persisted copy of the account's installations from ``/addresses``.
+
+    Setup reconciles against the cached list and revalidates it in the
+    background. The installations whose meter was swapped but whose
+    offsets haven't been recomputed yet are kept alongside, so a reload
+    or restart before the statistic sensors ran doesn't lose them.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = Store(
+            hass,
+            _ADDRESSES_STORE_VERSION,
+            _ADDRESSES_STORE_KEY_FMT.format(entry_id=entry_id),
+        )
+        self._data: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        loaded = await self._store.async_load()
+        self._data = dict(loaded) if isinstance(loaded, dict) else {}
+
+    @property
+    def installations(self) -> list[dict[str, Any]] | None:
+        """The cached installation list, or None before the first fetch."""
+        installations = self._data.get("installations")
+        return installations if isinstance(installations, list) else None
+
+    @property
+    def pending_swaps(self) -> set[str]:
+        return set(self._data.get("pending_swaps") or ())
+
+    def async_set_installations(self, installations: list[dict[str, Any]]) -> None:
+        self._data["installations"] = installations
+        self._data["fetched_at"] = datetime.now(timezone.utc).isoformat()
+        self._store.async_delay_save(lambda: self._data, _ADDRESSES_SAVE_DELAY)
+
+    def async_set_pending_swaps(self, installation_ids: set[str]) -> None:
+        if self.pending_swaps == installation_ids:
+            return
+        self._data["pending_swaps"] = sorted(installation_ids)
+        self._store.async_delay_save(lambda: self._data, _ADDRESSES_SAVE_DELAY)
+
+
+class StatisticsCursorStore:
+    """Persisted :class:`~.import_cursor.ImportCursor` per statistic id.
+
+    Lets a statistic sensor's periodic update continue where the last one
+    stopped, across restarts, instead of re-importing a week of rows.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = Store(
+            hass,
+            _CURSOR_STORE_VERSION,
+            _CURSOR_STORE_KEY_FMT.format(entry_id=entry_id),
+        )
+        self._data: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        loaded = await self._store.async_load()
+        self._data = dict(loaded) if isinstance(loaded, dict) else {}
+
+    def get(self, statistic_id: str) -> ImportCursor | None:
+        return ImportCursor.from_dict(self._data.get(statistic_id))
+
+    def async_set(self, statistic_id: str, cursor: ImportCursor | None) -> None:
+        """Remember (or with None, forget) the cursor of a statistic."""
+        if cursor is None:
+            if self._data.pop(statistic_id, None) is None:
+                return
+        else:
+            self._data[statistic_id] = cursor.as_dict()
+        self._store.async_delay_save(lambda: self._data, _CURSOR_SAVE_DELAY)
+
+
 class MeterOffsetStore:
     """Persistent per-counter offset store backed by HA's Store helper.
 
@@ -378,6 +577,8 @@ def consume_swap_pending(
     pending = set(store.get("pending_swap_installations", set()))
     pending.discard(installation_id)
     store["pending_swap_installations"] = pending
+    if (cache := store.get("addresses_cache")) is not None:
+        cache.async_set_pending_swaps(pending)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -387,7 +588,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     base_url = entry.data["smarthome_base_url"]
     api_key = entry.data["api_key"]
-    session = async_get_clientsession(hass)
+    history_parallelism = int(
+        entry.options.get(CONF_HISTORY_PARALLELISM, DEFAULT_HISTORY_PARALLELISM)
+    )
+    # One API client per entry: every request for its installations shares
+    # its connection pool, retry handling and adaptive request rate. History
+    # downloads of all installations together get `history_parallelism`
+    # slots; the reserved one keeps live polls from queueing behind them.
+    api_client = MaalerportalApiClient(
+        async_get_clientsession(hass),
+        base_url,
+        api_key,
+        limiter=AimdRateLimiter(),
+        scheduler=RequestScheduler(history_parallelism + DEFAULT_RESERVED),
+    )
 
     # One-shot migration: hide statistic sensors that pre-date the
     # entity_registry_visible_default change (idempotent).
@@ -396,43 +610,45 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Reconcile saved installations against the API so that meter swaps,
     # nickname/address edits etc. are picked up automatically at startup.
-    fresh_installations = await _fetch_fresh_installations(session, base_url, api_key)
-    pending_swap_ids: set[str] = set()
+    # After the first start this uses the cached /addresses answer and
+    # revalidates it once setup is done.
+    addresses_cache = AddressesCache(hass, entry.entry_id)
+    await addresses_cache.async_load()
+    fresh_installations = addresses_cache.installations
+    revalidate = fresh_installations is not None
+    if fresh_installations is None:
+        with _log_phase(entry, "installation refresh"):
+            fresh_installations = await _fetch_fresh_installations(api_client)
+        if fresh_installations is not None:
+            addresses_cache.async_set_installations(fresh_installations)
+    pending_swap_ids = addresses_cache.pending_swaps
     if fresh_installations is not None:
-        (
-            merged_installations,
-            missing_ids,
-            serial_changes,
-            changed,
-        ) = reconcile_installations(entry.data["installations"], fresh_installations)
-        _surface_reconciliation_changes(
-            hass,
-            missing_ids,
-            serial_changes,
-            entry.data["installations"],
-            fresh_installations,
+        installations, missing_ids, serial_changed_ids = _apply_reconciliation(
+            hass, entry, fresh_installations
         )
-        pending_swap_ids = set(serial_changes.keys())
-        if changed:
-            hass.config_entries.async_update_entry(
-                entry,
-                data={**entry.data, "installations": merged_installations},
-            )
-            _update_device_registry(hass, entry, merged_installations)
-        installations = merged_installations
+        pending_swap_ids |= serial_changed_ids
     else:
         installations = entry.data["installations"]
         missing_ids = set()
+    addresses_cache.async_set_pending_swaps(pending_swap_ids)
 
     # Load persisted meter offsets used to keep the user-facing accumulated
     # total continuous across physical meter replacements.
     offset_store = MeterOffsetStore(hass, entry.entry_id)
-    await offset_store.async_load()
-
     # Stale-data monitor — observed-timestamp ring buffer per installation,
     # used to auto-tune the "no recent data" Repairs threshold.
     stale_store = StaleDataStore(hass, entry.entry_id)
-    await stale_store.async_load()
+    # Last good /readings/latest payload per installation, so entities can
+    # come up before the API has answered.
+    snapshot_store = CoordinatorSnapshotStore(hass, entry.entry_id)
+    # Where each statistic sensor's periodic delta import continues.
+    cursor_store = StatisticsCursorStore(hass, entry.entry_id)
+    await asyncio.gather(
+        offset_store.async_load(),
+        stale_store.async_load(),
+        snapshot_store.async_load(),
+        cursor_store.async_load(),
+    )
 
     # `pending_swap_installations` lists installations whose meter serial
     # just changed; their statistic sensors recompute the offset on next run.
@@ -444,15 +660,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "history_fetched_days": entry.options.get("history_fetched_days", 7),
         "coordinators": {},  # Will store coordinators by installation_id
         "offset_store": offset_store,
+        "cursor_store": cursor_store,
         "stale_store": stale_store,
         "stale_monitor_unsubs": [],
         "pending_swap_installations": pending_swap_ids,
+        "addresses_cache": addresses_cache,
+        # Options the entry was set up with; only a change reloads it.
+        "options": dict(entry.options),
         "readings_logs": {},  # populated below per installation
+        "history_services": {},  # shared /readings/historical fetchers
     }
 
     # Initialize coordinators for each installation
     polling_interval_minutes = entry.options.get("polling_interval", DEFAULT_POLLING_INTERVAL)
     polling_interval = timedelta(minutes=polling_interval_minutes)
+    # With adaptive polling each coordinator reads its installation's
+    # learned cadence from the stale monitor's store.
+    cadence_source = (
+        stale_store.get_cached_cadence
+        if entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+        else None
+    )
 
     # Currency: options override takes precedence over initial config data
     currency = entry.options.get(
@@ -460,6 +688,66 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry.data.get(CONF_CURRENCY, DEFAULT_CURRENCY),
     )
 
+    readings_log_backend = entry.options.get(
+        CONF_READINGS_LOG_BACKEND, DEFAULT_READINGS_LOG_BACKEND
+    )
+
+    entry_store = hass.data[DOMAIN][entry.entry_id]
+    # Installations load and do their first refresh concurrently, a few at
+    # a time; the API client's scheduler still caps the requests.
+    setup_slots = asyncio.Semaphore(_SETUP_CONCURRENCY)
+
+    async def _async_setup_installation(
+        installation: dict[str, Any],
+    ) -> MaalerportalCoordinator:
+        installation_id = installation["installationId"]
+        async with setup_slots:
+            with _log_phase(entry, f"installation {installation_id}"):
+                # Per-installation CSV log of every reading we observe.
+                readings_log = ReadingsLog(hass, installation_id, readings_log_backend)
+                await readings_log.async_load()
+                entry_store["readings_logs"][installation_id] = readings_log
+
+                # One historical-readings fetcher per installation, shared by
+                # its statistic sensors, the coordinator's null-value fallback
+                # and the stale monitor, so each chunk is downloaded only once.
+                # Finalized days are served from the on-disk day cache.
+                history_service = HistoricalReadingsService(
+                    hass,
+                    api_client,
+                    installation_id,
+                    readings_log=readings_log,
+                    parallelism=history_parallelism,
+                    day_cache=HistoryDayCache(hass, installation_id),
+                )
+                entry_store["history_services"][installation_id] = history_service
+
+                coordinator = MaalerportalCoordinator(
+                    hass,
+                    api_key,
+                    base_url,
+                    installation,
+                    polling_interval,
+                    currency,
+                    readings_log=readings_log,
+                    history_service=history_service,
+                    api_client=api_client,
+                    snapshot_store=snapshot_store,
+                    cadence_source=cadence_source,
+                )
+                if coordinator.async_restore_snapshot():
+                    # Entities start from the snapshot; a slow or failing
+                    # API no longer holds up (or fails) the setup.
+                    entry.async_create_task(
+                        hass,
+                        coordinator.async_refresh(),
+                        f"maalerportal first refresh {installation_id}",
+                    )
+                else:
+                    await coordinator.async_config_entry_first_refresh()
+                return coordinator
+
+    setup_installations = []
     for installation in installations:
         installation_id = installation["installationId"]
 
@@ -481,36 +769,45 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 "Skipping coordinator for missing installation %s", installation_id
             )
             continue
+        setup_installations.append(installation)
+    snapshot_store.retain(
+        {installation["installationId"] for installation in setup_installations}
+    )
 
-        # Per-installation CSV log of every reading we observe.
-        readings_log = ReadingsLog(hass, installation_id)
-        await readings_log.async_load()
-        hass.data[DOMAIN][entry.entry_id]["readings_logs"][installation_id] = readings_log
-
-        # Create coordinator
-        coordinator = MaalerportalCoordinator(
+    with _log_phase(entry, f"{len(setup_installations)} installations"):
+        outcomes = await asyncio.gather(
+            *(_async_setup_installation(inst) for inst in setup_installations),
+            return_exceptions=True,
+        )
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            # Same as a serial setup failing on that installation (e.g.
+            # ConfigEntryNotReady): release what the others opened.
+            for readings_log in entry_store["readings_logs"].values():
+                await readings_log.async_close()
+            raise outcome
+    for installation, coordinator in zip(setup_installations, outcomes):
+        entry_store["coordinators"][installation["installationId"]] = coordinator
+
+    with _log_phase(entry, "platform setup"):
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if revalidate:
+        entry.async_create_task(
             hass,
-            api_key,
-            base_url,
-            installation,
-            polling_interval,
-            currency,
-            readings_log=readings_log,
+            _async_revalidate_installations(
+                hass, entry, api_client, addresses_cache, missing_ids
+            ),
+            f"maalerportal revalidate installations {entry.entry_id}",
         )
 
-        # Perform initial fetch
-        await coordinator.async_config_entry_first_refresh()
-
-        hass.data[DOMAIN][entry.entry_id]["coordinators"][installation_id] = coordinator
-
-        # Re-evaluate stale-data state right away (before subscribing
-        # so the listener doesn't double-fire on first run) and then
-        # subscribe to keep it current on every coordinator refresh.
-        await async_check_stale_data(hass, entry, coordinator, stale_store)
-        unsub = attach_stale_monitor(hass, entry, coordinator, stale_store)
-        hass.data[DOMAIN][entry.entry_id]["stale_monitor_unsubs"].append(unsub)
-    
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Stale-data evaluation may fetch two weeks of history; it runs once
+    # the entities exist instead of holding up setup.
+    entry.async_create_task(
+        hass,
+        _async_start_stale_monitors(hass, entry, entry_store, stale_store),
+        f"maalerportal stale monitors {entry.entry_id}",
+    )
     
     # Register listener for options updates
     entry.async_on_unload(entry.add_update_listener(async_options_update_listener))
@@ -662,6 +959,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 unsub()
             except Exception:  # noqa: BLE001
                 pass
+        for readings_log in store.get("readings_logs", {}).values():
+            await readings_log.async_close()
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
@@ -669,4 +968,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_options_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
+    store = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if store is not None and store.get("options") == dict(entry.options):
+        # Only entry.data changed, e.g. reconciliation merged a nickname or
+        # serial edit in the background; nothing to set up again.
+        return
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,241 @@
+"""Async client for the Målerportal smarthome API.
+
+Every request the integration makes with an API key goes through
+:class:`MaalerportalApiClient`, one per config entry:
+
+* Requests run on Home Assistant's shared, pooled aiohttp session and
+  responses are always read inside ``async with`` so the connection goes
+  back to the pool even when the status is an error.
+* HTTP 429 is retried after the server's ``Retry-After`` (seconds or an
+  HTTP date) or, without one, after a jittered exponential backoff.
+  Connection errors, timeouts and 5xx answers get the same backoff.
+  Waits longer than ``MAX_RETRY_WAIT`` aren't slept through: the caller
+  gets :class:`RateLimitedError` and tries again on its next cycle.
+* 403/404 raise :class:`InstallationUnavailableError`; any other non-2xx
+  status raises :class:`ApiError` without retrying.
+* Bodies are decoded with ``orjson`` (shipped with Home Assistant) and
+  fall back to the standard library where it isn't available.
+
+With an :class:`~.ratelimit.AimdRateLimiter` every attempt first takes a
+token from it and reports back whether it was rate limited; the limiter
+then owns the waiting after a 429. If the limiter is paused for longer
+than ``MAX_RETRY_WAIT`` the request fails fast with
+:class:`RateLimitedError` instead of queueing.
+
+With a :class:`~.scheduler.RequestScheduler` every attempt also holds a
+slot of the account-wide concurrency cap, admitted by the ``priority``
+the caller passes (live polls before history backfill). The slot is
+taken before the limiter token, so the token queue only ever holds
+admitted requests, and it is released during retry waits.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import AbstractAsyncContextManager, nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import json
+import logging
+import random
+from typing import Any
+
+import aiohttp
+
+from .ratelimit import AimdRateLimiter
+from .scheduler import Priority, RequestScheduler
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    _json_loads = json.loads
+
+_LOGGER = logging.getLogger(__name__)
+
+# Attempts per request, including the first one.
+DEFAULT_ATTEMPTS = 3
+# Backoff without a Retry-After header: BASE * 2**retry, full jitter.
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+# Longest wait the client sleeps through before handing a 429 back.
+MAX_RETRY_WAIT = 60.0
+
+
+class ApiError(Exception):
+    """The API answered with an unexpected HTTP status."""
+
+    def __init__(self, status: int) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class InstallationUnavailableError(ApiError):
+    """The API answered 403/404 for the installation."""
+
+
+class RateLimitedError(ApiError):
+    """The API kept answering 429.
+
+    ``retry_after`` is the server's requested wait in seconds, if any.
+    """
+
+    def __init__(self, retry_after: float | None = None) -> None:
+        super().__init__(429)
+        self.retry_after = retry_after
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def retry_after_seconds(value: str | None, now: datetime | None = None) -> float | None:
+    """Parse a ``Retry-After`` header into seconds from ``now``."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+def backoff_delay(retry: int, rng: random.Random | None = None) -> float:
+    """Full-jitter exponential backoff before retry number ``retry``."""
+    ceiling = min(BACKOFF_MAX, BACKOFF_BASE * (2**retry))
+    return (rng or random).uniform(0, ceiling)
+
+
+class MaalerportalApiClient:
+    """Thin retrying JSON client bound to one base URL and API key."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        api_key: str,
+        *,
+        attempts: int = DEFAULT_ATTEMPTS,
+        limiter: AimdRateLimiter | None = None,
+        scheduler: RequestScheduler | None = None,
+    ) -> None:
+        self._session = session
+        self._base_url = base_url.rstrip("/")
+        self._api_key = api_key
+        self._attempts = max(1, attempts)
+        self._limiter = limiter
+        self._scheduler = scheduler
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    async def async_get(
+        self, path: str, *, timeout: float = 30, priority: Priority = Priority.LIVE
+    ) -> Any:
+        """GET ``path`` and return the decoded JSON body."""
+        return await self._async_request("get", path, None, timeout, priority)
+
+    async def async_post(
+        self,
+        path: str,
+        payload: dict[str, Any],
+        *,
+        timeout: float = 60,
+        priority: Priority = Priority.LIVE,
+    ) -> Any:
+        """POST ``payload`` as JSON to ``path`` and return the decoded body."""
+        return await self._async_request("post", path, payload, timeout, priority)
+
+    async def _async_request(
+        self,
+        method: str,
+        path: str,
+        payload: dict[str, Any] | None,
+        timeout: float,
+        priority: Priority,
+    ) -> Any:
+        url = f"{self._base_url}{path}"
+        headers = {"ApiKey": self._api_key}
+        kwargs: dict[str, Any] = {
+            "headers": headers,
+            "timeout": aiohttp.ClientTimeout(total=timeout),
+        }
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+            kwargs["json"] = payload
+
+        retry = 0
+        while True:
+            wait: float | None = None
+            async with self._slot(priority):
+                await self._async_take_token()
+                try:
+                    request = getattr(self._session, method)(url, **kwargs)
+                    async with request as response:
+                        status = response.status
+                        if status == 429:
+                            wait = retry_after_seconds(
+                                (response.headers or {}).get("Retry-After")
+                            )
+                            if self._limiter is not None:
+                                self._limiter.on_rate_limited(wait)
+                            if retry + 1 >= self._attempts or (
+                                wait is not None and wait > MAX_RETRY_WAIT
+                            ):
+                                raise RateLimitedError(wait)
+                        else:
+                            if self._limiter is not None:
+                                self._limiter.on_success()
+                            if status in (403, 404):
+                                raise InstallationUnavailableError(status)
+                            if status >= 500:
+                                raise _RetryableStatus(status)
+                            if not response.ok:
+                                raise ApiError(status)
+                            return _json_loads(await response.read())
+                except (
+                    _RetryableStatus,
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                ) as err:
+                    if retry + 1 >= self._attempts:
+                        if isinstance(err, _RetryableStatus):
+                            raise ApiError(err.status) from None
+                        raise
+                    _LOGGER.debug(
+                        "%s %s failed (%r), retrying", method.upper(), path, err
+                    )
+                    wait = backoff_delay(retry)
+                else:
+                    _LOGGER.debug("%s %s rate limited, retrying", method.upper(), path)
+                    if self._limiter is not None:
+                        # The limiter now holds every request back, this one
+                        # included, for Retry-After or its reduced rate.
+                        wait = None
+                    elif wait is None:
+                        wait = backoff_delay(retry)
+            retry += 1
+            if wait:
+                await asyncio.sleep(wait)
+
+    def _slot(self, priority: Priority) -> AbstractAsyncContextManager[Any]:
+        if self._scheduler is None:
+            return nullcontext()
+        return self._scheduler.slot(priority)
+
+    async def _async_take_token(self) -> None:
+        if self._limiter is None:
+            return
+        pending = self._limiter.delay()
+        if pending > MAX_RETRY_WAIT:
+            raise RateLimitedError(pending)
+        await self._limiter.async_acquire()
@@ -51,21 +51,19 @@ async def async_setup_entry(
 
     entities: list[BinarySensorEntity] = []
     for coordinator in coordinators.values():
-        if not coordinator.data:
-            continue
-        for counter in coordinator.data.get("meterCounters", []):
-            if counter.get("counterType") == ACOUSTIC_NOISE_COUNTER_TYPE:
-                entities.append(
-                    MaalerportalLeakAlarmSensor(
-                        hass=hass,
-                        entry=entry,
-                        coordinator=coordinator,
-                        counter=counter,
-                        threshold_hz=threshold,
-                        sustained_hours=sustained_hours,
-                    )
+        # One alarm sensor per installation.
+        reading = coordinator.counters.first_of_type(ACOUSTIC_NOISE_COUNTER_TYPE)
+        if reading is not None:
+            entities.append(
+                MaalerportalLeakAlarmSensor(
+                    hass=hass,
+                    entry=entry,
+                    coordinator=coordinator,
+                    counter=dict(reading.counter),
+                    threshold_hz=threshold,
+                    sustained_hours=sustained_hours,
                 )
-                break  # one alarm sensor per installation
+            )
 
     if entities:
         async_add_entities(entities)
@@ -260,28 +258,21 @@ class MaalerportalLeakAlarmSensor(
         """
         if not self.coordinator.data:
             return
-        for counter in self.coordinator.data.get("meterCounters", []):
-            if counter.get("meterCounterId") != self._counter_id:
-                continue
-            raw = counter.get("latestValue")
-            if raw is None:
-                return
-            try:
-                value = float(raw)
-            except (TypeError, ValueError):
-                return
-            self._latest_value = value
-            if value >= self._threshold_hz:
-                if self._first_elevated is None:
-                    self._first_elevated = datetime.now(timezone.utc)
-            elif allow_clear:
-                if self._first_elevated is not None:
-                    _LOGGER.debug(
-                        "Acoustic noise on %s dropped below threshold "
-                        "(%.1f < %.1f Hz) — clearing elevated state.",
-                        self._installation_id,
-                        value,
-                        self._threshold_hz,
-                    )
-                self._first_elevated = None
+        reading = self.coordinator.counters.get(self._counter_id)
+        if reading is None or reading.value is None:
             return
+        value = reading.value
+        self._latest_value = value
+        if value >= self._threshold_hz:
+            if self._first_elevated is None:
+                self._first_elevated = datetime.now(timezone.utc)
+        elif allow_clear:
+            if self._first_elevated is not None:
+                _LOGGER.debug(
+                    "Acoustic noise on %s dropped below threshold "
+                    "(%.1f < %.1f Hz) — clearing elevated state.",
+                    self._installation_id,
+                    value,
+                    self._threshold_hz,
+                )
+            self._first_elevated = None
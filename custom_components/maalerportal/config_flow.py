@@ -24,6 +24,8 @@ from .const import (
     DEFAULT_POLLING_INTERVAL,
     MIN_POLLING_INTERVAL,
     MAX_POLLING_INTERVAL,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
     CONF_CURRENCY,
     DEFAULT_CURRENCY,
     SUPPORTED_CURRENCIES,
@@ -31,6 +33,15 @@ from .const import (
     DEFAULT_RECENT_READINGS_COUNT,
     MIN_RECENT_READINGS_COUNT,
     MAX_RECENT_READINGS_COUNT,
+    CONF_HISTORY_PARALLELISM,
+    DEFAULT_HISTORY_PARALLELISM,
+    MIN_HISTORY_PARALLELISM,
+    MAX_HISTORY_PARALLELISM,
+    CONF_STARTUP_FULL_REFETCH,
+    DEFAULT_STARTUP_FULL_REFETCH,
+    CONF_READINGS_LOG_BACKEND,
+    DEFAULT_READINGS_LOG_BACKEND,
+    READINGS_LOG_BACKENDS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -786,6 +797,9 @@ class OptionsFlow(config_entries.OptionsFlow):
         current_interval = self._config_entry.options.get(
             "polling_interval", DEFAULT_POLLING_INTERVAL
         )
+        current_adaptive_polling = self._config_entry.options.get(
+            CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+        )
         current_currency = self._config_entry.options.get(
             CONF_CURRENCY,
             self._config_entry.data.get(CONF_CURRENCY, DEFAULT_CURRENCY),
@@ -811,6 +825,15 @@ class OptionsFlow(config_entries.OptionsFlow):
         current_recent_count = self._config_entry.options.get(
             CONF_RECENT_READINGS_COUNT, DEFAULT_RECENT_READINGS_COUNT
         )
+        current_history_parallelism = self._config_entry.options.get(
+            CONF_HISTORY_PARALLELISM, DEFAULT_HISTORY_PARALLELISM
+        )
+        current_startup_full_refetch = self._config_entry.options.get(
+            CONF_STARTUP_FULL_REFETCH, DEFAULT_STARTUP_FULL_REFETCH
+        )
+        current_readings_log_backend = self._config_entry.options.get(
+            CONF_READINGS_LOG_BACKEND, DEFAULT_READINGS_LOG_BACKEND
+        )
 
         return self.async_show_form(
             step_id="settings",
@@ -823,6 +846,10 @@ class OptionsFlow(config_entries.OptionsFlow):
                         vol.Coerce(int),
                         vol.Range(min=MIN_POLLING_INTERVAL, max=MAX_POLLING_INTERVAL),
                     ),
+                    vol.Optional(
+                        CONF_ADAPTIVE_POLLING,
+                        default=current_adaptive_polling,
+                    ): bool,
                     vol.Optional(
                         CONF_CURRENCY,
                         default=current_currency,
@@ -861,6 +888,24 @@ class OptionsFlow(config_entries.OptionsFlow):
                             max=MAX_RECENT_READINGS_COUNT,
                         ),
                     ),
+                    vol.Optional(
+                        CONF_HISTORY_PARALLELISM,
+                        default=current_history_parallelism,
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(
+                            min=MIN_HISTORY_PARALLELISM,
+                            max=MAX_HISTORY_PARALLELISM,
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_STARTUP_FULL_REFETCH,
+                        default=current_startup_full_refetch,
+                    ): bool,
+                    vol.Optional(
+                        CONF_READINGS_LOG_BACKEND,
+                        default=current_readings_log_backend,
+                    ): vol.In(READINGS_LOG_BACKENDS),
                 }
             ),
         )
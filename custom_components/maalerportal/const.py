@@ -10,6 +10,12 @@ DEFAULT_POLLING_INTERVAL = 30
 MIN_POLLING_INTERVAL = 15
 MAX_POLLING_INTERVAL = 120
 
+# Time each poll to just after the meter's next expected reading, using
+# the reporting cadence learned by the stale monitor, instead of polling
+# every interval.
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+DEFAULT_ADAPTIVE_POLLING = False
+
 # Currency
 CONF_CURRENCY = "currency"
 DEFAULT_CURRENCY = "SEK"
@@ -28,3 +34,24 @@ CONF_RECENT_READINGS_COUNT = "recent_readings_count"
 DEFAULT_RECENT_READINGS_COUNT = 30
 MIN_RECENT_READINGS_COUNT = 1
 MAX_RECENT_READINGS_COUNT = 500
+
+# How many /readings/historical chunks a backfill may request concurrently.
+# Drops to 1 automatically for a while after the API answers 429.
+CONF_HISTORY_PARALLELISM = "history_fetch_parallelism"
+DEFAULT_HISTORY_PARALLELISM = 3
+MIN_HISTORY_PARALLELISM = 1
+MAX_HISTORY_PARALLELISM = 6
+
+# Storage engine for the per-installation readings archive. "csv" is the
+# human-readable append-only file; "sqlite" is an indexed database that
+# imports the CSV once and keeps startup cost flat as the archive grows.
+CONF_READINGS_LOG_BACKEND = "readings_log_backend"
+READINGS_LOG_BACKEND_CSV = "csv"
+READINGS_LOG_BACKEND_SQLITE = "sqlite"
+READINGS_LOG_BACKENDS = [READINGS_LOG_BACKEND_CSV, READINGS_LOG_BACKEND_SQLITE]
+DEFAULT_READINGS_LOG_BACKEND = READINGS_LOG_BACKEND_CSV
+
+# Re-fetch and re-import a full year of history on every startup instead of
+# only the range missing from the recorder.
+CONF_STARTUP_FULL_REFETCH = "startup_full_history_refetch"
+DEFAULT_STARTUP_FULL_REFETCH = False
@@ -1,4 +1,7 @@
 """DataUpdateCoordinator for Målerportal integration."""
+import asyncio
+from collections import deque
+from collections.abc import Callable
 from datetime import datetime, timedelta, timezone
 import logging
 from typing import Any
@@ -6,23 +9,97 @@ from typing import Any
 import aiohttp
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 
+from .api import (
+    ApiError,
+    InstallationUnavailableError,
+    MaalerportalApiClient,
+    RateLimitedError,
+)
 from .const import DOMAIN
+from .counter_index import CounterIndex
+from .polling import estimate_report_lag, next_poll_delay
+from .scheduler import Priority
+from .timeutils import api_timestamp_sort_key, parse_api_timestamp
 
 _LOGGER = logging.getLogger(__name__)
 
 # Some meters return latestValue=null from /readings/latest even when the
 # historical endpoint has perfectly good data. We then backfill the
-# coordinator's response from the most recent historical reading. The
-# API rejects ranges longer than 31 days with HTTP 500, so we stay one
-# day under the limit to leave room for any timezone slack on either
-# end of the request window.
+# coordinator's response from the most recent historical reading found
+# in this many days of history.
 _FALLBACK_HISTORY_DAYS = 30
 
+# Last successful /readings/latest payload per installation, used to seed
+# the coordinator at startup before the first real refresh.
+_SNAPSHOT_STORE_VERSION = 1
+_SNAPSHOT_STORE_KEY_FMT = f"{DOMAIN}.coordinator_snapshot.{{entry_id}}"
+# Polls are batched into one write at most this often.
+_SNAPSHOT_SAVE_DELAY = 60
+# Older snapshots aren't restored; the entities wait for the API instead.
+_SNAPSHOT_MAX_AGE = timedelta(days=7)
+
+# Report-lag samples kept for adaptive polling (see polling.py).
+_REPORT_LAG_SAMPLES = 10
+
+
+class CoordinatorSnapshotStore:
+    """Persists each installation's last successful coordinator data.
+
+    Restoring it at setup lets entities appear immediately with their
+    last known values while the first refresh runs in the background.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = Store(
+            hass,
+            _SNAPSHOT_STORE_VERSION,
+            _SNAPSHOT_STORE_KEY_FMT.format(entry_id=entry_id),
+        )
+        self._data: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        loaded = await self._store.async_load()
+        self._data = dict(loaded) if isinstance(loaded, dict) else {}
+
+    def get(self, installation_id: str) -> dict[str, Any] | None:
+        """Return the saved payload if it is recent enough to show."""
+        bucket = self._data.get(installation_id)
+        if not isinstance(bucket, dict):
+            return None
+        try:
+            age = datetime.now(timezone.utc) - datetime.fromisoformat(
+                bucket["saved_at"]
+            )
+        except (KeyError, TypeError, ValueError):
+            # TypeError also covers a timestamp without a UTC offset.
+            return None
+        if age > _SNAPSHOT_MAX_AGE:
+            return None
+        data = bucket.get("data")
+        if not isinstance(data, dict) or "meterCounters" not in data:
+            return None
+        return data
+
+    def async_save(self, installation_id: str, data: dict[str, Any]) -> None:
+        """Remember ``data`` and schedule a batched write."""
+        self._data[installation_id] = {
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "data": data,
+        }
+        self._store.async_delay_save(lambda: self._data, _SNAPSHOT_SAVE_DELAY)
+
+    def retain(self, installation_ids: set[str]) -> None:
+        """Forget snapshots of installations that are no longer set up."""
+        for installation_id in set(self._data) - installation_ids:
+            del self._data[installation_id]
+
+
 class MaalerportalCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Målerportal data."""
 
@@ -35,6 +112,10 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
         polling_interval: timedelta,
         currency: str = "SEK",
         readings_log: Any = None,
+        history_service: Any = None,
+        api_client: MaalerportalApiClient | None = None,
+        snapshot_store: CoordinatorSnapshotStore | None = None,
+        cadence_source: Callable[[str], timedelta | None] | None = None,
     ) -> None:
         """Initialize."""
         self.api_key = api_key
@@ -42,11 +123,30 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
         self.installation = installation
         self.installation_id = installation["installationId"]
         self.currency = currency
-        self.session = async_get_clientsession(hass)
+        # The entry's shared API client; every request of this
+        # installation's sensors goes through it.
+        self.api_client = api_client or MaalerportalApiClient(
+            async_get_clientsession(hass), base_url, api_key
+        )
         # Optional CSV append-only log of every reading we observe.
         # Provided by __init__ at setup time; coordinator just calls it
         # on each successful poll and after fallback fetches.
         self.readings_log = readings_log
+        # Shared per-installation HistoricalReadingsService. Used for the
+        # null-value fallback and the stale monitor's cadence lookup so
+        # they reuse the statistic sensors' chunks and day cache.
+        self.history_service = history_service
+        # Optional persisted copy of the last good payload (see
+        # async_restore_snapshot).
+        self._snapshot_store = snapshot_store
+        # Adaptive polling: returns the learned reporting cadence of an
+        # installation (the stale monitor's cache). When set, the next
+        # poll is timed to just after the next expected reading instead
+        # of running every ``polling_interval``.
+        self._cadence_source = cadence_source
+        self._base_interval = polling_interval
+        # When the last refresh succeeded.
+        self.last_success_at: datetime | None = None
 
         # Per-counter fallback for when /readings/latest returns null.
         # Populated lazily from /readings/historical and refreshed only
@@ -59,6 +159,16 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
         # recorded a value did our integration receive it. Reset
         # whenever latestTimestamp changes (= new reading observed).
         self._first_observed: dict[str, tuple[str, datetime]] = {}
+        # Recent (first observed - recorded) delays of new readings.
+        self._report_lags: deque[timedelta] = deque(maxlen=_REPORT_LAG_SAMPLES)
+
+        # Index of the current payload's counters, rebuilt when ``data``
+        # is replaced (see ``counters``).
+        self._counter_index = CounterIndex()
+        self._counter_index_source: Any = None
+        # Ids of the counters that changed with the last update; None
+        # means "all of them" (first payload, restored snapshot).
+        self._changed_counters: frozenset[str] | None = None
 
         super().__init__(
             hass,
@@ -69,49 +179,91 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from API endpoint."""
+        # A failed refresh changes no counter; listeners still run so
+        # entities can go unavailable.
+        self._changed_counters = frozenset()
+        # Failed polls retry at the configured pace.
+        self.update_interval = self._base_interval
         try:
-            async with self.session.get(
-                f"{self.base_url}/installations/{self.installation_id}/readings/latest",
-                headers={"ApiKey": self.api_key},
-                timeout=aiohttp.ClientTimeout(total=30),
-            ) as response:
-
-                if response.status == 429:
-                    raise UpdateFailed("Rate limit exceeded")
-                
-                if response.status in (403, 404):
-                    # Installation possibly removed or key invalid
-                    raise UpdateFailed(f"Installation not accessible: {response.status}")
-
-                if not response.ok:
-                    raise UpdateFailed(f"Error communicating with API: {response.status}")
-
-                data = await response.json()
-
-                # Check for valid data structure
-                if not data or "meterCounters" not in data:
-                    _LOGGER.debug(
-                        "No meterCounters in response for %s", self.installation_id
-                    )
-                    return {"meterCounters": []}
-
-                _LOGGER.debug(
-                    "Received %d meter counters for %s",
-                    len(data.get("meterCounters", [])),
-                    self.installation_id
-                )
-
-                await self._backfill_null_latest_values(data["meterCounters"])
-                self._update_first_observed(data["meterCounters"])
-                await self._log_readings(data["meterCounters"])
-
-                return data
-
-        except aiohttp.ClientConnectorError as err:
+            data = await self.api_client.async_get(
+                f"/installations/{self.installation_id}/readings/latest",
+                timeout=30,
+            )
+        except RateLimitedError as err:
+            raise UpdateFailed("Rate limit exceeded") from err
+        except InstallationUnavailableError as err:
+            # Installation possibly removed or key invalid
+            raise UpdateFailed(f"Installation not accessible: {err.status}") from err
+        except ApiError as err:
+            raise UpdateFailed(f"Error communicating with API: {err.status}") from err
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
             raise UpdateFailed(f"Connection error: {err}") from err
         except Exception as err:
             raise UpdateFailed(f"Unexpected error: {err}") from err
 
+        # Check for valid data structure
+        if not data or "meterCounters" not in data:
+            _LOGGER.debug(
+                "No meterCounters in response for %s", self.installation_id
+            )
+            return {"meterCounters": []}
+
+        _LOGGER.debug(
+            "Received %d meter counters for %s",
+            len(data.get("meterCounters", [])),
+            self.installation_id
+        )
+
+        try:
+            await self._backfill_null_latest_values(data["meterCounters"])
+            self._update_first_observed(data["meterCounters"])
+            index = CounterIndex.from_payload(data)
+            changed = index.changed_since(
+                self.counters if self.data is not None else None
+            )
+            await self._log_readings(
+                [r.counter for r in index if r.counter_id in changed]
+            )
+        except Exception as err:
+            raise UpdateFailed(f"Unexpected error: {err}") from err
+
+        _LOGGER.debug(
+            "%d of %d meter counters changed for %s",
+            len(changed), len(index), self.installation_id,
+        )
+        # ``data`` is replaced right after we return; hand it the index.
+        self._counter_index = index
+        self._counter_index_source = data
+        self._changed_counters = changed
+        self.last_success_at = datetime.now(timezone.utc)
+        if self._cadence_source is not None:
+            self._schedule_next_poll(index)
+        if self._snapshot_store is not None:
+            self._snapshot_store.async_save(self.installation_id, data)
+        return data
+
+    def async_restore_snapshot(self) -> bool:
+        """Seed ``data`` from the last persisted payload, if there is one.
+
+        Returns True when the coordinator now has data, so setup can run
+        the first real refresh in the background instead of awaiting it.
+        Report-lag tracking starts with that refresh, not from the
+        restored timestamps.
+        """
+        if self._snapshot_store is None:
+            return False
+        data = self._snapshot_store.get(self.installation_id)
+        if data is None:
+            return False
+        _LOGGER.debug(
+            "Restored %d meter counters for %s from the last snapshot",
+            len(data["meterCounters"]),
+            self.installation_id,
+        )
+        self._changed_counters = None
+        self.async_set_updated_data(data)
+        return True
+
     async def _backfill_null_latest_values(
         self, counters: list[dict[str, Any]]
     ) -> None:
@@ -121,7 +273,7 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
         ``/readings/historical`` only; ``/readings/latest`` returns
         nulls. Without this fallback those sensors stay "Unknown"
         forever even though the user can clearly see meter readings
-        elsewhere. We fetch one 31-day historical window when needed,
+        elsewhere. We look up the last 30 days of history when needed,
         cache the result, and apply it. Live latestValues from the API
         always win and clear the cache for that counter.
         """
@@ -167,6 +319,59 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
             cached = self._first_observed.get(cid)
             if cached is None or cached[0] != ts:
                 self._first_observed[cid] = (ts, now)
+                recorded = parse_api_timestamp(ts)
+                # The first sighting after startup says nothing about lag.
+                if cached is not None and recorded is not None:
+                    self._report_lags.append(now - recorded)
+
+    @property
+    def polling_interval(self) -> timedelta:
+        """The configured interval, whatever adaptive polling scheduled."""
+        return self._base_interval
+
+    def _schedule_next_poll(self, index: CounterIndex) -> None:
+        """Time the next refresh after the next expected reading."""
+        latest = index.latest
+        delay = next_poll_delay(
+            base_interval=self._base_interval,
+            cadence=self._cadence_source(self.installation_id),
+            last_reading=latest.timestamp if latest is not None else None,
+            now=datetime.now(timezone.utc),
+            report_lag=estimate_report_lag(self._report_lags),
+        )
+        if delay != self._base_interval:
+            _LOGGER.debug(
+                "Next poll of %s in %s (adaptive)", self.installation_id, delay
+            )
+        self.update_interval = delay
+
+    @property
+    def counters(self) -> CounterIndex:
+        """Index of the current payload's counters, built once per payload.
+
+        Entities look their counter up here instead of scanning
+        ``data["meterCounters"]`` on every refresh.
+        """
+        data = self.data
+        if data is not self._counter_index_source:
+            self._counter_index = CounterIndex.from_payload(data)
+            self._counter_index_source = data
+        return self._counter_index
+
+    def counter_changed(self, counter_id: Any) -> bool:
+        """Whether the last update changed the counter ``counter_id``.
+
+        Lets entities skip the state write when their counter came back
+        exactly as it was.
+        """
+        if self._changed_counters is None:
+            return True
+        return counter_id is not None and str(counter_id) in self._changed_counters
+
+    @property
+    def any_counter_changed(self) -> bool:
+        """Whether the last update changed at least one counter."""
+        return self._changed_counters is None or bool(self._changed_counters)
 
     def first_observed_at(self, counter_id: str, timestamp: str) -> datetime | None:
         """Return when we first saw this exact timestamp for the counter,
@@ -203,50 +408,26 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
 
     async def _refresh_fallback_from_history(self, counter_ids: list[str]) -> None:
         """Populate fallback cache for the given counters from /readings/historical."""
+        if self.history_service is None:
+            return
+        now = datetime.now(timezone.utc)
+        _LOGGER.debug(
+            "Fetching fallback history for %s: last %d days (counters: %s)",
+            self.installation_id, _FALLBACK_HISTORY_DAYS, counter_ids,
+        )
+        # The service archives every reading it downloads to the
+        # readings_log, and serves finalized days from its day cache.
         try:
-            now = datetime.now(timezone.utc)
-            # Use precise timestamps (no midnight rounding) so the request
-            # span stays strictly inside the API's 31-day limit. With
-            # _FALLBACK_HISTORY_DAYS = 30 we get exactly 30 days, leaving
-            # room for any clock drift between client and server.
-            from_date = (now - timedelta(days=_FALLBACK_HISTORY_DAYS)).strftime(
-                "%Y-%m-%dT%H:%M:%SZ"
-            )
-            to_date = now.strftime("%Y-%m-%dT%H:%M:%SZ")
-            _LOGGER.debug(
-                "Fetching fallback history for %s: %s -> %s (counters: %s)",
-                self.installation_id, from_date, to_date, counter_ids,
+            readings = await self.history_service.async_fetch(
+                now - timedelta(days=_FALLBACK_HISTORY_DAYS),
+                now,
+                priority=Priority.FALLBACK,
             )
-            async with self.session.post(
-                f"{self.base_url}/installations/{self.installation_id}/readings/historical",
-                json={"from": from_date, "to": to_date},
-                headers={"ApiKey": self.api_key, "Content-Type": "application/json"},
-                timeout=aiohttp.ClientTimeout(total=30),
-            ) as response:
-                if not response.ok:
-                    body = await response.text()
-                    # Bump to WARNING — debug-only made this silently fail
-                    # the first time around; users need visibility.
-                    _LOGGER.warning(
-                        "Fallback history fetch returned HTTP %s for installation %s: %s",
-                        response.status,
-                        self.installation_id,
-                        body[:200],
-                    )
-                    return
-                data = await response.json()
-        except (aiohttp.ClientError, TimeoutError) as err:
-            _LOGGER.warning("Fallback history fetch failed for %s: %s",
+        except InstallationUnavailableError as err:
+            _LOGGER.warning("Fallback history fetch failed for %s: HTTP %s",
                             self.installation_id, err)
             return
 
-        readings = data.get("readings", []) if isinstance(data, dict) else []
-
-        # Archive every historical reading we fetched, not just the latest
-        # we'll use as the fallback. Dedup in the log makes this safe.
-        if self.readings_log is not None:
-            await self.readings_log.async_record_many(readings, source="historical")
-
         for counter_id in counter_ids:
             candidates = [
                 r for r in readings
@@ -256,9 +437,11 @@ class MaalerportalCoordinator(DataUpdateCoordinator):
             ]
             if not candidates:
                 continue
-            # Pick the most recent — timestamp strings sort lexicographically
-            # because they are ISO-8601 with consistent timezone offset.
-            candidates.sort(key=lambda r: r["timestamp"], reverse=True)
+            # Pick the most recent. Sort on the parsed instant: rows served
+            # from the archive are UTC while fresh ones carry a local offset.
+            candidates.sort(
+                key=lambda r: api_timestamp_sort_key(r["timestamp"]), reverse=True
+            )
             latest = candidates[0]
             self._fallback_values[counter_id] = {
                 "value": latest["value"],
@@ -0,0 +1,166 @@
+"""Per-poll index of the counters in a ``/readings/latest`` payload.
+
+Every coordinator entity used to walk the whole ``meterCounters`` list
+on each refresh, compare stringified ids and parse ``latestValue`` and
+``latestTimestamp`` itself — CPU per poll grew with entities × counters.
+The coordinator now builds one :class:`CounterIndex` per payload; each
+counter's value and timestamp are parsed once and entities look their
+counter up by id, by type or as the primary counter in O(1).
+
+:meth:`CounterIndex.changed_since` diffs two payloads per counter, so a
+refresh only reaches the entities whose counter actually changed.
+
+This module contains no Home Assistant imports so the logic can be unit
+tested in isolation.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+import re
+from typing import Any
+
+from .timeutils import parse_api_timestamp
+
+_NON_NUMERIC = re.compile(r"[^\d.-]")
+
+
+def parse_counter_value(raw: Any) -> float | None:
+    """Parse a ``latestValue`` into a float.
+
+    Numbers are taken as-is; strings are stripped of everything but
+    digits, ``.`` and ``-`` first (units, whitespace). Returns None for
+    null, unparseable and NaN values.
+    """
+    if raw is None or isinstance(raw, bool):
+        return None
+    if isinstance(raw, (int, float)):
+        value = float(raw)
+    elif isinstance(raw, str):
+        cleaned = _NON_NUMERIC.sub("", raw.strip())
+        if not cleaned:
+            return None
+        try:
+            value = float(cleaned)
+        except ValueError:
+            return None
+    else:
+        return None
+    if value != value:  # NaN
+        return None
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class CounterReading:
+    """One counter of a payload with its value and timestamp pre-parsed."""
+
+    counter_id: str
+    counter_type: str
+    unit: str
+    is_primary: bool
+    value: float | None
+    timestamp: datetime | None
+    # ``latestTimestamp`` as the API sent it.
+    raw_timestamp: str | None
+    counter: Mapping[str, Any]
+
+    @classmethod
+    def from_counter(cls, counter: Mapping[str, Any]) -> CounterReading:
+        raw_timestamp = counter.get("latestTimestamp") or None
+        return cls(
+            counter_id=str(counter.get("meterCounterId") or ""),
+            counter_type=counter.get("counterType") or "",
+            unit=counter.get("unit") or "",
+            is_primary=bool(counter.get("isPrimary")),
+            value=parse_counter_value(counter.get("latestValue")),
+            timestamp=parse_api_timestamp(raw_timestamp),
+            raw_timestamp=raw_timestamp,
+            counter=counter,
+        )
+
+
+class CounterIndex:
+    """Read-only lookups into the counters of one payload."""
+
+    __slots__ = ("_readings", "_by_id", "_by_type", "_primary", "_latest")
+
+    def __init__(self, counters: Iterable[Mapping[str, Any]] = ()) -> None:
+        readings = tuple(CounterReading.from_counter(c) for c in counters)
+        by_id: dict[str, CounterReading] = {}
+        by_type: dict[str, CounterReading] = {}
+        primary: CounterReading | None = None
+        latest: CounterReading | None = None
+        for reading in readings:
+            # First occurrence wins, like the linear scans it replaces.
+            if reading.counter_id:
+                by_id.setdefault(reading.counter_id, reading)
+            if reading.counter_type:
+                by_type.setdefault(reading.counter_type, reading)
+            if primary is None and reading.is_primary:
+                primary = reading
+            if reading.timestamp is not None and (
+                latest is None or reading.timestamp > latest.timestamp
+            ):
+                latest = reading
+        self._readings = readings
+        self._by_id = by_id
+        self._by_type = by_type
+        self._primary = primary
+        self._latest = latest
+
+    @classmethod
+    def from_payload(cls, data: Mapping[str, Any] | None) -> CounterIndex:
+        """Index the ``meterCounters`` of a coordinator payload."""
+        if not data:
+            return cls()
+        return cls(data.get("meterCounters") or ())
+
+    def __len__(self) -> int:
+        return len(self._readings)
+
+    def __iter__(self) -> Iterator[CounterReading]:
+        return iter(self._readings)
+
+    def get(self, counter_id: Any) -> CounterReading | None:
+        """The counter with ``meterCounterId`` equal to ``counter_id``."""
+        if counter_id is None:
+            return None
+        return self._by_id.get(str(counter_id))
+
+    def first_of_type(self, counter_type: str) -> CounterReading | None:
+        """The first counter whose ``counterType`` is ``counter_type``."""
+        return self._by_type.get(counter_type)
+
+    @property
+    def primary(self) -> CounterReading | None:
+        """The first counter flagged ``isPrimary``."""
+        return self._primary
+
+    @property
+    def first(self) -> CounterReading | None:
+        """The first counter of the payload."""
+        return self._readings[0] if self._readings else None
+
+    @property
+    def latest(self) -> CounterReading | None:
+        """The counter with the freshest parseable ``latestTimestamp``."""
+        return self._latest
+
+    def changed_since(self, previous: CounterIndex | None) -> frozenset[str]:
+        """Ids of counters that are new or differ from ``previous``.
+
+        Counters are compared field by field as the API (and the
+        null-value fallback) left them, so a changed price or fallback
+        flag counts as well as a new reading. Counters missing from this
+        payload aren't reported; their entities have nothing to show.
+        """
+        if previous is None:
+            return frozenset(self._by_id)
+        changed = []
+        for counter_id, reading in self._by_id.items():
+            before = previous._by_id.get(counter_id)
+            if before is None or before.counter != reading.counter:
+                changed.append(counter_id)
+        return frozenset(changed)
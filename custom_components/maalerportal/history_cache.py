@@ -0,0 +1,230 @@
+"""On-disk cache of finalized ``/readings/historical`` days.
+
+Closed periods never change upstream, yet every backfill, null-value
+fallback and cadence check used to download them again. This cache keeps
+the raw readings of fully elapsed days per installation under
+
+    <config>/maalerportal/history_cache/<installation_id>/<YYYY-MM>.json
+
+one JSON file per UTC month, next to the ReadingsLog CSVs. Days are UTC
+calendar days, matching the UTC-midnight-aligned chunk grid of
+:class:`~.history_service.HistoricalReadingsService`.
+
+Invalidation rules:
+
+* A day is only written once it is *final*: it was fetched at least
+  ``FINALIZE_AFTER`` (7 days) after it ended, and the response holds a
+  reading on that day or a later one. Grid data arrives days late and
+  the periodic statistics update re-imports the last week, so that week
+  is always fetched from the network, as is an empty tail of days that
+  may still be waiting for data.
+* Final days never expire. A day with no readings between two days
+  with readings is cached as empty.
+* Files written by another cache format version are ignored and
+  overwritten on the next store.
+* Deleting the installation's directory drops everything cached for it.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .reconcile import is_safe_installation_id
+from .timeutils import parse_api_timestamp, utc_day_start
+
+_LOGGER = logging.getLogger(__name__)
+
+_SUBDIR = "maalerportal"
+_CACHE_DIR = "history_cache"
+_CACHE_VERSION = 1
+
+# How long after a day ends before its readings are considered final:
+# the statistics re-import window, which late grid data still reaches.
+FINALIZE_AFTER = timedelta(days=7)
+_DAY = timedelta(days=1)
+# Months kept in memory after use. A 31-day chunk spans at most two, so a
+# backfill walking a year reads each month file once and keeps none of
+# the older ones around.
+_MONTHS_IN_MEMORY = 2
+
+
+def is_final(day: datetime, fetched_at: datetime) -> bool:
+    """Whether a day fetched at ``fetched_at`` can no longer be revised."""
+    return day + _DAY + FINALIZE_AFTER <= fetched_at
+
+
+def final_days(
+    readings: list[dict[str, Any]],
+    covered_from: datetime,
+    covered_until: datetime,
+    fetched_at: datetime,
+) -> list[datetime]:
+    """Whole UTC days inside ``[covered_from, covered_until)`` that are final.
+
+    ``readings`` is the response covering that range; days after its
+    newest reading are never final. Days are returned oldest first as UTC
+    midnights.
+    """
+    newest: datetime | None = None
+    for reading in readings:
+        parsed = parse_api_timestamp(reading.get("timestamp"))
+        if parsed is not None and (newest is None or parsed > newest):
+            newest = parsed
+    if newest is None:
+        return []
+    last_day = utc_day_start(newest)
+    days: list[datetime] = []
+    day = utc_day_start(covered_from)
+    if day < covered_from:
+        day += _DAY
+    while (
+        day <= last_day
+        and day + _DAY <= covered_until
+        and is_final(day, fetched_at)
+    ):
+        days.append(day)
+        day += _DAY
+    return days
+
+
+def _month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+class HistoryDayCache:
+    """Per-installation cache of finalized historical days."""
+
+    def __init__(self, hass: HomeAssistant, installation_id: str) -> None:
+        # Same guard as ReadingsLog: the id becomes a directory name.
+        if not is_safe_installation_id(installation_id):
+            raise ValueError(
+                f"Refusing unsafe installation_id for cache path: {installation_id!r}"
+            )
+        self._dir = Path(hass.config.path(_SUBDIR, _CACHE_DIR)) / installation_id
+        # Recently used months, least recent first:
+        # "YYYY-MM" -> {"YYYY-MM-DD": [reading, ...]}
+        self._months: OrderedDict[str, dict[str, list[dict[str, Any]]]] = (
+            OrderedDict()
+        )
+        self._lock = asyncio.Lock()
+
+    async def async_cached_prefix(
+        self, start: datetime, end: datetime
+    ) -> tuple[datetime, list[dict[str, Any]]]:
+        """Return cached readings for the leading run of cached days.
+
+        Walks day by day from the UTC day containing ``start`` and stops at
+        the first day that isn't cached, or once ``end`` is passed. Returns
+        that day (where a network fetch has to begin) and the readings of
+        every cached day before it.
+        """
+        day = utc_day_start(start)
+        readings: list[dict[str, Any]] = []
+        async with self._lock:
+            while day <= end:
+                month = await self._async_month(_month_key(day.date()))
+                rows = month.get(day.date().isoformat())
+                if rows is None:
+                    break
+                readings.extend(rows)
+                day += _DAY
+        return day, readings
+
+    async def async_store(
+        self,
+        readings: list[dict[str, Any]],
+        covered_from: datetime,
+        covered_until: datetime,
+        fetched_at: datetime,
+    ) -> list[datetime]:
+        """Cache the final days of a response covering ``[from, until)``.
+
+        Only whole UTC days inside the covered range that are final at
+        ``fetched_at`` are written. Returns the days stored, oldest first;
+        days of a month file that couldn't be written are left out.
+        """
+        by_day: dict[datetime, list[dict[str, Any]]] = {
+            day: []
+            for day in final_days(readings, covered_from, covered_until, fetched_at)
+        }
+        if not by_day:
+            return []
+
+        for reading in readings:
+            parsed = parse_api_timestamp(reading.get("timestamp"))
+            if parsed is None:
+                continue
+            rows = by_day.get(utc_day_start(parsed))
+            if rows is not None:
+                rows.append(reading)
+
+        async with self._lock:
+            dirty: dict[str, dict[str, list[dict[str, Any]]]] = {}
+            for day, rows in by_day.items():
+                key = _month_key(day.date())
+                month = dirty.get(key)
+                if month is None:
+                    month = dirty[key] = await self._async_month(key)
+                month[day.date().isoformat()] = rows
+            failed: set[str] = set()
+            for key, month in dirty.items():
+                try:
+                    await asyncio.to_thread(self._write_month, key, month)
+                except OSError as err:
+                    _LOGGER.warning(
+                        "Could not write history cache %s: %s",
+                        self._month_path(key),
+                        err,
+                    )
+                    # Forget the unsaved days; the file is what counts.
+                    self._months.pop(key, None)
+                    failed.add(key)
+        stored = [day for day in by_day if _month_key(day.date()) not in failed]
+        _LOGGER.debug("Cached %d final history days in %s", len(stored), self._dir)
+        return stored
+
+    async def _async_month(self, key: str) -> dict[str, list[dict[str, Any]]]:
+        month = self._months.get(key)
+        if month is None:
+            month = await asyncio.to_thread(self._read_month, key)
+            self._months[key] = month
+            while len(self._months) > _MONTHS_IN_MEMORY:
+                self._months.popitem(last=False)
+        else:
+            self._months.move_to_end(key)
+        return month
+
+    def _month_path(self, key: str) -> Path:
+        return self._dir / f"{key}.json"
+
+    def _read_month(self, key: str) -> dict[str, list[dict[str, Any]]]:
+        path = self._month_path(key)
+        if not path.exists():
+            return {}
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Ignoring unreadable history cache %s: %s", path, err)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+            return {}
+        days = data.get("days")
+        return days if isinstance(days, dict) else {}
+
+    def _write_month(self, key: str, days: dict[str, list[dict[str, Any]]]) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self._month_path(key)
+        tmp = path.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": _CACHE_VERSION, "days": days}, f)
+        # Atomic swap so a crash mid-write never leaves a torn file.
+        os.replace(tmp, path)
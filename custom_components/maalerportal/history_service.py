@@ -0,0 +1,432 @@
+"""Shared ``/readings/historical`` fetcher, one per installation.
+
+``/readings/historical`` returns every counter of an installation in a
+single response, and each StatisticSensor only keeps the rows for its own
+``meterCounterId``. Letting every sensor walk the 365-day window on its own
+meant downloading the same ~12 chunks once per counter — enough to trip the
+API's rate limit on restart for multi-counter installations.
+
+The service maps requested ranges onto a fixed 31-day grid so overlapping
+requests resolve to the same chunks. Each chunk is downloaded once, grouped
+by counter, archived to the ReadingsLog and handed to every caller that
+asked for it — including callers that arrive while the download is still
+in flight. Up to ``parallelism`` chunks are requested concurrently; a
+429 drops the service back to one request at a time for a cool-down
+period so a rate-limited account isn't hammered further.
+
+Finalized days of a chunk are served locally — from the
+:class:`~.history_cache.HistoryDayCache`, or from the ReadingsLog archive
+for final days the cache couldn't store — and only the rest is requested
+from the API. Each final day is kept in exactly one of the two.
+
+Callers pass the :class:`~.scheduler.Priority` of their fetch; chunks
+covering the last week are always requested at least at
+``Priority.STATISTICS`` so the tail of a deep backfill isn't queued
+behind other sensors' older history.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from .api import (
+    ApiError,
+    InstallationUnavailableError,
+    MaalerportalApiClient,
+    RateLimitedError,
+)
+from .history_cache import HistoryDayCache, final_days
+from .scheduler import Priority
+from .timeutils import parse_api_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+# The API rejects ranges longer than 31 days with HTTP 500.
+MAX_CHUNK_DAYS = 31
+_CHUNK_SPAN = timedelta(days=MAX_CHUNK_DAYS)
+# Chunks are aligned to a fixed grid (not to "now") so two sensors asking
+# for "the last year" a few seconds apart hit identical chunk keys.
+_GRID_ORIGIN = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Finished chunks stay in memory this long so sensors that start a few
+# seconds apart, or poll on the same interval, share one download.
+_CHUNK_MEMO_TTL = timedelta(minutes=5)
+# After a 429 the service fetches one chunk at a time for this long before
+# going back to the configured parallelism.
+_PARALLELISM_COOLDOWN = timedelta(minutes=30)
+# Chunks reaching into this recent span are incremental updates, never
+# deep backfill.
+_INCREMENTAL_SPAN = timedelta(days=7)
+
+
+def chunk_starts(start: datetime, end: datetime) -> list[datetime]:
+    """Return the grid-aligned chunk starts covering ``[start, end]``.
+
+    Ordered oldest first, the order the chunks are fetched and yielded in.
+    """
+    if end < start:
+        return []
+    first = (start - _GRID_ORIGIN) // _CHUNK_SPAN
+    last = (end - _GRID_ORIGIN) // _CHUNK_SPAN
+    return [_GRID_ORIGIN + _CHUNK_SPAN * index for index in range(first, last + 1)]
+
+
+def chunk_priority(chunk_start: datetime, priority: Priority, now: datetime) -> Priority:
+    """Return the scheduling priority for downloading one chunk."""
+    if chunk_start + _CHUNK_SPAN > now - _INCREMENTAL_SPAN:
+        return min(priority, Priority.STATISTICS)
+    return priority
+
+
+@dataclass(frozen=True)
+class HistoryChunk:
+    """Readings of one grid chunk, as yielded by ``async_iter_chunks``."""
+
+    start: datetime
+    readings: list[dict[str, Any]]
+    # 1-based position among the chunks of the fetch, oldest first.
+    index: int
+    total: int
+
+
+@dataclass
+class _Chunk:
+    """One downloaded grid chunk, grouped by counter."""
+
+    fetched_at: datetime
+    by_counter: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+
+    def readings(self, counter_id: str | None) -> list[dict[str, Any]]:
+        if counter_id is not None:
+            return self.by_counter.get(str(counter_id), [])
+        merged: list[dict[str, Any]] = []
+        for rows in self.by_counter.values():
+            merged.extend(rows)
+        return merged
+
+
+class HistoricalReadingsService:
+    """Fetches ``/readings/historical`` once per chunk for all counters."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: MaalerportalApiClient,
+        installation_id: str,
+        readings_log: Any = None,
+        parallelism: int = 1,
+        day_cache: HistoryDayCache | None = None,
+    ) -> None:
+        self._hass = hass
+        self._api_client = api_client
+        self._installation_id = installation_id
+        # Optional ReadingsLog — every downloaded chunk is archived once
+        # here instead of once per sensor.
+        self._readings_log = readings_log
+        self._day_cache = day_cache
+        self._chunks: dict[datetime, _Chunk] = {}
+        self._inflight: dict[datetime, asyncio.Task[_Chunk | None]] = {}
+        self._parallelism = max(1, int(parallelism))
+        self._sequential_until: datetime | None = None
+
+    def _current_parallelism(self) -> int:
+        """Configured parallelism, or 1 while cooling down after a 429."""
+        if self._sequential_until is not None:
+            if datetime.now(timezone.utc) < self._sequential_until:
+                return 1
+            _LOGGER.debug(
+                "Restoring history fetch parallelism %d for %s",
+                self._parallelism,
+                self._installation_id,
+            )
+            self._sequential_until = None
+        return self._parallelism
+
+    def _fall_back_to_sequential(self) -> None:
+        if self._sequential_until is None and self._parallelism > 1:
+            _LOGGER.warning(
+                "Rate limited while fetching history for %s — falling back "
+                "to one request at a time",
+                self._installation_id,
+            )
+        self._sequential_until = datetime.now(timezone.utc) + _PARALLELISM_COOLDOWN
+
+    async def async_fetch(
+        self,
+        start: datetime,
+        end: datetime,
+        counter_id: str | None = None,
+        priority: Priority = Priority.STATISTICS,
+    ) -> list[dict[str, Any]]:
+        """Return readings in ``[start, end]``, oldest chunk first.
+
+        Concatenates :meth:`async_iter_chunks`; see there for ordering,
+        error handling and ``priority``.
+        """
+        readings: list[dict[str, Any]] = []
+        async for chunk in self.async_iter_chunks(start, end, counter_id, priority):
+            readings.extend(chunk.readings)
+        return readings
+
+    async def async_iter_chunks(
+        self,
+        start: datetime,
+        end: datetime,
+        counter_id: str | None = None,
+        priority: Priority = Priority.STATISTICS,
+    ) -> AsyncIterator[HistoryChunk]:
+        """Yield readings in ``[start, end]`` one chunk at a time, oldest first.
+
+        With ``counter_id`` set only that counter's readings are yielded;
+        otherwise every counter of the installation. Each chunk is yielded
+        as soon as it is downloaded, while up to ``parallelism`` downloads
+        run ahead of it, so a consumer working chunk by chunk holds a
+        window's worth of readings rather than the whole range. The fetch
+        stops at the first chunk that fails (rate limit, timeout, HTTP
+        error); everything older has been yielded by then, so the next
+        fetch resumes without a gap. A 429 hit while fetching concurrently
+        is retried once sequentially before giving up. ``priority``
+        schedules the requests against the rest of the account's traffic.
+
+        Raises :class:`InstallationUnavailableError` on HTTP 403/404.
+        """
+        starts = chunk_starts(start, end)
+        total = len(starts)
+        window = self._current_parallelism()
+        # Downloads requested ahead of the chunk being yielded, oldest first.
+        ahead: deque[tuple[datetime, asyncio.Task[_Chunk | None]]] = deque()
+        next_index = 0
+        try:
+            for index in range(1, total + 1):
+                while next_index < total and len(ahead) < window:
+                    chunk_start = starts[next_index]
+                    ahead.append(
+                        (
+                            chunk_start,
+                            asyncio.create_task(
+                                self._async_get_chunk(chunk_start, priority)
+                            ),
+                        )
+                    )
+                    next_index += 1
+                chunk_start, task = ahead.popleft()
+                try:
+                    chunk = await task
+                except RateLimitedError:
+                    self._fall_back_to_sequential()
+                    if window == 1:
+                        _LOGGER.warning(
+                            "Rate limit exceeded during chunked history fetch "
+                            "for %s, stopping early",
+                            self._installation_id,
+                        )
+                        return
+                    # The concurrent window tripped the rate limit; continue
+                    # one chunk at a time from here on.
+                    window = 1
+                    next_index -= len(ahead)
+                    _cancel_all(ahead)
+                    try:
+                        chunk = await self._async_get_chunk(chunk_start, priority)
+                    except RateLimitedError:
+                        _LOGGER.warning(
+                            "Rate limit exceeded during chunked history fetch "
+                            "for %s, stopping early",
+                            self._installation_id,
+                        )
+                        return
+                if chunk is None:
+                    return
+                rows = chunk.readings(counter_id)
+                if chunk_start < start or chunk_start + _CHUNK_SPAN > end:
+                    rows = _clip(rows, start, end)
+                yield HistoryChunk(
+                    start=chunk_start, readings=rows, index=index, total=total
+                )
+        finally:
+            # Only the waits are cancelled; shielded downloads run on and
+            # land in the memo.
+            _cancel_all(ahead)
+
+    async def _async_get_chunk(
+        self, chunk_start: datetime, priority: Priority
+    ) -> _Chunk | None:
+        """Return a memoized chunk, join an in-flight download, or start one."""
+        now = datetime.now(timezone.utc)
+        self._prune(now)
+
+        memo = self._chunks.get(chunk_start)
+        if memo is not None:
+            return memo
+
+        task = self._inflight.get(chunk_start)
+        if task is None:
+            task = self._hass.async_create_task(
+                self._async_download(
+                    chunk_start, chunk_priority(chunk_start, priority, now)
+                ),
+                f"maalerportal history chunk {self._installation_id}",
+            )
+            self._inflight[chunk_start] = task
+            task.add_done_callback(
+                lambda _task, key=chunk_start: self._inflight.pop(key, None)
+            )
+        # Shield so one caller being cancelled (e.g. its entity is removed)
+        # doesn't abort the download for everyone else waiting on it.
+        return await asyncio.shield(task)
+
+    def _prune(self, now: datetime) -> None:
+        expired = [
+            key
+            for key, chunk in self._chunks.items()
+            if now - chunk.fetched_at > _CHUNK_MEMO_TTL
+        ]
+        for key in expired:
+            del self._chunks[key]
+
+    async def _async_download(
+        self, chunk_start: datetime, priority: Priority
+    ) -> _Chunk | None:
+        """Download one grid chunk, starting after its cached days.
+
+        Returns None when the fetch should stop, raises
+        :class:`RateLimitedError` on HTTP 429.
+        """
+        now = datetime.now(timezone.utc)
+        chunk_end = min(chunk_start + _CHUNK_SPAN - timedelta(seconds=1), now)
+
+        fetch_from = chunk_start
+        cached: list[dict[str, Any]] = []
+        if self._day_cache is not None:
+            fetch_from, cached = await self._day_cache.async_cached_prefix(
+                chunk_start, chunk_end
+            )
+        if fetch_from <= chunk_end and self._readings_log is not None:
+            # Final days the day cache couldn't take were marked archived
+            # in the ReadingsLog instead; they come back from the archive.
+            archived_until = self._readings_log.archived_prefix_end(
+                fetch_from, chunk_end
+            )
+            if archived_until > fetch_from:
+                cached += await self._readings_log.async_read_historical(
+                    fetch_from, archived_until
+                )
+                fetch_from = archived_until
+        if fetch_from > chunk_end:
+            _LOGGER.debug(
+                "Chunk %s served from local history (%d readings)",
+                chunk_start.date().isoformat(),
+                len(cached),
+            )
+            return self._remember(chunk_start, cached)
+
+        from_str = fetch_from.strftime("%Y-%m-%dT%H:%M:%SZ")
+        to_str = chunk_end.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        try:
+            data = await self._api_client.async_post(
+                f"/installations/{self._installation_id}/readings/historical",
+                {"from": from_str, "to": to_str},
+                timeout=60,
+                priority=priority,
+            )
+        except InstallationUnavailableError as err:
+            _LOGGER.warning(
+                "Installation %s no longer accessible (HTTP %s)",
+                self._installation_id,
+                err.status,
+            )
+            raise
+        except RateLimitedError:
+            raise
+        except ApiError as err:
+            _LOGGER.error(
+                "Chunked history request failed: HTTP %s (%s to %s)",
+                err.status,
+                from_str,
+                to_str,
+            )
+            return None
+        except asyncio.TimeoutError:
+            _LOGGER.warning("Timeout fetching chunk %s to %s", from_str, to_str)
+            return None
+        except aiohttp.ClientError as err:
+            _LOGGER.error("Connection error fetching chunk: %s", err)
+            return None
+
+        readings = data.get("readings", []) if isinstance(data, dict) else []
+        fetched_at = datetime.now(timezone.utc)
+        covered_days = final_days(
+            readings, fetch_from, chunk_start + _CHUNK_SPAN, fetched_at
+        )
+        if self._day_cache is not None:
+            stored = set(
+                await self._day_cache.async_store(
+                    readings, fetch_from, chunk_start + _CHUNK_SPAN, fetched_at
+                )
+            )
+            # Each final day has one home: the day cache, or else the
+            # ReadingsLog's coverage ledger.
+            covered_days = [day for day in covered_days if day not in stored]
+        chunk = self._remember(chunk_start, cached + readings)
+
+        if readings:
+            _LOGGER.info(
+                "Chunk %s → %s: %d readings across %d counters",
+                from_str,
+                to_str,
+                len(readings),
+                len(chunk.by_counter),
+            )
+        else:
+            _LOGGER.debug("Chunk %s → %s: 0 readings", from_str, to_str)
+        # Archive each historical reading once for the whole installation.
+        # Dedup in the readings_log makes overlapping chunks safe; final
+        # days the day cache couldn't store are recorded as archived so
+        # later fetches can be answered from the archive.
+        if self._readings_log is not None:
+            await self._readings_log.async_record_many(
+                readings, source="historical", covered_days=covered_days
+            )
+        return chunk
+
+    def _remember(
+        self, chunk_start: datetime, readings: list[dict[str, Any]]
+    ) -> _Chunk:
+        """Group ``readings`` by counter and memoize them as a chunk."""
+        chunk = _Chunk(fetched_at=datetime.now(timezone.utc))
+        for reading in readings:
+            counter_id = str(reading.get("meterCounterId") or "")
+            if not counter_id:
+                continue
+            chunk.by_counter.setdefault(counter_id, []).append(reading)
+        self._chunks[chunk_start] = chunk
+        return chunk
+
+
+def _cancel_all(
+    ahead: deque[tuple[datetime, asyncio.Task[_Chunk | None]]],
+) -> None:
+    while ahead:
+        _chunk_start, task = ahead.popleft()
+        task.cancel()
+
+
+def _clip(
+    rows: list[dict[str, Any]], start: datetime, end: datetime
+) -> list[dict[str, Any]]:
+    """Keep only the rows whose timestamp falls inside ``[start, end]``."""
+    clipped: list[dict[str, Any]] = []
+    for row in rows:
+        parsed = parse_api_timestamp(row.get("timestamp"))
+        if parsed is not None and start <= parsed <= end:
+            clipped.append(row)
+    return clipped
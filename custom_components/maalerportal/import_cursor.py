@@ -0,0 +1,111 @@
+"""Pure logic for delta imports of a statistic's periodic updates.
+
+Once a statistic sensor has history, each polling interval used to
+re-fetch the last seven days and hand every hourly row of them to
+``async_import_statistics`` again, although only the newest hour or two
+were new. An :class:`ImportCursor` remembers, per statistic:
+
+* ``settled`` — the newest imported row that is at least
+  ``REVISION_OVERLAP`` older than the newest imported hour. The next
+  update continues after it, seeded with its state and sum, exactly like
+  the startup backfill continues after a stored row;
+* ``digests`` — a content hash of the raw readings of every hour after
+  ``settled``. Hours inside the overlap are rebuilt on each update so a
+  late revision is picked up, but rows are only sent again from the
+  first hour whose readings changed.
+
+This module contains no Home Assistant imports so the logic can be unit
+tested in isolation.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import hashlib
+from typing import Any
+
+from .backfill import ResumePoint
+
+# Hours before the newest imported one that are rebuilt on every update.
+REVISION_OVERLAP = timedelta(hours=3)
+
+
+@dataclass(frozen=True)
+class ImportCursor:
+    """Where the next periodic update of a statistic continues."""
+
+    settled: ResumePoint
+    digests: Mapping[datetime, str] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-serialisable form for the cursor store."""
+        return {
+            "start": self.settled.start.isoformat(),
+            "state": self.settled.state,
+            "sum": self.settled.sum,
+            "digests": {
+                hour.isoformat(): digest for hour, digest in self.digests.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Any) -> ImportCursor | None:
+        """Parse :meth:`as_dict` output; None if it is malformed."""
+        if not isinstance(data, Mapping):
+            return None
+        try:
+            start = datetime.fromisoformat(data["start"])
+            digests = {
+                datetime.fromisoformat(hour): str(digest)
+                for hour, digest in (data.get("digests") or {}).items()
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+        if start.tzinfo is None or any(h.tzinfo is None for h in digests):
+            return None
+        return cls(
+            settled=ResumePoint(
+                start=start, state=data.get("state"), sum=data.get("sum")
+            ),
+            digests=digests,
+        )
+
+
+def digest_hour(raw_values: Iterable[Any]) -> str:
+    """Hash the raw values of one statistics hour, in reading order."""
+    return hashlib.blake2b(
+        "\x1f".join(repr(raw) for raw in raw_values).encode(), digest_size=8
+    ).hexdigest()
+
+
+def advance_cursor(
+    processed: Sequence[ResumePoint],
+    digests: Mapping[datetime, str],
+    previous: ImportCursor | None,
+    overlap: timedelta = REVISION_OVERLAP,
+) -> ImportCursor | None:
+    """The cursor after an update that built ``processed`` rows.
+
+    ``processed`` holds every row the update built, sent or not, oldest
+    first. Returns ``previous`` when no row is old enough to settle.
+    """
+    if not processed:
+        return previous
+    limit = processed[-1].start - overlap
+    settled: ResumePoint | None = None
+    for point in processed:
+        if point.start > limit:
+            break
+        # Of several rows in one hour, the last one is what gets stored.
+        settled = point
+    if settled is None:
+        if previous is None:
+            return None
+        settled = previous.settled
+    return ImportCursor(
+        settled=settled,
+        digests={
+            hour: digest for hour, digest in digests.items() if hour > settled.start
+        },
+    )
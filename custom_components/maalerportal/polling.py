@@ -0,0 +1,68 @@
+"""Cadence-aware scheduling of the coordinator's ``/readings/latest`` poll.
+
+Meters don't report on our clock: an hourly meter polled every 30
+minutes answers the same reading every other poll, and a data-logger
+that uploads once a day answers it 47 times out of 48. With adaptive
+polling the coordinator uses the reporting cadence the stale monitor
+learned from ``/readings/historical`` and the report lag it observed
+itself to poll shortly after the next reading is expected to show up:
+
+* meters that report slower than the configured interval are polled
+  once per expected report, at most ``MAX_POLL_DELAY`` apart;
+* meters that report faster are still polled no more often than the
+  configured interval, but right after a report instead of at a random
+  phase;
+* once an expected report is overdue, or while no cadence is known,
+  the configured interval applies.
+
+This module contains no Home Assistant imports so the logic can be unit
+tested in isolation.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+import math
+
+# Shortest delay we schedule when aligning with a slow meter.
+MIN_POLL_DELAY = timedelta(minutes=2)
+# Longest delay between two polls, however sparse the meter.
+MAX_POLL_DELAY = timedelta(hours=6)
+# Slack after the expected arrival, so the poll doesn't race the upload.
+ARRIVAL_GRACE = timedelta(minutes=2)
+
+
+def estimate_report_lag(lags: Iterable[timedelta]) -> timedelta:
+    """Best estimate of the delay between a meter reading and the API.
+
+    Every observed lag also includes however late our poll came, so the
+    smallest sample is the closest to the upstream lag.
+    """
+    return max(min(lags, default=timedelta(0)), timedelta(0))
+
+
+def next_poll_delay(
+    *,
+    base_interval: timedelta,
+    cadence: timedelta | None,
+    last_reading: datetime | None,
+    now: datetime,
+    report_lag: timedelta = timedelta(0),
+) -> timedelta:
+    """Delay until the poll that should pick up the next reading.
+
+    ``last_reading`` is the freshest upstream timestamp of the
+    installation and ``cadence`` the meter's typical reporting interval.
+    Falls back to ``base_interval`` when either is unknown or the next
+    reading is already overdue.
+    """
+    if cadence is None or last_reading is None or cadence <= timedelta(0):
+        return base_interval
+    arrival = last_reading + cadence + report_lag + ARRIVAL_GRACE
+    if arrival <= now:
+        return base_interval
+    # Fast meters aren't polled more often than configured, only aligned.
+    min_delay = base_interval if cadence < base_interval else MIN_POLL_DELAY
+    if arrival - now < min_delay:
+        arrival += cadence * math.ceil((min_delay - (arrival - now)) / cadence)
+    return min(arrival - now, MAX_POLL_DELAY)
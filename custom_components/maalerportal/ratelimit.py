@@ -0,0 +1,120 @@
+"""Adaptive request-rate control for one Målerportal account.
+
+The API rate-limits per API key, and live polling, history backfill and
+cadence lookups all spend the same budget. :class:`AimdRateLimiter` is a
+token bucket shared by every request of a config entry whose refill rate
+follows AIMD (additive increase, multiplicative decrease):
+
+* every successful request raises the rate by ``increase`` requests per
+  second, up to ``max_rate``;
+* a 429 halves it (``decrease``), down to ``min_rate``, empties the
+  bucket and, when the server sent ``Retry-After``, pauses every request
+  until then.
+
+Concurrent requests that are rate limited together count as one event:
+further cuts are ignored for ``DECREASE_HOLDOFF`` so a burst of 429s
+doesn't collapse the rate to the floor. Over time the rate settles just
+below what the account can sustain instead of alternating between
+bursts and lock-outs.
+
+This module contains no Home Assistant imports so the logic can be unit
+tested in isolation; the clock and sleep function are injectable.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import time
+
+DEFAULT_RATE = 2.0
+MIN_RATE = 0.1
+MAX_RATE = 10.0
+DEFAULT_BURST = 5.0
+DEFAULT_INCREASE = 0.1
+DEFAULT_DECREASE = 0.5
+# Seconds after a cut during which further 429s don't cut again.
+DECREASE_HOLDOFF = 2.0
+# Refill rounding slack, so a wait never shrinks to a no-op sleep.
+_EPSILON = 1e-9
+
+
+class AimdRateLimiter:
+    """Token bucket with an AIMD-adjusted refill rate (requests/second)."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        *,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        burst: float = DEFAULT_BURST,
+        increase: float = DEFAULT_INCREASE,
+        decrease: float = DEFAULT_DECREASE,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._rate = min(max(rate, min_rate), max_rate)
+        self._burst = max(1.0, burst)
+        self._increase = increase
+        self._decrease = decrease
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self._burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._last_cut: float | None = None
+        # Waiters are served one at a time, in arrival order.
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Current refill rate in requests per second."""
+        return self._rate
+
+    def delay(self) -> float:
+        """Seconds until the next token is available (0 if one is)."""
+        now = self._refill()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1 - _EPSILON:
+            return 0.0
+        return (1 - self._tokens) / self._rate
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now."""
+        if self.delay() > 0:
+            return False
+        self._tokens = max(0.0, self._tokens - 1)
+        return True
+
+    async def async_acquire(self) -> None:
+        """Wait for a token and take it."""
+        async with self._lock:
+            while not self.try_acquire():
+                await self._sleep(self.delay())
+
+    def on_success(self) -> None:
+        """Additive increase after a request that wasn't rate limited."""
+        self._rate = min(self._max_rate, self._rate + self._increase)
+
+    def on_rate_limited(self, retry_after: float | None = None) -> None:
+        """Multiplicative decrease after a 429."""
+        now = self._refill()
+        if self._last_cut is None or now - self._last_cut >= DECREASE_HOLDOFF:
+            self._rate = max(self._min_rate, self._rate * self._decrease)
+            self._last_cut = now
+        self._tokens = 0.0
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _refill(self) -> float:
+        now = self._clock()
+        # Nothing accrues during a Retry-After pause, so it doesn't end in
+        # a full burst.
+        elapsed = now - max(self._updated, self._paused_until)
+        if elapsed > 0:
+            self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+        self._updated = now
+        return now
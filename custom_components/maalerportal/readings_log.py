@@ -1,7 +1,7 @@
-"""Append-only CSV log of every meter reading we observe.
+"""Append-only log of every meter reading we observe.
 
-One file per installation under ``<config>/maalerportal/<installation_id>.csv``,
-with a header row and columns:
+One archive per installation under ``<config>/maalerportal/``. By default
+that's ``<installation_id>.csv``, with a header row and columns:
 
     timestamp,counter_type,meter_counter_id,value,unit,source
 
@@ -13,53 +13,139 @@ with a header row and columns:
   StatisticSensor or fetch-more-history button).
 
 Writes are deduplicated on ``(meter_counter_id, timestamp)`` so re-fetches
-of the same period don't grow the file. The dedup set is loaded once at
-startup from the existing file so reloads don't re-write old rows.
+of the same period don't grow the file. Deduplication is the storage
+engine's job; neither engine reads the whole archive at startup.
+
+A sidecar ``<installation_id>.coverage.json`` records the UTC days whose
+complete, finalized ``/readings/historical`` response has been archived
+but isn't held by the :class:`~.history_cache.HistoryDayCache`. For those
+days the CSV is as good as the API, so the history service reads them
+back from here instead of downloading them again.
 
 The file lives on the user's filesystem and is meant for archival /
 external analysis — tail it, grep it, import to a spreadsheet etc.
+
+The same rows can instead be kept in an indexed SQLite database
+(``<installation_id>.sqlite``); see :mod:`.readings_store`. The public API
+below is identical for both engines.
 """
 from __future__ import annotations
 
 import asyncio
-import csv
+import json
 import logging
-from datetime import datetime, timezone
+import os
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+import sqlite3
+import sys
+from typing import Any, Iterable
 
 from homeassistant.core import HomeAssistant
 
-from .const import RECENT_BUFFER_SIZE
+from .const import (
+    READINGS_LOG_BACKEND_CSV,
+    READINGS_LOG_BACKEND_SQLITE,
+    RECENT_BUFFER_SIZE,
+)
+from .readings_store import (
+    CANONICAL_FORMAT,
+    HEADER,
+    CsvReadingsStore,
+    SqliteReadingsStore,
+    normalize_timestamp,
+)
 from .reconcile import is_safe_installation_id
+from .timeutils import parse_api_timestamp, utc_day_start
+from .usage import UsageAggregate
 
 _LOGGER = logging.getLogger(__name__)
 
 _SUBDIR = "maalerportal"
-_HEADER = ["timestamp", "counter_type", "meter_counter_id", "value", "unit", "source"]
+_COVERAGE_VERSION = 1
+
+_STORES = {
+    READINGS_LOG_BACKEND_CSV: CsvReadingsStore,
+    READINGS_LOG_BACKEND_SQLITE: SqliteReadingsStore,
+}
+# Errors a storage engine can raise on I/O.
+_STORE_ERRORS = (OSError, sqlite3.Error)
 
 
-def _normalize_timestamp(ts: str) -> str:
-    """Canonicalize any ISO-8601 timestamp to UTC with .000Z suffix.
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
 
-    The Målerportal API returns the same physical moment in two
-    different ISO formats depending on endpoint: ``/readings/latest``
-    uses UTC (``...T17:00:00.000Z``) while ``/readings/historical``
-    uses local time (``...T19:00:00.000+02:00``). Without normalization
-    the dedup key sees them as different rows and both end up in the
-    log — surfacing as visible duplicates in cards. Normalizing to a
-    single canonical form fixes both dedup and sorting.
+
+class _RecentRow:
+    """One row of the recent buffer.
+
+    Slotted, with the few distinct counter ids, types, units and sources
+    interned, so the 1500-row ring doesn't carry a dict per row.
     """
-    try:
-        parsed = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-    except (ValueError, TypeError, AttributeError):
-        return ts  # leave unparseable strings alone
-    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    __slots__ = (
+        "timestamp",
+        "counter_type",
+        "meter_counter_id",
+        "value",
+        "unit",
+        "source",
+    )
+
+    def __init__(
+        self,
+        timestamp: str,
+        counter_type: str,
+        meter_counter_id: str,
+        value: Any,
+        unit: str,
+        source: str,
+    ) -> None:
+        self.timestamp = timestamp
+        self.counter_type = _intern(counter_type)
+        self.meter_counter_id = _intern(meter_counter_id)
+        self.value = value
+        self.unit = _intern(unit)
+        self.source = _intern(source)
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> _RecentRow:
+        return cls(
+            row.get("timestamp") or "",
+            row.get("counter_type") or "",
+            row.get("meter_counter_id") or "",
+            row.get("value"),
+            row.get("unit") or "",
+            row.get("source") or "",
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {field: getattr(self, field) for field in HEADER}
+
+    def csv_row(self) -> list[str]:
+        return [
+            self.timestamp,
+            self.counter_type,
+            self.meter_counter_id,
+            str(self.value),
+            self.unit,
+            self.source,
+        ]
+
+
+def _timestamp_of(row: _RecentRow) -> str:
+    return row.timestamp
+
 
 class ReadingsLog:
-    """Per-installation CSV append-only log."""
+    """Per-installation append-only log."""
 
-    def __init__(self, hass: HomeAssistant, installation_id: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        installation_id: str,
+        backend: str = READINGS_LOG_BACKEND_CSV,
+    ) -> None:
         # installation_id is API-supplied and goes straight into a file path.
         # Reject anything that isn't a plain UUID-style token so a malicious or
         # compromised upstream can't traverse out of the log directory or write
@@ -69,17 +155,23 @@ class ReadingsLog:
                 f"Refusing unsafe installation_id for log path: {installation_id!r}"
             )
         self._dir = Path(hass.config.path(_SUBDIR))
-        self._path = self._dir / f"{installation_id}.csv"
+        store_class = _STORES.get(backend, CsvReadingsStore)
+        self._store = store_class(self._dir, installation_id)
+        self._path = self._store.path
         # Defense in depth: ensure the resolved path stays inside the log dir.
         if self._path.resolve().parent != self._dir.resolve():
             raise ValueError(
                 f"Refusing out-of-directory log path for installation "
                 f"{installation_id!r}"
             )
-        self._known: set[tuple[str, str]] = set()
-        # Last N rows in memory — populated from the CSV tail at load
+        self._coverage_path = self._store.coverage_path
+        # UTC days whose full historical response is in the archive.
+        self._covered: set[date] = set()
+        # Last N rows in memory — populated from the archive tail at load
         # and updated as new rows are written. Sorted oldest-first.
-        self._recent: list[dict[str, Any]] = []
+        self._recent: list[_RecentRow] = []
+        # Rolling hourly usage per counter, updated as rows are written.
+        self._usage: dict[str, UsageAggregate] = {}
         self._lock = asyncio.Lock()
         self._loaded = False
 
@@ -88,117 +180,30 @@ class ReadingsLog:
         return self._path
 
     async def async_load(self) -> None:
-        """Initialize file (creates header if missing) and load existing keys."""
-        await asyncio.to_thread(self._init_file_if_missing)
-        self._known, self._recent, needs_rewrite = await asyncio.to_thread(
-            self._read_existing
-        )
-        if needs_rewrite:
-            # Old CSV had timestamps in mixed timezone formats (e.g. one
-            # row in UTC ...Z and another in CEST ...+02:00 for the same
-            # moment). Normalize and dedup the file once.
-            await asyncio.to_thread(self._rewrite_normalized)
-            # Re-read the cleaned file so in-memory state matches disk.
-            self._known, self._recent, _ = await asyncio.to_thread(self._read_existing)
-            _LOGGER.info(
-                "Migrated readings log %s to canonical UTC timestamps "
-                "(now %d unique rows)",
-                self._path,
-                len(self._known),
-            )
+        """Open the archive (creating it if missing) and load its newest rows."""
+        try:
+            await asyncio.to_thread(self._store.prepare)
+            rows = await asyncio.to_thread(self._store.load)
+        except _STORE_ERRORS as err:
+            _LOGGER.warning("Could not open readings log %s: %s", self._path, err)
+            return
+        self._recent = [_RecentRow.from_row(row) for row in rows]
+        self._usage = {}
+        self._track_usage(self._recent)
+        self._covered = await asyncio.to_thread(self._read_coverage)
         self._loaded = True
         _LOGGER.debug(
-            "Loaded readings log %s with %d existing rows (%d in recent buffer)",
+            "Loaded readings log %s (%d rows in recent buffer, %d archived "
+            "days)",
             self._path,
-            len(self._known),
             len(self._recent),
+            len(self._covered),
         )
 
-    def _init_file_if_missing(self) -> None:
-        self._dir.mkdir(parents=True, exist_ok=True)
-        if not self._path.exists():
-            with self._path.open("w", encoding="utf-8", newline="") as f:
-                csv.writer(f).writerow(_HEADER)
-
-    def _read_existing(
-        self,
-    ) -> tuple[set[tuple[str, str]], list[dict[str, Any]], bool]:
-        """Scan the CSV once to populate both the dedup key set and the
-        recent-rows ring buffer.
-
-        Returns ``(keys, recent, needs_rewrite)``.  ``needs_rewrite`` is
-        True if any timestamp in the file isn't in canonical UTC ISO-Z
-        form — the caller should call :py:meth:`_rewrite_normalized`
-        to migrate the file.
-        """
-        keys: set[tuple[str, str]] = set()
-        rows: list[dict[str, Any]] = []
-        needs_rewrite = False
-        if not self._path.exists():
-            return keys, rows, needs_rewrite
-        try:
-            with self._path.open("r", encoding="utf-8", newline="") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    cid = row.get("meter_counter_id")
-                    ts = row.get("timestamp")
-                    if not (cid and ts):
-                        continue
-                    norm_ts = _normalize_timestamp(ts)
-                    if norm_ts != ts:
-                        needs_rewrite = True
-                    key = (cid, norm_ts)
-                    if key in keys:
-                        # Already seen the canonical version of this
-                        # row in another (timezone-shifted) form.
-                        needs_rewrite = True
-                        continue
-                    keys.add(key)
-                    new_row = dict(row)
-                    new_row["timestamp"] = norm_ts
-                    rows.append(new_row)
-        except OSError as err:
-            _LOGGER.warning("Could not read readings log %s: %s", self._path, err)
-        rows.sort(key=lambda r: r.get("timestamp", ""))
-        return keys, rows[-RECENT_BUFFER_SIZE:], needs_rewrite
-
-    def _rewrite_normalized(self) -> None:
-        """One-time migration: rewrite the CSV with canonical UTC
-        timestamps and dedup any rows that map to the same canonical
-        form (e.g. one row in CEST and one in UTC for the same moment).
-        """
-        if not self._path.exists():
-            return
-        try:
-            with self._path.open("r", encoding="utf-8", newline="") as f:
-                reader = csv.DictReader(f)
-                source_rows = [dict(r) for r in reader]
-        except OSError as err:
-            _LOGGER.warning("Could not read %s for rewrite: %s", self._path, err)
-            return
-        seen: set[tuple[str, str]] = set()
-        deduped: list[dict[str, Any]] = []
-        for row in source_rows:
-            cid = row.get("meter_counter_id")
-            ts = row.get("timestamp")
-            if not (cid and ts):
-                continue
-            norm_ts = _normalize_timestamp(ts)
-            key = (cid, norm_ts)
-            if key in seen:
-                continue
-            seen.add(key)
-            row["timestamp"] = norm_ts
-            deduped.append(row)
-        deduped.sort(key=lambda r: r.get("timestamp", ""))
-        try:
-            with self._path.open("w", encoding="utf-8", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=_HEADER)
-                writer.writeheader()
-                for row in deduped:
-                    writer.writerow({k: row.get(k, "") for k in _HEADER})
-        except OSError as err:
-            _LOGGER.warning("Could not rewrite %s: %s", self._path, err)
+    async def async_close(self) -> None:
+        """Release the storage engine (e.g. the SQLite connection)."""
+        self._loaded = False
+        await asyncio.to_thread(self._store.close)
 
     async def async_record(
         self,
@@ -210,61 +215,87 @@ class ReadingsLog:
         unit: str = "",
         source: str = "latest",
     ) -> bool:
-        """Append one reading if it isn't already in the file.
+        """Append one reading if it isn't already in the archive.
 
         Returns True on a new write, False on duplicate / invalid input.
         """
+        written = await self._async_write(
+            [(timestamp, counter_type, meter_counter_id, value, unit, source)]
+        )
+        return bool(written)
+
+    async def _async_write(
+        self, readings: list[tuple[str, str, str, Any, str, str]]
+    ) -> int | None:
+        """Dedup ``readings`` and append the new ones in one executor job.
+
+        Each reading is ``(timestamp, counter_type, meter_counter_id,
+        value, unit, source)``. Returns the number of rows written, or
+        None if nothing could be written (log not loaded, I/O error).
+        """
         if not self._loaded:
-            return False
-        if not timestamp or not meter_counter_id or value is None:
-            return False
-        # Canonicalize the timestamp so the same physical moment received
-        # via different endpoints (UTC vs local-tz) maps to one row.
-        norm_ts = _normalize_timestamp(timestamp)
-        key = (meter_counter_id, norm_ts)
-        if key in self._known:
-            return False
+            return None
+        pending: dict[tuple[str, str], _RecentRow] = {}
+        for timestamp, counter_type, meter_counter_id, value, unit, source in readings:
+            if not timestamp or not meter_counter_id or value is None:
+                continue
+            # Canonicalize the timestamp so the same physical moment received
+            # via different endpoints (UTC vs local-tz) maps to one row.
+            norm_ts = normalize_timestamp(timestamp)
+            key = (meter_counter_id, norm_ts)
+            if key in pending:
+                continue
+            pending[key] = _RecentRow(
+                norm_ts, counter_type or "", meter_counter_id, value, unit or "", source
+            )
+        if not pending:
+            return 0
+
         async with self._lock:
-            # Re-check inside the lock to avoid a race on concurrent records.
-            if key in self._known:
-                return False
+            entries = list(pending.values())
             try:
-                await asyncio.to_thread(
-                    self._append_row,
-                    [
-                        norm_ts,
-                        counter_type or "",
-                        meter_counter_id,
-                        str(value),
-                        unit or "",
-                        source,
-                    ],
+                inserted = await asyncio.to_thread(
+                    self._append_rows,
+                    [entry.csv_row() for entry in entries],
                 )
-            except OSError as err:
+            except _STORE_ERRORS as err:
                 _LOGGER.warning(
                     "Could not append to readings log %s: %s", self._path, err
                 )
-                return False
-            self._known.add(key)
+                return None
+            # The engine reports rows already in the archive as not inserted.
+            new_entries = [entry for entry, ok in zip(entries, inserted) if ok]
             # Mirror to in-memory buffer (kept sorted oldest-first, capped).
-            self._recent.append({
-                "timestamp": norm_ts,
-                "counter_type": counter_type or "",
-                "meter_counter_id": meter_counter_id,
-                "value": value,
-                "unit": unit or "",
-                "source": source,
-            })
+            # Historical bulk imports often arrive out of order, so sort once
+            # per batch before trimming.
+            self._track_usage(new_entries)
+            self._recent.extend(new_entries)
+            self._recent.sort(key=_timestamp_of)
             if len(self._recent) > RECENT_BUFFER_SIZE:
-                # Re-sort defensively in case out-of-order records arrived
-                # (historical bulk imports often do).
-                self._recent.sort(key=lambda r: r.get("timestamp", ""))
                 del self._recent[: len(self._recent) - RECENT_BUFFER_SIZE]
-        return True
+        return len(new_entries)
+
+    def _append_rows(self, rows: list[list[str]]) -> list[bool]:
+        return self._store.append_many(rows)
 
-    def _append_row(self, row: list[str]) -> None:
-        with self._path.open("a", encoding="utf-8", newline="") as f:
-            csv.writer(f).writerow(row)
+    def _track_usage(self, rows: Iterable[_RecentRow]) -> None:
+        for row in rows:
+            moment = parse_api_timestamp(row.timestamp)
+            if moment is None:
+                continue
+            usage = self._usage.get(row.meter_counter_id)
+            if usage is None:
+                usage = self._usage[row.meter_counter_id] = UsageAggregate()
+            usage.add(moment, row.value, row.unit)
+
+    def usage_hourly(self, counter_id: str) -> dict[datetime, float]:
+        """Liters per UTC hour of ``counter_id`` over the usage window.
+
+        Maintained incrementally from every recorded row, so this is
+        cheap enough to call on each state write.
+        """
+        usage = self._usage.get(counter_id)
+        return usage.hourly() if usage is not None else {}
 
     def recent_readings(
         self,
@@ -276,38 +307,157 @@ class ReadingsLog:
 
         If ``counter_id`` is given, filter to that counter only —
         useful for cards that show one meter type at a time. Rows
-        are returned sorted oldest-first to match the CSV order;
+        are returned sorted oldest-first to match the archive order;
         callers can reverse if they want newest-first display.
         """
-        sorted_recent = sorted(self._recent, key=lambda r: r.get("timestamp", ""))
-        if counter_id:
-            sorted_recent = [
-                r for r in sorted_recent if r.get("meter_counter_id") == counter_id
-            ]
-        return sorted_recent[-n:]
+        if n <= 0:
+            return []
+        if not counter_id:
+            return [r.as_dict() for r in self._recent[-n:]]
+        # The buffer is kept sorted; walk back from the newest row.
+        newest: list[dict[str, Any]] = []
+        for r in reversed(self._recent):
+            if r.meter_counter_id == counter_id:
+                newest.append(r.as_dict())
+                if len(newest) == n:
+                    break
+        newest.reverse()
+        return newest
 
     async def async_record_many(
         self,
         readings: list[dict[str, Any]],
         *,
         source: str = "historical",
+        covered_days: Iterable[datetime] = (),
     ) -> int:
         """Bulk record readings from a /readings/historical response.
 
         Each reading dict is expected to have keys ``timestamp``,
         ``meterCounterId``, ``value`` (and optionally ``unit``,
         ``counterType``). Returns the number of new rows actually written.
+
+        The whole batch is deduplicated in memory and written in a single
+        executor job. ``covered_days`` (UTC midnights) are the finalized
+        days this response fully covers; they're added to the coverage
+        ledger once the batch is safely on disk.
         """
-        written = 0
-        for r in readings:
-            ok = await self.async_record(
-                timestamp=r.get("timestamp", ""),
-                counter_type=r.get("counterType", ""),
-                meter_counter_id=r.get("meterCounterId", ""),
-                value=r.get("value"),
-                unit=r.get("unit", ""),
-                source=source,
-            )
-            if ok:
-                written += 1
+        written = await self._async_write(
+            [
+                (
+                    r.get("timestamp", ""),
+                    r.get("counterType", ""),
+                    r.get("meterCounterId", ""),
+                    r.get("value"),
+                    r.get("unit", ""),
+                    source,
+                )
+                for r in readings
+            ]
+        )
+        if written is None:
+            return 0
+        days = {day.date() for day in covered_days}
+        if days and not days <= self._covered:
+            self._covered |= days
+            try:
+                await asyncio.to_thread(self._write_coverage, sorted(self._covered))
+            except OSError as err:
+                _LOGGER.warning(
+                    "Could not write coverage ledger %s: %s",
+                    self._coverage_path,
+                    err,
+                )
         return written
+
+    def archived_prefix_end(self, start: datetime, end: datetime) -> datetime:
+        """Return the first uncovered UTC day from ``start``'s day onwards.
+
+        Walks the coverage ledger day by day and stops at the first day
+        that isn't archived, or once ``end`` is passed.
+        """
+        day = utc_day_start(start)
+        while day <= end and day.date() in self._covered:
+            day += timedelta(days=1)
+        return day
+
+    async def async_read_historical(
+        self, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Return archived rows with ``start <= timestamp < end``.
+
+        Rows of every source are returned: the archive deduplicates on
+        ``(meter_counter_id, timestamp)``, so a historical reading that a
+        live poll logged first is stored under that poll's source, and a
+        covered day is only complete with those rows included.
+
+        Rows are shaped like ``/readings/historical`` readings
+        (``timestamp``, ``meterCounterId``, ``counterType``, ``value``,
+        ``unit``) and sorted oldest first.
+        """
+        try:
+            rows = await asyncio.to_thread(
+                self._store.read_range,
+                start.astimezone(timezone.utc).strftime(CANONICAL_FORMAT),
+                end.astimezone(timezone.utc).strftime(CANONICAL_FORMAT),
+            )
+        except _STORE_ERRORS as err:
+            _LOGGER.warning("Could not read readings log %s: %s", self._path, err)
+            return []
+        readings: list[dict[str, Any]] = []
+        for row in rows:
+            value: Any = row.get("value")
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                pass
+            readings.append({
+                "timestamp": row["timestamp"],
+                "meterCounterId": row.get("meter_counter_id", ""),
+                "counterType": row.get("counter_type", ""),
+                "value": value,
+                "unit": row.get("unit", ""),
+            })
+        return readings
+
+    def _read_coverage(self) -> set[date]:
+        if not self._coverage_path.exists():
+            return set()
+        try:
+            with self._coverage_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _COVERAGE_VERSION:
+                return set()
+            covered: set[date] = set()
+            for first, last in data.get("ranges", []):
+                day = date.fromisoformat(first)
+                last_day = date.fromisoformat(last)
+                while day <= last_day:
+                    covered.add(day)
+                    day += timedelta(days=1)
+            return covered
+        except (OSError, ValueError, TypeError, AttributeError) as err:
+            _LOGGER.warning(
+                "Ignoring unreadable coverage ledger %s: %s",
+                self._coverage_path,
+                err,
+            )
+            return set()
+
+    def _write_coverage(self, days: list[date]) -> None:
+        # Stored as inclusive [first, last] runs of consecutive days.
+        ranges: list[list[str]] = []
+        run_start = previous = None
+        for day in days:
+            if previous is not None and day - previous == timedelta(days=1):
+                previous = day
+                continue
+            if run_start is not None:
+                ranges.append([run_start.isoformat(), previous.isoformat()])
+            run_start = previous = day
+        if run_start is not None:
+            ranges.append([run_start.isoformat(), previous.isoformat()])
+        tmp = self._coverage_path.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": _COVERAGE_VERSION, "ranges": ranges}, f)
+        os.replace(tmp, self._coverage_path)
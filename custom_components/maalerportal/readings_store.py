@@ -0,0 +1,583 @@
+"""Storage engines behind :class:`~.readings_log.ReadingsLog`.
+
+Two interchangeable engines, selected by the *Readings archive format*
+option:
+
+* :class:`CsvReadingsStore` — the original append-only
+  ``<installation_id>.csv``. Human-readable and grep-able. Startup only
+  reads the tail of the file and deduplication keeps a recent window of
+  keys in memory.
+* :class:`SqliteReadingsStore` — ``<installation_id>.sqlite`` with a
+  ``(meter_counter_id, timestamp)`` primary key. The database does the
+  deduplication and the startup load only reads the newest rows, so load
+  time and memory don't grow with the archive. On first use it imports
+  the existing CSV once; the CSV is left in place as a frozen copy.
+
+Every method does blocking I/O and is meant to run in an executor job.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+import csv
+import heapq
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+from pathlib import Path
+import shutil
+import sqlite3
+import sys
+import threading
+from typing import Any, Iterable
+
+from .const import RECENT_BUFFER_SIZE
+from .timeutils import parse_api_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+HEADER = ["timestamp", "counter_type", "meter_counter_id", "value", "unit", "source"]
+CANONICAL_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+# How far back from the newest reading the CSV engine keeps dedup keys
+# in memory. Live polls and the open tail of backfills land in here.
+DEDUP_WINDOW = timedelta(days=7)
+_TAIL_BLOCK = 64 * 1024
+_HEAD_CHECK_ROWS = 50
+
+
+def normalize_timestamp(ts: str) -> str:
+    """Canonicalize any ISO-8601 timestamp to UTC with .000Z suffix.
+
+    The Målerportal API returns the same physical moment in two
+    different ISO formats depending on endpoint: ``/readings/latest``
+    uses UTC (``...T17:00:00.000Z``) while ``/readings/historical``
+    uses local time (``...T19:00:00.000+02:00``). Without normalization
+    the dedup key sees them as different rows and both end up in the
+    log — surfacing as visible duplicates in cards. Normalizing to a
+    single canonical form fixes both dedup and sorting.
+    """
+    if _is_canonical(ts):
+        # Already canonical (the archive's own rows and /readings/latest);
+        # reformatting would return the same string.
+        return ts
+    parsed = parse_api_timestamp(ts)
+    if parsed is None:
+        return ts  # leave unparseable strings alone
+    return parsed.astimezone(timezone.utc).strftime(CANONICAL_FORMAT)
+
+
+def _is_canonical(ts: Any) -> bool:
+    return (
+        isinstance(ts, str)
+        and len(ts) == 24
+        and ts[10] == "T"
+        and ts.endswith(".000Z")
+    )
+
+
+class ReadingKeyIndex:
+    """Compact set of ``(meter_counter_id, timestamp)`` keys.
+
+    Counter ids are interned to small ints and each counter's timestamps
+    are kept as epoch seconds in a sorted ``array``, so a key costs
+    8 bytes instead of a tuple of two strings (~200 bytes). Timestamps
+    that aren't canonical UTC fall back to a plain set.
+    """
+
+    __slots__ = ("_slots", "_columns", "_other", "_size")
+
+    def __init__(self, keys: Iterable[tuple[str, str]] = ()) -> None:
+        self._slots: dict[str, int] = {}
+        self._columns: list[array[int]] = []
+        self._other: set[tuple[str, str]] = set()
+        self._size = 0
+        self.update(keys)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        counter_id, timestamp = key
+        seconds = _epoch_seconds(timestamp)
+        if seconds is None:
+            return key in self._other
+        slot = self._slots.get(counter_id)
+        if slot is None:
+            return False
+        column = self._columns[slot]
+        i = bisect_left(column, seconds)
+        return i < len(column) and column[i] == seconds
+
+    def add(self, key: tuple[str, str]) -> None:
+        counter_id, timestamp = key
+        seconds = _epoch_seconds(timestamp)
+        if seconds is None:
+            if key not in self._other:
+                self._other.add(key)
+                self._size += 1
+            return
+        column = self._column(counter_id)
+        # Live rows arrive in order, so this is usually an append.
+        i = bisect_left(column, seconds)
+        if i < len(column) and column[i] == seconds:
+            return
+        column.insert(i, seconds)
+        self._size += 1
+
+    def update(self, keys: Iterable[tuple[str, str]]) -> None:
+        """Add many keys, sorting each counter's column once."""
+        added: dict[str, array[int]] = {}
+        for key in keys:
+            seconds = _epoch_seconds(key[1])
+            if seconds is None:
+                self._other.add(key)
+                continue
+            column = added.get(key[0])
+            if column is None:
+                column = added[key[0]] = array("q")
+            column.append(seconds)
+        for counter_id, column in added.items():
+            slot = self._slots.get(counter_id)
+            if slot is None:
+                self._column(counter_id)
+                slot = self._slots[counter_id]
+            merged = array("q", sorted(set(self._columns[slot]).union(column)))
+            self._columns[slot] = merged
+        self._size = len(self._other) + sum(len(c) for c in self._columns)
+
+    def _column(self, counter_id: str) -> array[int]:
+        slot = self._slots.get(counter_id)
+        if slot is None:
+            slot = self._slots[sys.intern(counter_id)] = len(self._columns)
+            self._columns.append(array("q"))
+        return self._columns[slot]
+
+
+def _epoch_seconds(timestamp: str) -> int | None:
+    """Epoch seconds of a canonical UTC timestamp; None for anything else."""
+    if len(timestamp) != 24 or not timestamp.endswith(".000Z"):
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp[:19])
+    except ValueError:
+        return None
+    return int(parsed.replace(tzinfo=timezone.utc).timestamp())
+
+
+class CsvReadingsStore:
+    """Append-only CSV, one file per installation.
+
+    Startup only parses the tail of the file: blocks are read backwards
+    from the end until the rows cover ``RECENT_BUFFER_SIZE`` and the
+    ``DEDUP_WINDOW`` before the newest reading. That relies on the file
+    being in timestamp order, give or take one ``DEDUP_WINDOW``. A
+    ``<installation_id>.csv.sorted`` marker records that it is; appending
+    rows older than that (a backfill of older history) removes it, and
+    the next load rewrites the file sorted before reading its tail.
+
+    Deduplication then works in three tiers:
+
+    * a row newer than its counter's high-water mark is new;
+    * a row inside the window is checked against the window's keys;
+    * an older row builds the full key index on first need (one scan,
+      kept for the session). Only backfills of days the archive
+      predates take this path.
+    """
+
+    def __init__(self, directory: Path, installation_id: str) -> None:
+        self.path = directory / f"{installation_id}.csv"
+        self.coverage_path = directory / f"{installation_id}.coverage.json"
+        # Present while no row trails the newest one by more than
+        # DEDUP_WINDOW in file order.
+        self._sorted_path = directory / f"{installation_id}.csv.sorted"
+        self._sorted = False
+        # Newest canonical timestamp per counter.
+        self._high_water: dict[str, str] = {}
+        # Rows at or after this timestamp are all in ``_window``.
+        self._window_start = ""
+        self._window = ReadingKeyIndex()
+        # Every key in the file; built lazily for out-of-window rows.
+        self._index: ReadingKeyIndex | None = None
+
+    def prepare(self) -> None:
+        """Create the file with a header row if it doesn't exist yet."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            with self.path.open("w", encoding="utf-8", newline="") as f:
+                csv.writer(f).writerow(HEADER)
+            self._sorted_path.touch()
+
+    def load(self) -> list[dict[str, Any]]:
+        """Read the file's tail and return the newest rows, oldest first.
+
+        Rewrites a file with rows out of timestamp order, or with
+        mixed-timezone timestamps, on the way.
+        """
+        self._sorted = self._sorted_path.exists()
+        rows = self._read_tail() if self._sorted else None
+        if rows is None:
+            # Older history was appended after newer rows, or an old CSV
+            # has timestamps in mixed timezone formats (e.g. one row in
+            # UTC ...Z and another in CEST ...+02:00 for the same moment).
+            # Normalize, dedup and sort the file once.
+            if self._rewrite_normalized():
+                self._sorted_path.touch()
+                self._sorted = True
+                rows = self._read_tail() or []
+                _LOGGER.info(
+                    "Rewrote readings log %s in canonical timestamp order",
+                    self.path,
+                )
+            else:
+                # Still unsorted: only a full read finds the newest rows.
+                rows = self._read_tail(whole=True) or []
+        self._index = None
+        self._high_water = {}
+        for row in rows:
+            cid = row["meter_counter_id"]
+            if row["timestamp"] > self._high_water.get(cid, ""):
+                self._high_water[cid] = row["timestamp"]
+        newest = max(self._high_water.values(), default="")
+        self._window_start = _window_start(newest)
+        self._window = ReadingKeyIndex(
+            (row["meter_counter_id"], row["timestamp"])
+            for row in rows
+            if row["timestamp"] >= self._window_start
+        )
+        rows.sort(key=lambda r: r["timestamp"])
+        return rows[-RECENT_BUFFER_SIZE:]
+
+    def _read_tail(self, whole: bool = False) -> list[dict[str, Any]] | None:
+        """Parse rows from the end of the file until the window is covered.
+
+        With ``whole`` set the entire file is parsed. Returns None if the
+        file still needs the canonical-UTC migration, judged from its
+        first rows and the tail: legacy rows predate the normalization,
+        so they sit at the head.
+        """
+        rows: list[dict[str, Any]] = []
+        with self.path.open("rb") as f:
+            head = [
+                line.decode("utf-8")
+                for _, line in zip(range(_HEAD_CHECK_ROWS + 1), f)
+            ][1:]
+            if _parse_lines(head) is None:
+                return None
+            position = f.seek(0, os.SEEK_END)
+            carry = b""
+            newest = ""
+            while position > 0:
+                size = min(_TAIL_BLOCK, position)
+                position -= size
+                f.seek(position)
+                lines = (f.read(size) + carry).split(b"\n")
+                # The first piece may be half a line; finish it next round.
+                carry = lines.pop(0) if position > 0 else b""
+                block = _parse_lines(line.decode("utf-8") for line in lines)
+                if block is None:
+                    return None
+                if not block or whole:
+                    rows.extend(block)
+                    continue
+                stamps = [row["timestamp"] for row in block]
+                newest = max(newest, *stamps)
+                rows.extend(block)
+                if len(rows) < RECENT_BUFFER_SIZE:
+                    continue
+                # Every row before this block is at most DEDUP_WINDOW newer
+                # than the block's rows, so once those are a window older
+                # than both the dedup window and the recent buffer, the
+                # rest of the file holds neither.
+                oldest_needed = min(
+                    _window_start(newest),
+                    heapq.nlargest(
+                        RECENT_BUFFER_SIZE, (row["timestamp"] for row in rows)
+                    )[-1],
+                )
+                if min(stamps) < _window_start(oldest_needed):
+                    break
+        return rows
+
+    def _rewrite_normalized(self) -> bool:
+        """Rewrite the CSV sorted, with canonical UTC timestamps.
+
+        Also dedups any rows that map to the same canonical form (e.g.
+        one row in CEST and one in UTC for the same moment). Returns
+        whether the file was rewritten.
+        """
+        if not self.path.exists():
+            return False
+        try:
+            with self.path.open("r", encoding="utf-8", newline="") as f:
+                reader = csv.DictReader(f)
+                source_rows = [dict(r) for r in reader]
+        except OSError as err:
+            _LOGGER.warning("Could not read %s for rewrite: %s", self.path, err)
+            return False
+        seen: set[tuple[str, str]] = set()
+        deduped: list[dict[str, Any]] = []
+        for row in source_rows:
+            cid = row.get("meter_counter_id")
+            ts = row.get("timestamp")
+            if not (cid and ts):
+                continue
+            norm_ts = normalize_timestamp(ts)
+            key = (cid, norm_ts)
+            if key in seen:
+                continue
+            seen.add(key)
+            row["timestamp"] = norm_ts
+            deduped.append(row)
+        deduped.sort(key=lambda r: r.get("timestamp", ""))
+        tmp = self.path.with_suffix(".csv.tmp")
+        try:
+            with tmp.open("w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=HEADER)
+                writer.writeheader()
+                for row in deduped:
+                    writer.writerow({k: row.get(k, "") for k in HEADER})
+            os.replace(tmp, self.path)
+        except OSError as err:
+            _LOGGER.warning("Could not rewrite %s: %s", self.path, err)
+            return False
+        return True
+
+    def append_many(self, rows: list[list[str]]) -> list[bool]:
+        """Append the rows that aren't in the file yet, via one handle.
+
+        Returns, per row, whether it was new.
+        """
+        inserted: list[bool] = []
+        new_rows: list[list[str]] = []
+        for row in rows:
+            timestamp, _, counter_id = row[0], row[1], row[2]
+            key = (counter_id, timestamp)
+            if self._contains(key):
+                inserted.append(False)
+                continue
+            inserted.append(True)
+            new_rows.append(row)
+            if self._index is not None:
+                self._index.add(key)
+            if timestamp >= self._window_start:
+                self._window.add(key)
+            if timestamp > self._high_water.get(counter_id, ""):
+                self._high_water[counter_id] = timestamp
+        if new_rows and self._sorted:
+            trailing = _window_start(max(self._high_water.values()))
+            if any(row[0] < trailing for row in new_rows):
+                # Older history: the next load has to sort the file first.
+                self._sorted_path.unlink(missing_ok=True)
+                self._sorted = False
+        if new_rows:
+            with self.path.open("a", encoding="utf-8", newline="") as f:
+                csv.writer(f).writerows(new_rows)
+        return inserted
+
+    def _contains(self, key: tuple[str, str]) -> bool:
+        counter_id, timestamp = key
+        if self._index is not None:
+            return key in self._index
+        if timestamp > self._high_water.get(counter_id, ""):
+            return False
+        if timestamp >= self._window_start:
+            return key in self._window
+        # Rows written since the load are in the file too, so one scan
+        # covers the window as well.
+        self._index = self._scan_keys()
+        _LOGGER.debug(
+            "Built full dedup index for %s (%d rows)", self.path, len(self._index)
+        )
+        return key in self._index
+
+    def _scan_keys(self) -> ReadingKeyIndex:
+        """Build the compact key index of every row in the file."""
+        with self.path.open("r", encoding="utf-8", newline="") as f:
+            return ReadingKeyIndex(
+                (row["meter_counter_id"], normalize_timestamp(row["timestamp"]))
+                for row in csv.DictReader(f)
+                if row.get("meter_counter_id") and row.get("timestamp")
+            )
+
+    def read_range(self, start: str, end: str) -> list[dict[str, Any]]:
+        """Rows with ``start <= timestamp < end``, oldest first."""
+        # Canonical UTC timestamps sort lexicographically, so the range
+        # check is a plain string comparison.
+        rows: list[dict[str, Any]] = []
+        with self.path.open("r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                ts = row.get("timestamp") or ""
+                if start <= ts < end:
+                    rows.append(row)
+        rows.sort(key=lambda r: r["timestamp"])
+        return rows
+
+    def close(self) -> None:
+        """Nothing to release; files are opened per operation."""
+
+
+def _window_start(newest: str) -> str:
+    """Canonical timestamp ``DEDUP_WINDOW`` before ``newest``."""
+    if not newest:
+        return ""
+    parsed = datetime.strptime(newest, CANONICAL_FORMAT).replace(tzinfo=timezone.utc)
+    return (parsed - DEDUP_WINDOW).strftime(CANONICAL_FORMAT)
+
+
+def _parse_lines(lines: Iterable[str]) -> list[dict[str, Any]] | None:
+    """Parse raw CSV data lines; None if a timestamp isn't canonical."""
+    rows: list[dict[str, Any]] = []
+    for values in csv.reader(line for line in lines if line.strip()):
+        if values == HEADER or len(values) < len(HEADER):
+            continue
+        row = dict(zip(HEADER, values))
+        ts = row["timestamp"]
+        if not (row["meter_counter_id"] and ts):
+            continue
+        if normalize_timestamp(ts) != ts:
+            return None
+        rows.append(row)
+    return rows
+
+
+class SqliteReadingsStore:
+    """SQLite database keyed on ``(meter_counter_id, timestamp)``."""
+
+    def __init__(self, directory: Path, installation_id: str) -> None:
+        self.path = directory / f"{installation_id}.sqlite"
+        self.coverage_path = directory / f"{installation_id}.sqlite.coverage.json"
+        self._csv = CsvReadingsStore(directory, installation_id)
+        self._conn: sqlite3.Connection | None = None
+        # Executor jobs may run on different threads; serialize access to
+        # the shared connection.
+        self._thread_lock = threading.Lock()
+
+    def prepare(self) -> None:
+        """Open the database, create the schema and import the CSV once."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS readings (
+                    meter_counter_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    counter_type TEXT NOT NULL DEFAULT '',
+                    value TEXT NOT NULL,
+                    unit TEXT NOT NULL DEFAULT '',
+                    source TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (meter_counter_id, timestamp)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS readings_by_timestamp "
+                "ON readings (timestamp)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+        self._conn = conn
+        self._import_csv_once()
+
+    def _import_csv_once(self) -> None:
+        """Copy the CSV archive (and its coverage ledger) into the database."""
+        assert self._conn is not None
+        done = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'csv_imported'"
+        ).fetchone()
+        if done is not None:
+            return
+        imported = 0
+        if self._csv.path.exists():
+            try:
+                with self._csv.path.open("r", encoding="utf-8", newline="") as f:
+                    rows = [
+                        (
+                            row["meter_counter_id"],
+                            normalize_timestamp(row["timestamp"]),
+                            row.get("counter_type") or "",
+                            row.get("value") or "",
+                            row.get("unit") or "",
+                            row.get("source") or "",
+                        )
+                        for row in csv.DictReader(f)
+                        if row.get("meter_counter_id") and row.get("timestamp")
+                    ]
+            except OSError as err:
+                # Leave the flag unset so the import is retried next start.
+                _LOGGER.warning(
+                    "Could not import %s into %s: %s", self._csv.path, self.path, err
+                )
+                return
+            with self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO readings VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                imported = self._conn.total_changes - before
+            if self._csv.coverage_path.exists() and not self.coverage_path.exists():
+                shutil.copyfile(self._csv.coverage_path, self.coverage_path)
+            _LOGGER.info(
+                "Imported %d rows from %s into %s", imported, self._csv.path, self.path
+            )
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('csv_imported', ?)",
+                (str(imported),),
+            )
+
+    def load(self) -> list[dict[str, Any]]:
+        """Return the newest rows, oldest first."""
+        with self._thread_lock:
+            cursor = self._require_conn().execute(
+                f"SELECT {', '.join(HEADER)} FROM readings "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (RECENT_BUFFER_SIZE,),
+            )
+            rows = [dict(zip(HEADER, values)) for values in cursor]
+        rows.reverse()
+        return rows
+
+    def append_many(self, rows: list[list[str]]) -> list[bool]:
+        """Insert rows in one transaction.
+
+        Returns, per row, whether it was new — False where
+        ``(meter_counter_id, timestamp)`` already existed.
+        """
+        inserted: list[bool] = []
+        with self._thread_lock:
+            conn = self._require_conn()
+            with conn:
+                for timestamp, counter_type, counter_id, value, unit, source in rows:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO readings VALUES (?, ?, ?, ?, ?, ?)",
+                        (counter_id, timestamp, counter_type, value, unit, source),
+                    )
+                    inserted.append(cursor.rowcount == 1)
+        return inserted
+
+    def read_range(self, start: str, end: str) -> list[dict[str, Any]]:
+        """Rows with ``start <= timestamp < end``, oldest first."""
+        with self._thread_lock:
+            cursor = self._require_conn().execute(
+                f"SELECT {', '.join(HEADER)} FROM readings "
+                "WHERE timestamp >= ? AND timestamp < ? "
+                "ORDER BY timestamp",
+                (start, end),
+            )
+            return [dict(zip(HEADER, values)) for values in cursor]
+
+    def close(self) -> None:
+        with self._thread_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _require_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise OSError(f"Readings database {self.path} is not open")
+        return self._conn
@@ -0,0 +1,116 @@
+"""Priority-aware admission of API requests for one Målerportal account.
+
+At startup the coordinators' first ``/readings/latest`` poll, the stale
+monitor's cadence lookup and every statistic sensor's year-long backfill
+all want the API at once. :class:`RequestScheduler` caps how many
+requests of a config entry are in flight and, when a slot frees up,
+hands it to the most urgent waiter:
+
+1. :attr:`Priority.LIVE` — current readings (latest poll, setup);
+2. :attr:`Priority.FALLBACK` — null-value fallback and cadence history;
+3. :attr:`Priority.STATISTICS` — incremental statistics updates;
+4. :attr:`Priority.BACKFILL` — deep history imports.
+
+Waiters of the same class are served in arrival order. The background
+classes (statistics and backfill) may never occupy the last
+``reserved`` slots, so a live poll doesn't queue behind a year of
+history downloads that each take seconds to answer.
+
+This module contains no Home Assistant imports so the logic can be unit
+tested in isolation.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+import heapq
+import itertools
+
+DEFAULT_MAX_CONCURRENT = 4
+# Slots only the live and fallback classes may use.
+DEFAULT_RESERVED = 1
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first."""
+
+    LIVE = 0
+    FALLBACK = 1
+    STATISTICS = 2
+    BACKFILL = 3
+
+
+class RequestScheduler:
+    """Concurrency cap with priority-ordered hand-off of free slots."""
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        *,
+        reserved: int = DEFAULT_RESERVED,
+    ) -> None:
+        self._max_concurrent = max(1, max_concurrent)
+        # Always leave background traffic at least one slot.
+        self._reserved = min(max(0, reserved), self._max_concurrent - 1)
+        self._in_use = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def in_use(self) -> int:
+        """Requests currently holding a slot."""
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        """Requests queued for a slot."""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.LIVE) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of the block."""
+        await self._async_acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _async_acquire(self, priority: Priority) -> None:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        # Granted right away unless someone at least as urgent is queued.
+        self._wake()
+        if future.done():
+            return
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled.
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._in_use -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                # Cancelled while queued.
+                heapq.heappop(self._waiters)
+                continue
+            if self._in_use >= self._limit(priority):
+                # The head is the most urgent waiter; nobody else fits.
+                return
+            heapq.heappop(self._waiters)
+            self._in_use += 1
+            future.set_result(None)
+
+    def _limit(self, priority: int) -> int:
+        if priority >= Priority.STATISTICS:
+            return self._max_concurrent - self._reserved
+        return self._max_concurrent
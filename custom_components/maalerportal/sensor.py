@@ -124,7 +124,7 @@ def create_sensors_from_counters(
     installation = coordinator.installation
     api_key = coordinator.api_key
     base_url = coordinator.base_url
-    interval = coordinator.update_interval
+    interval = coordinator.polling_interval
 
     # Create sensors for primary counter based on reading type
     if primary_counter:
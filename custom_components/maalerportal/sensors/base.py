@@ -1,24 +1,27 @@
 """Base sensor classes for Målerportal integration."""
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, timedelta, timezone
 import logging
-import re
 from typing import Any, Optional
 
-import aiohttp
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from ..api import MaalerportalApiClient
 from ..const import DOMAIN
 from ..coordinator import MaalerportalCoordinator
+from ..counter_index import CounterIndex, CounterReading, parse_counter_value
 
 _LOGGER = logging.getLogger(__name__)
 
+# Coordinator entities whose counter didn't change still rewrite their
+# state this often, so ``reading_age_minutes`` keeps moving.
+UNCHANGED_STATE_REFRESH = timedelta(hours=1)
+
 class MaalerportalBaseSensor(SensorEntity):
     """Base class for all Målerportal sensors (common attributes)."""
     
@@ -89,38 +92,14 @@ class MaalerportalBaseSensor(SensorEntity):
 
     def _parse_counter_value(self, counter: dict) -> float | None:
         """Parse and validate counter value."""
-        latest_value = counter.get("latestValue")
-        if latest_value is None:
-            _LOGGER.debug("latestValue is None for counter %s", counter.get("meterCounterId"))
-            return None
-            
-        try:
-            if isinstance(latest_value, (int, float)):
-                numeric_value = float(latest_value)
-            elif isinstance(latest_value, str):
-                # Clean the string value - remove any non-numeric characters except decimal point and minus sign
-                cleaned_value = latest_value.strip()
-                _LOGGER.debug("Raw string value for counter %s: '%s'", counter.get("meterCounterId"), cleaned_value)
-                cleaned_value = re.sub(r'[^\d.-]', '', cleaned_value)
-                if not cleaned_value:
-                    _LOGGER.warning("Value '%s' resulted in empty string after cleaning", latest_value)
-                    return None
-                numeric_value = float(cleaned_value)
-            else:
-                _LOGGER.error("Unexpected value type for %s: %s", latest_value, type(latest_value))
-                return None
-                
-            # Validate the number
-            if not (isinstance(numeric_value, (int, float)) and numeric_value == numeric_value):  # Check for NaN
-                _LOGGER.error("Invalid numeric value for %s: %s", counter.get("meterCounterId"), latest_value)
-                return None
-                
-            _LOGGER.debug("Parsed value for %s: %s -> %s", counter.get("meterCounterId"), latest_value, numeric_value)
-            return numeric_value
-            
-        except (ValueError, TypeError) as err:
-            _LOGGER.error("Error parsing meter value '%s': %s", latest_value, err)
-            return None
+        value = parse_counter_value(counter.get("latestValue"))
+        if value is None:
+            _LOGGER.debug(
+                "No numeric latestValue for counter %s: %r",
+                counter.get("meterCounterId"),
+                counter.get("latestValue"),
+            )
+        return value
 
 
 class MaalerportalCoordinatorSensor(CoordinatorEntity[MaalerportalCoordinator], MaalerportalBaseSensor):
@@ -142,6 +121,10 @@ class MaalerportalCoordinatorSensor(CoordinatorEntity[MaalerportalCoordinator],
             coordinator.base_url,
             counter
         )
+        # Availability and time of the last state write, for skipping
+        # writes on updates that changed nothing (see _needs_state_write).
+        self._written_available: bool | None = None
+        self._written_at: datetime | None = None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -154,8 +137,9 @@ class MaalerportalCoordinatorSensor(CoordinatorEntity[MaalerportalCoordinator],
             Distinct from HA's ``last_updated`` which only reflects when
             the entity state changed locally.
         ``reading_age_minutes``
-            How many minutes ago the meter recorded this value. Updates
-            on every state read so it stays current. Use in automations:
+            How many minutes ago the meter recorded this value. Updated
+            with every state write, at least every
+            ``UNCHANGED_STATE_REFRESH``. Use in automations:
             ``trigger: numeric_state attribute=reading_age_minutes above=360``.
         ``report_lag_minutes``
             Delay between meter recording the value and HA's state
@@ -166,34 +150,30 @@ class MaalerportalCoordinatorSensor(CoordinatorEntity[MaalerportalCoordinator],
         if not self._counter or not self.coordinator.data:
             return attrs
 
-        our_id = self._counter.get("meterCounterId")
-        for counter in self.coordinator.data.get("meterCounters", []):
-            if counter.get("meterCounterId") != our_id:
-                continue
-            ts = counter.get("latestTimestamp")
-            if not ts:
-                break
-            attrs["last_reading_at"] = ts
-            try:
-                parsed = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-            except (TypeError, ValueError):
-                break
-            now = datetime.now(timezone.utc)
-            attrs["reading_age_minutes"] = round(
-                (now - parsed).total_seconds() / 60, 1
-            )
-            # Report lag: minutes between meter recording the value and
-            # our coordinator first observing it. Pulled from a
-            # coordinator-level marker that's stable across the
-            # state-machine's chicken-and-egg during entity-write
-            # (unlike hass.states.get which can return None on first
-            # writes). Clamped to ≥0 — negative would only be clock
-            # skew.
-            first_seen = self.coordinator.first_observed_at(our_id, ts)
-            if first_seen is not None:
-                lag = (first_seen - parsed).total_seconds()
-                attrs["report_lag_minutes"] = round(max(lag, 0) / 60, 1)
-            break
+        reading = self._own_reading(self.coordinator.counters)
+        if reading is None or not reading.raw_timestamp:
+            return attrs
+        attrs["last_reading_at"] = reading.raw_timestamp
+        parsed = reading.timestamp
+        if parsed is None:
+            return attrs
+        now = datetime.now(timezone.utc)
+        attrs["reading_age_minutes"] = round(
+            (now - parsed).total_seconds() / 60, 1
+        )
+        # Report lag: minutes between meter recording the value and
+        # our coordinator first observing it. Pulled from a
+        # coordinator-level marker that's stable across the
+        # state-machine's chicken-and-egg during entity-write
+        # (unlike hass.states.get which can return None on first
+        # writes). Clamped to ≥0 — negative would only be clock
+        # skew.
+        first_seen = self.coordinator.first_observed_at(
+            reading.counter.get("meterCounterId"), reading.raw_timestamp
+        )
+        if first_seen is not None:
+            lag = (first_seen - parsed).total_seconds()
+            attrs["report_lag_minutes"] = round(max(lag, 0) / 60, 1)
         return attrs
 
     async def async_added_to_hass(self) -> None:
@@ -204,30 +184,51 @@ class MaalerportalCoordinatorSensor(CoordinatorEntity[MaalerportalCoordinator],
 
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        # Get meter counters from coordinator data
         if not self.coordinator.data:
             _LOGGER.debug("No coordinator data available for %s", self.entity_id)
             return
-
-        meter_counters = self.coordinator.data.get("meterCounters", [])
-        _LOGGER.debug("Updating %s with %d counters", self.entity_id, len(meter_counters))
-        
-        # Find our counter and update
         if self._counter:
-            our_id = self._counter.get("meterCounterId")
-            _LOGGER.debug(
-                "Entity %s (tracking counter %s) updating from %d counters",
-                self.entity_id,
-                our_id,
-                len(meter_counters)
+            changed = self.coordinator.counter_changed(
+                self._counter.get("meterCounterId")
             )
-            self._update_from_meter_counters(meter_counters)
+            if not self._needs_state_write(changed):
+                return
+            self._update_from_counters(self.coordinator.counters)
             self.async_write_ha_state()
         else:
             _LOGGER.debug("Entity %s has no tracking counter", self.entity_id)
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
-        """Update sensor state from counter list (implemented by subclasses)."""
+    def _needs_state_write(self, changed: bool) -> bool:
+        """Whether a coordinator update has to reach the state machine.
+
+        Most polls return most counters exactly as before; writing them
+        anyway costs a state-changed event and a recorder row per
+        entity. An update is skipped when the entity's data didn't
+        change and its availability didn't flip, unless the last write
+        is older than ``UNCHANGED_STATE_REFRESH``.
+        """
+        now = datetime.now(timezone.utc)
+        available = self.available
+        if (
+            not changed
+            and available == self._written_available
+            and self._written_at is not None
+            and now - self._written_at < UNCHANGED_STATE_REFRESH
+        ):
+            return False
+        self._written_available = available
+        self._written_at = now
+        return True
+
+    def _own_reading(self, counters: CounterIndex) -> CounterReading | None:
+        """This entity's counter in ``counters``, if present."""
+        if not self._counter:
+            return None
+        return counters.get(self._counter.get("meterCounterId"))
+
+    def _update_from_counters(self, counters: CounterIndex) -> None:
+        """Update sensor state from the coordinator's counter index
+        (implemented by subclasses)."""
         pass
 
 
@@ -265,6 +266,13 @@ class MaalerportalPollingSensor(MaalerportalBaseSensor):
         self._max_check_interval = timedelta(hours=24)
         self._max_unavailable_days: int = 30
 
+        # Resolved lazily: the installation's coordinator and the entry's
+        # shared client it holds.
+        self._coordinator_ref: Optional[MaalerportalCoordinator] = None
+        self._client: Optional[MaalerportalApiClient] = None
+        # Coordinator payload the state was last taken from.
+        self._seen_data: Optional[dict[str, Any]] = None
+
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
@@ -276,77 +284,56 @@ class MaalerportalPollingSensor(MaalerportalBaseSensor):
         return attrs
 
     async def async_update(self) -> None:
-        """Fetch data from API."""
-        # Instance-based throttle: skip if updated recently
-        now = datetime.now()
-        if self._last_successful_update is not None:
-            elapsed = now - self._last_successful_update
-            if elapsed < self._polling_interval:
-                return
-        
-        # If installation is unavailable, only do periodic availability checks
-        if not self._installation_available:
-            await self._check_installation_availability()
-            return
-        
-        try:
-            _LOGGER.debug("Fetching meter readings for installation: %s", self._installation_id)
-            
-            session = async_get_clientsession(self.hass)
-            # Get latest readings
-            response = await session.get(
-                f"{self._smarthome_base_url}/installations/{self._installation_id}/readings/latest",
-                headers={"ApiKey": self._api_key},
-                timeout=aiohttp.ClientTimeout(total=30),
-            )
-            
-            if response.status == 429:
-                _LOGGER.warning("Rate limit exceeded, backing off")
-                # Simple backoff handled by interval
-                return
-
-            # Handle 404/403 - installation no longer accessible
-            if response.status in (404, 403):
-                _LOGGER.warning(
-                    "Installation %s no longer accessible (HTTP %s)",
-                    self._installation_id,
-                    response.status
-                )
-                await self._handle_installation_unavailable()
-                return
-
-            if not response.ok:
-                _LOGGER.error("Error fetching meter readings: %s", response.status)
-                return
-            
-            # Reset availability on success
-            if not self._installation_available:
-                _LOGGER.info("Installation %s is available again", self._installation_id)
-                self._installation_available = True
-                self._unavailable_since = None
-                self._availability_check_count = 0
-            
-            readings_data = await response.json()
-            _LOGGER.debug("Received %d meter counters", len(readings_data.get("meterCounters", [])))
+        """Take the latest readings from the installation's coordinator.
 
-            if readings_data.get("meterCounters"):
-                self._update_from_meter_counters(readings_data["meterCounters"])
-            else:
-                _LOGGER.debug("No meter counters found in API response")
-            
-            # Mark successful update for throttle tracking
-            self._last_successful_update = now
-            self._last_contact = now
+        The coordinator already polls ``/readings/latest`` once per
+        interval for the whole installation, so reading its data costs
+        no request. Sensors with history work of their own (statistics,
+        consumption) override this and keep their own schedule.
+        """
+        coordinator = self._coordinator()
+        if coordinator is None or not coordinator.data:
+            return
+        data = coordinator.data
+        if data is self._seen_data:
+            return
+        self._seen_data = data
 
-        except asyncio.TimeoutError:
-            _LOGGER.warning("Timeout fetching meter readings for installation: %s", self._installation_id)
-        except Exception as err:
-            _LOGGER.error("Error updating meter readings for installation %s: %s", 
-                         self._installation_id, err)
+        if data.get("meterCounters"):
+            self._update_from_meter_counters(data["meterCounters"])
+        else:
+            _LOGGER.debug("No meter counters found in coordinator data")
+        self._last_contact = coordinator.last_success_at
 
     def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
         """Update sensor state from meter counter data - to be implemented by subclasses."""
         pass
+
+    def _coordinator(self) -> Optional[MaalerportalCoordinator]:
+        """Return the coordinator of this sensor's installation."""
+        if self._coordinator_ref is None:
+            for store in self.hass.data.get(DOMAIN, {}).values():
+                if not isinstance(store, dict):
+                    continue
+                coordinator = store.get("coordinators", {}).get(self._installation_id)
+                if coordinator is not None:
+                    self._coordinator_ref = coordinator
+                    break
+        return self._coordinator_ref
+
+    def _api_client(self) -> MaalerportalApiClient:
+        """Return the entry's shared API client for this installation."""
+        if self._client is None:
+            coordinator = self._coordinator()
+            if coordinator is not None:
+                self._client = coordinator.api_client
+            else:
+                self._client = MaalerportalApiClient(
+                    async_get_clientsession(self.hass),
+                    self._smarthome_base_url,
+                    self._api_key,
+                )
+        return self._client
         
     async def _handle_installation_unavailable(self) -> None:
         """Handle installation being unavailable (404/403)."""
@@ -381,26 +368,21 @@ class MaalerportalPollingSensor(MaalerportalBaseSensor):
                 return
 
         try:
-            session = async_get_clientsession(self.hass)
-            response = await session.get(
-                f"{self._smarthome_base_url}/installations/{self._installation_id}/addresses",
-                headers={"ApiKey": self._api_key},
-                timeout=aiohttp.ClientTimeout(total=10),
+            await self._api_client().async_get(
+                f"/installations/{self._installation_id}/addresses",
+                timeout=10,
             )
-            
-            if response.status == 200:
-                _LOGGER.info("Installation %s is back online!", self._installation_id)
-                self._installation_available = True
-                self._unavailable_since = None
-                self._availability_check_count = 0
-                # Trigger update
-                await self.async_update()
-            else:
-                # Still unavailable, schedule next check
-                await self._handle_installation_unavailable()
-                
-        except Exception as err:
+        except Exception:
+            # Still unavailable, schedule next check
             await self._handle_installation_unavailable()
+            return
+
+        _LOGGER.info("Installation %s is back online!", self._installation_id)
+        self._installation_available = True
+        self._unavailable_since = None
+        self._availability_check_count = 0
+        # Trigger update
+        await self.async_update()
 
     def _get_current_check_interval(self) -> timedelta:
         """Calculate current check interval using exponential backoff."""
@@ -10,7 +10,12 @@ from typing import Any, Optional
 import aiohttp
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from homeassistant.components.recorder.models import StatisticData
+    from homeassistant.components.recorder.models import (
+        StatisticData,
+        StatisticMetaData,
+    )
+
+    from ..history_service import HistoryChunk
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -21,39 +26,40 @@ from homeassistant.const import (
     UnitOfVolume,
 )
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util import dt as dt_util
 
-from ..const import DOMAIN
-from ..coordinator import MaalerportalCoordinator
-from ..reconcile import (
-    compute_swap_offset,
-    is_meter_swap,
-    should_seed_previous_from_recorder,
+from ..api import ApiError, InstallationUnavailableError, RateLimitedError
+from ..backfill import ResumePoint, find_resume_point
+from ..const import (
+    CONF_STARTUP_FULL_REFETCH,
+    DEFAULT_STARTUP_FULL_REFETCH,
+    DOMAIN,
 )
-from ..timeutils import parse_api_timestamp
+from ..coordinator import MaalerportalCoordinator
+from ..import_cursor import ImportCursor
+from ..reconcile import should_seed_previous_from_recorder
+from ..scheduler import Priority
+from ..statistics_builder import SwapEvent, StatisticsStream, statistics_hour_start
 from .base import MaalerportalPollingSensor
 
 _LOGGER = logging.getLogger(__name__)
 
+# How far back an incremental startup backfill looks for stored statistics,
+# and the most it will re-fetch. Matches the full-fetch window.
+_BACKFILL_WINDOW = timedelta(days=365)
+# Readings are fetched from this much before the resume point: hour
+# bucketing shifts counter readings back an hour and into local time, so a
+# reading belonging just after the resume point can carry an earlier API
+# timestamp. The cursor filters out anything already stored.
+_RESUME_OVERLAP = timedelta(days=1)
+# Most statistics rows handed to the recorder in one import job.
+_IMPORT_BATCH = 500
 
-def _statistics_hour_start(timestamp: datetime, reading_type: str) -> datetime:
-    """Return the recorder UTC hour after local-time bucketing.
 
-    Målerportal readings are shown by local Swedish wall-clock hour in the
-    vendor app. Home Assistant stores statistics in UTC, so do all hour
-    bucketing in HA's configured local timezone first. That lets ZoneInfo
-    handle CET/CEST transitions instead of relying on a fixed offset.
-    """
-    local_hour = dt_util.as_local(timestamp).replace(
-        minute=0,
-        second=0,
-        microsecond=0,
-    )
-    if reading_type != "consumption":
-        local_hour = local_hour - timedelta(hours=1)
-    return local_hour.astimezone(timezone.utc)
+def _statistics_hour_start(timestamp: datetime, reading_type: str) -> datetime:
+    """Return the recorder UTC hour after bucketing in HA's local timezone."""
+    return statistics_hour_start(timestamp, reading_type, dt_util.DEFAULT_TIME_ZONE)
 
 
 class MaalerportalConsumptionSensor(MaalerportalPollingSensor, RestoreEntity):
@@ -218,35 +224,29 @@ class MaalerportalConsumptionSensor(MaalerportalPollingSensor, RestoreEntity):
             _LOGGER.debug("Fetching consumption for counter %s from %s to %s", 
                           counter_id, start_date_iso, end_date_iso)
             
-            session = async_get_clientsession(self.hass)
-            # Use POST endpoint with JSON body
-            response = await session.post(
-                f"{self._smarthome_base_url}/installations/{self._installation_id}/readings/historical",
-                json={"from": start_date_iso, "to": end_date_iso},
-                headers={"ApiKey": self._api_key, "Content-Type": "application/json"},
-                timeout=aiohttp.ClientTimeout(total=30),
-            )
-            
-            if response.status == 429:
+            try:
+                historical_data = await self._api_client().async_post(
+                    f"/installations/{self._installation_id}/readings/historical",
+                    {"from": start_date_iso, "to": end_date_iso},
+                    timeout=30,
+                    priority=Priority.STATISTICS,
+                )
+            except RateLimitedError:
                 _LOGGER.warning("Rate limit exceeded for historical data, will retry later")
                 return
-            
-            # Handle 404/403 - installation no longer accessible
-            if response.status in (404, 403):
+            except InstallationUnavailableError as err:
+                # Handle 404/403 - installation no longer accessible
                 _LOGGER.warning(
                     "Installation %s no longer accessible (HTTP %s)",
                     self._installation_id,
-                    response.status
+                    err.status
                 )
                 await self._handle_installation_unavailable()
                 return
-            
-            if not response.ok:
-                _LOGGER.error("Historical data request failed: HTTP %s", response.status)
+            except ApiError as err:
+                _LOGGER.error("Historical data request failed: HTTP %s", err.status)
                 return
             
-            historical_data = await response.json()
-            
             # Process readings for this specific counter
             readings = historical_data.get("readings", [])
             new_consumption = 0.0
@@ -426,6 +426,10 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
         # is treated as the swap point when a swap is pending.
         self._swap_drop_threshold = 0.5
 
+        # Percentage of history chunks imported while a multi-chunk import
+        # runs, None otherwise.
+        self._import_progress: Optional[int] = None
+
     @property
     def native_value(self) -> Optional[float]:
         """Return None - this sensor is only for importing statistics to Energy Dashboard.
@@ -447,6 +451,8 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
             attrs["cumulative_sum"] = self._cumulative_sum
         if self._last_inserted_timestamp:
             attrs["last_inserted_timestamp"] = self._last_inserted_timestamp.isoformat()
+        if self._import_progress is not None:
+            attrs["history_import_progress"] = self._import_progress
         return attrs
 
     async def async_reset_meter_offset(self, rebuild: bool = True) -> None:
@@ -544,11 +550,10 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
                         except (ValueError, TypeError):
                             pass
         
-        # Schedule initial statistics update – always fetch full history on startup
-        # to ensure completeness even after re-installation (old stats may linger in DB).
-        # async_import_statistics handles duplicates gracefully.
+        # Schedule the startup backfill. By default only the range missing
+        # from the recorder is fetched; a full 1-year re-fetch is an option.
         self._history_task = self.hass.async_create_task(
-            self._async_update_statistics(force_full_fetch=True)
+            self._async_startup_backfill()
         )
 
     async def async_will_remove_from_hass(self) -> None:
@@ -572,6 +577,87 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
                     return entry_id
         return None
 
+    def _startup_full_refetch(self) -> bool:
+        """Whether the user opted into a full history re-fetch on startup."""
+        entry_id = self._get_entry_id()
+        entry = (
+            self.hass.config_entries.async_get_entry(entry_id) if entry_id else None
+        )
+        if entry is None:
+            return DEFAULT_STARTUP_FULL_REFETCH
+        return bool(
+            entry.options.get(CONF_STARTUP_FULL_REFETCH, DEFAULT_STARTUP_FULL_REFETCH)
+        )
+
+    async def _async_startup_backfill(self) -> None:
+        """Bring statistics up to date after the entity is added.
+
+        Resumes after the last contiguous stored statistic so a restart only
+        costs the missing range. Falls back to the full 1-year fetch when
+        nothing is stored yet, when the stored sums can't be continued, or
+        when the user enabled full re-fetch on startup.
+        """
+        if self._startup_full_refetch():
+            await self._async_update_statistics(force_full_fetch=True)
+            return
+
+        resume_from = await self._async_find_resume_point()
+        if resume_from is None:
+            await self._async_update_statistics(force_full_fetch=True)
+            return
+
+        _LOGGER.info(
+            "Incremental history fetch for %s: resuming after %s",
+            self._statistic_id,
+            resume_from.start.isoformat(),
+        )
+        await self._async_update_statistics(resume_from=resume_from)
+
+    async def _async_find_resume_point(self) -> Optional[ResumePoint]:
+        """Scan stored statistics for the point to resume the backfill from."""
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import (
+            statistics_during_period,
+        )
+
+        if not self._statistic_id:
+            return None
+        try:
+            stats = await get_instance(self.hass).async_add_executor_job(
+                statistics_during_period,
+                self.hass,
+                datetime.now(timezone.utc) - _BACKFILL_WINDOW,
+                None,
+                {self._statistic_id},
+                "hour",
+                None,
+                {"state", "sum"},
+            )
+        except Exception as err:
+            _LOGGER.debug(
+                "Could not scan statistics coverage for %s: %s",
+                self._statistic_id,
+                err,
+            )
+            return None
+
+        rows = []
+        for row in stats.get(self._statistic_id, []):
+            start = row.get("start")
+            if isinstance(start, (int, float)):
+                start = dt_util.utc_from_timestamp(start)
+            rows.append(
+                {"start": start, "state": row.get("state"), "sum": row.get("sum")}
+            )
+
+        resume_from = find_resume_point(rows, self._reading_type, self._meter_offset)
+        if resume_from is None and rows:
+            _LOGGER.debug(
+                "Stored statistics for %s can't be continued incrementally",
+                self._statistic_id,
+            )
+        return resume_from
+
     async def async_update(self) -> None:
         """Update statistics from historical API data."""
         # Instance-based throttle: skip if updated recently
@@ -590,25 +676,23 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
         # Mark successful update
         self._last_successful_update = now
 
-    async def _async_update_statistics(self, force_full_fetch: bool = False) -> None:
+    async def _async_update_statistics(
+        self,
+        force_full_fetch: bool = False,
+        resume_from: Optional[ResumePoint] = None,
+    ) -> None:
         """Fetch historical data and insert into Home Assistant statistics.
 
         Args:
             force_full_fetch: If True, fetch up to 1 year of history regardless
-                of existing statistics. Used on initial setup to ensure complete
-                history even after re-installation (where old stats may linger
-                in the recorder DB).
+                of existing statistics. Used when re-fetching is requested and
+                when stored statistics can't be continued incrementally.
+            resume_from: Stored statistic to continue after. Readings from
+                there on are re-imported, with the running sum and swap
+                detection seeded from that row. Used by the startup backfill.
         """
         from homeassistant.components.recorder import get_instance
-        from homeassistant.components.recorder.models import (
-            StatisticData,
-            StatisticMeanType,
-            StatisticMetaData,
-        )
-        from homeassistant.components.recorder.statistics import (
-            async_import_statistics,
-            get_last_statistics,
-        )
+        from homeassistant.components.recorder.statistics import get_last_statistics
         try:
             # Ensure we have a statistic_id (entity_id) set
             if not self._statistic_id:
@@ -637,6 +721,35 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
 
             has_existing_stats = bool(last_stats and self._statistic_id in last_stats)
 
+            # Periodic update after an earlier run left a cursor: continue
+            # after its settled row like the startup backfill does, and
+            # resend only the hours whose readings changed.
+            cursor_store = self._get_cursor_store()
+            cursor: Optional[ImportCursor] = None
+            if (
+                cursor_store is not None
+                and has_existing_stats
+                and not force_full_fetch
+                and resume_from is None
+            ):
+                cursor = cursor_store.get(self._statistic_id)
+                last_start = last_stats[self._statistic_id][0].get("start")
+                if isinstance(last_start, (int, float)):
+                    last_start = dt_util.utc_from_timestamp(last_start)
+                if cursor is not None and (
+                    not isinstance(last_start, datetime)
+                    or last_start < cursor.settled.start
+                ):
+                    # Statistics were purged or cleared since; the cursor
+                    # points past what's stored.
+                    cursor = None
+                if cursor is not None:
+                    resume_from = cursor.settled
+                    _LOGGER.debug(
+                        "Periodic update: continuing after %s",
+                        cursor.settled.start.isoformat(),
+                    )
+
             if force_full_fetch:
                 # Initial setup / restart / manual refresh: always fetch up to
                 # 1 year of history. async_import_statistics replaces duplicate
@@ -659,6 +772,16 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
                     "history in 31-day chunks",
                     self._statistic_id,
                 )
+            elif resume_from is not None:
+                # Startup backfill: fetch only what's missing after the last
+                # contiguous stored row and continue from its cursor/sum.
+                start_date = max(
+                    resume_from.start - _RESUME_OVERLAP,
+                    end_date - _BACKFILL_WINDOW,
+                )
+                self._last_inserted_timestamp = resume_from.start
+                if self._reading_type == "consumption":
+                    self._cumulative_sum = resume_from.sum or 0.0
             elif has_existing_stats:
                 # Periodic update: just fetch recent data to keep statistics current.
                 # Historical backfill is handled by the "Fetch 30 more days" button.
@@ -668,68 +791,13 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
                 )
             else:
                 # No existing stats and not initial fetch – fetch up to 1 year
-                # (API limit is 31 days per request; _fetch_historical_chunked handles splitting)
+                # (API limit is 31 days per request; the history service splits the range)
                 start_date = end_date - timedelta(days=365)
                 self._last_inserted_timestamp = None
                 _LOGGER.info(
                     "No existing statistics, fetching up to 1 year of history in 31-day chunks"
                 )
 
-            readings = await self._fetch_historical_chunked(start_date, end_date)
-            if not readings and not has_existing_stats:
-                _LOGGER.debug("No historical readings returned for installation %s",
-                              self._installation_id)
-                return
-            
-            _LOGGER.info("Historical API returned %d readings for installation %s",
-                         len(readings), self._installation_id)
-            
-            # Debug: Log sample reading to understand structure
-            if readings and self._reading_type == "consumption":
-                sample = readings[0]
-                matching_samples = [r for r in readings[:5] if r.get("meterCounterId") == counter_id]
-                _LOGGER.debug("Sample reading keys: %s", list(sample.keys()))
-                _LOGGER.debug("Looking for meterCounterId=%s, found %d matches in first 5", 
-                              counter_id, len(matching_samples))
-                if matching_samples:
-                    _LOGGER.debug("Matching sample: %s", matching_samples[0])
-            
-            # Filter readings for this counter
-            target_id = str(counter_id)
-            counter_readings = [
-                r for r in readings 
-                if str(r.get("meterCounterId") or "") == target_id and r.get("value") is not None
-            ]
-            
-            _LOGGER.info("Filtered to %d readings for counter %s (reading_type=%s)",
-                         len(counter_readings), counter_id, self._reading_type)
-            
-            if not counter_readings:
-                _LOGGER.debug("No readings found for counter %s (reading_type=%s)", counter_id, self._reading_type)
-                return
-            
-            # Sort by timestamp
-            counter_readings.sort(key=lambda x: x.get("timestamp", ""))
-            
-            # For counter-type meters without existing statistics:
-            # Use the first reading as a baseline and subtract it from all values
-            # This prevents the Energy Dashboard from showing massive consumption (0 to current meter value)
-            # Instead, consumption starts from 0 and only shows the delta from the first reading
-            counter_baseline = None
-            if self._reading_type != "consumption" and not has_existing_stats:
-                # Get the first reading value as baseline
-                if counter_readings:
-                    first_value = counter_readings[0].get("value")
-                    if first_value is not None:
-                        if isinstance(first_value, str):
-                            counter_baseline = float(re.sub(r'[^\d.-]', '', first_value.strip()))
-                        else:
-                            counter_baseline = float(first_value)
-                        _LOGGER.debug(
-                            "Using first counter reading as baseline: %s (will subtract from all values)",
-                            counter_baseline
-                        )
-
             # Meter-swap offset bookkeeping (counter-type only).
             # `prev_raw_value` and `prev_displayed_sum` track the last seen
             # raw API value and last persisted displayed sum so we can spot
@@ -748,7 +816,13 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
             # oldest-first, so seeding the newest stored value would look
             # like a huge drop against the oldest reading — a false swap
             # that compounds the offset on every startup.
-            if (
+            if resume_from is not None:
+                # Continue from the resume row, not the newest stored row —
+                # rows after a gap are re-imported and would otherwise be
+                # compared against a value from their own future.
+                prev_raw_value = resume_from.state
+                prev_displayed_sum = resume_from.sum
+            elif (
                 should_seed_previous_from_recorder(force_full_fetch, has_existing_stats)
                 and last_stats
                 and self._statistic_id in last_stats
@@ -775,6 +849,7 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
             if (
                 self._reading_type == "consumption"
                 and not force_full_fetch
+                and resume_from is None
                 and self._cumulative_sum == 0.0
             ):
                 try:
@@ -793,174 +868,67 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
                 except Exception as err:
                     _LOGGER.debug("Could not load existing statistics: %s", err)
             
-            # Build statistics data
-            statistics: list[StatisticData] = []
-            cumulative_sum = self._cumulative_sum
-            
-            for reading in counter_readings:
-                try:
-                    timestamp_str = reading.get("timestamp")
-                    if not timestamp_str:
-                        continue
-                    
-                    timestamp = parse_api_timestamp(timestamp_str)
-                    if timestamp is None:
-                        continue
-                    timestamp = _statistics_hour_start(timestamp, self._reading_type)
-                    
-                    # Skip if we already have this timestamp
-                    if self._last_inserted_timestamp and timestamp <= self._last_inserted_timestamp:
-                        continue
-                    
-                    if self._reading_type == "consumption":
-                        # For consumption type: accumulate interval values to create virtual meter
-                        # Note: API puts interval consumption in "value" field, not "consumption"
-                        interval_value = reading.get("value")
-                        if interval_value is None:
-                            continue
-                        
-                        # Parse interval value
-                        if isinstance(interval_value, str):
-                            interval_value = float(re.sub(r'[^\d.-]', '', interval_value.strip()))
-                        else:
-                            interval_value = float(interval_value)
-                        
-                        # Only add positive consumption
-                        if interval_value > 0:
-                            cumulative_sum += interval_value
-                        
-                        statistics.append(
-                            StatisticData(
-                                start=timestamp,
-                                state=interval_value,  # Current period consumption
-                                sum=cumulative_sum,    # Virtual meter reading (accumulated)
-                            )
-                        )
-                    else:
-                        # For counter type: value is already cumulative
-                        value = reading.get("value")
-                        if value is None:
-                            continue
-
-                        # Parse value
-                        if isinstance(value, str):
-                            value = float(re.sub(r'[^\d.-]', '', value.strip()))
-                        else:
-                            value = float(value)
-
-                        # Detect a meter swap: a sudden drop in raw value that
-                        # coincides with a utility-reported serial change
-                        # (swap_pending). Re-anchoring is gated on the serial
-                        # change on purpose — a data-only fallback used to
-                        # cause false positives that silently inflated the
-                        # offset.
-                        if is_meter_swap(
-                            prev_raw_value,
-                            prev_displayed_sum,
-                            value,
-                            swap_pending,
-                            self._swap_drop_threshold,
-                        ):
-                            new_offset = compute_swap_offset(
-                                prev_displayed_sum, value
-                            )
-                            _LOGGER.warning(
-                                "Meter swap detected for %s at %s: raw value "
-                                "dropped %.4f -> %.4f. Re-anchoring offset "
-                                "%.4f -> %.4f to keep accumulated total continuous.",
-                                self._statistic_id,
-                                timestamp.isoformat(),
-                                prev_raw_value,
-                                value,
-                                self._meter_offset,
-                                new_offset,
-                            )
-                            self._meter_offset = new_offset
-                            swap_pending = False
-                            # Persist immediately so a crash mid-batch doesn't
-                            # lose the offset.
-                            counter_id_for_persist = self._counter.get("meterCounterId")
-                            if entry_id and counter_id_for_persist:
-                                offset_store = self.hass.data.get(DOMAIN, {}).get(
-                                    entry_id, {}
-                                ).get("offset_store")
-                                if offset_store is not None:
-                                    await offset_store.async_set(
-                                        self._installation_id,
-                                        counter_id_for_persist,
-                                        new_offset,
-                                    )
-                                from .. import consume_swap_pending
-                                consume_swap_pending(
-                                    self.hass, entry_id, self._installation_id
-                                )
-
-                        # Calculate displayed sum:
-                        #  - First-time install: subtract baseline (legacy
-                        #    behaviour, makes Energy Dashboard start near 0)
-                        #  - Otherwise: apply meter-swap offset (0 if no
-                        #    swap has happened)
-                        if counter_baseline is not None:
-                            displayed_sum = value - counter_baseline
-                        else:
-                            displayed_sum = value + self._meter_offset
-
-                        statistics.append(
-                            StatisticData(
-                                start=timestamp,
-                                state=value,  # Raw meter reading
-                                sum=displayed_sum,  # User-facing accumulated total
-                            )
-                        )
+            # Counter meters without stored statistics subtract their first
+            # reading as a baseline, so the Energy Dashboard starts near 0
+            # instead of showing the whole meter value as consumption. With
+            # a cursor, rows are only sent again from the first hour whose
+            # readings changed since the cursor's run.
+            stream = StatisticsStream(
+                counter_id,
+                self._reading_type,
+                dt_util.DEFAULT_TIME_ZONE,
+                after=self._last_inserted_timestamp,
+                cumulative_sum=self._cumulative_sum,
+                baseline_from_first=not has_existing_stats,
+                meter_offset=self._meter_offset,
+                previous_value=prev_raw_value,
+                previous_sum=prev_displayed_sum,
+                swap_pending=swap_pending,
+                swap_drop_threshold=self._swap_drop_threshold,
+                previous_digests=cursor.digests if cursor is not None else None,
+            )
+            imported, first_start, last_start = await self._async_import_history(
+                stream, start_date, end_date
+            )
 
-                        prev_raw_value = value
-                        prev_displayed_sum = displayed_sum
+            _LOGGER.info("Filtered to %d readings for counter %s (reading_type=%s)",
+                         stream.matched, counter_id, self._reading_type)
+            if not stream.matched:
+                _LOGGER.debug("No readings found for counter %s (reading_type=%s)", counter_id, self._reading_type)
+                return
+            if stream.baseline is not None:
+                _LOGGER.debug(
+                    "Used first counter reading as baseline: %s (subtracted from all values)",
+                    stream.baseline,
+                )
 
-                except (ValueError, TypeError) as err:
-                    _LOGGER.debug("Error parsing reading: %s - %s", reading, err)
-                    continue
-            
             # Update cumulative sum for next time
             if self._reading_type == "consumption":
-                self._cumulative_sum = cumulative_sum
-            
-            if not statistics:
+                self._cumulative_sum = stream.cumulative_sum
+
+            if cursor_store is not None:
+                # Rows built on a first-install baseline can't be continued
+                # (see find_resume_point); those fall back to the 7-day
+                # re-import until a backfill rebuilds them.
+                cursor_store.async_set(
+                    self._statistic_id,
+                    stream.next_cursor(cursor) if stream.baseline is None else None,
+                )
+
+            if not imported:
                 _LOGGER.debug("No new statistics to insert for counter %s", counter_id)
                 return
-            
-            # Import statistics into the sensor's history using its entity_id
-            # This allows the Energy Dashboard to see the historical data
-            if not self._statistic_id:
-                _LOGGER.warning("Cannot insert statistics: entity_id not set yet")
-                return
-            
-            # Create metadata - use "recorder" as source for sensor statistics
-            metadata = StatisticMetaData(
-                has_mean=False,
-                has_sum=True,
-                mean_type=StatisticMeanType.NONE,
-                name=self.name or f"{self._base_device_name}",
-                source="recorder",
-                statistic_id=self._statistic_id,
-                unit_of_measurement=self._stat_unit,
-                unit_class=self._unit_class,
-            )
-            
-            # Insert statistics using async_import_statistics
-            # This imports into the sensor's existing statistics
-            async_import_statistics(self.hass, metadata, statistics)
 
             # Update last inserted timestamp
-            if statistics:
-                self._last_inserted_timestamp = statistics[-1]["start"]
+            self._last_inserted_timestamp = last_start
 
             self._last_stats_update = datetime.now(timezone.utc)
             _LOGGER.info(
                 "Inserted %d statistics records for %s (from %s to %s)",
-                len(statistics),
+                imported,
                 self._statistic_id,
-                statistics[0]["start"].isoformat() if statistics else "N/A",
-                statistics[-1]["start"].isoformat() if statistics else "N/A",
+                first_start.isoformat(),
+                last_start.isoformat(),
             )
             
             # Update entity state for consumption-type meters to reflect new cumulative sum
@@ -974,84 +942,154 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
         except Exception as err:
             _LOGGER.exception("Unexpected error updating statistics: %s", err)
 
-    async def _fetch_historical_chunked(
+    async def _async_apply_swap(
+        self, swap: SwapEvent, entry_id: Optional[str]
+    ) -> None:
+        """Adopt and persist the offset of a meter swap found while building."""
+        _LOGGER.warning(
+            "Meter swap detected for %s at %s: raw value "
+            "dropped %.4f -> %.4f. Re-anchoring offset "
+            "%.4f -> %.4f to keep accumulated total continuous.",
+            self._statistic_id,
+            swap.start.isoformat(),
+            swap.previous_value,
+            swap.value,
+            swap.old_offset,
+            swap.new_offset,
+        )
+        self._meter_offset = swap.new_offset
+        # Persist before the rows are imported, so a crash in between
+        # doesn't lose the offset.
+        counter_id = self._counter.get("meterCounterId")
+        if entry_id and counter_id:
+            offset_store = self.hass.data.get(DOMAIN, {}).get(
+                entry_id, {}
+            ).get("offset_store")
+            if offset_store is not None:
+                await offset_store.async_set(
+                    self._installation_id, counter_id, swap.new_offset
+                )
+            from .. import consume_swap_pending
+            consume_swap_pending(self.hass, entry_id, self._installation_id)
+
+    def _get_cursor_store(self) -> Any:
+        """Return the entry's StatisticsCursorStore, if set up."""
+        return self.hass.data.get(DOMAIN, {}).get(
+            self._get_entry_id() or "", {}
+        ).get("cursor_store")
+
+    def _get_history_service(self) -> Any:
+        """Return the installation's shared HistoricalReadingsService."""
+        return self.hass.data.get(DOMAIN, {}).get(
+            self._get_entry_id() or "", {}
+        ).get("history_services", {}).get(self._installation_id)
+
+    def _statistic_metadata(self) -> StatisticMetaData:
+        """Recorder metadata for this sensor's imported statistics."""
+        from homeassistant.components.recorder.models import (
+            StatisticMeanType,
+            StatisticMetaData,
+        )
+
+        # "recorder" as source imports into the sensor's own statistics.
+        return StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            mean_type=StatisticMeanType.NONE,
+            name=self.name or f"{self._base_device_name}",
+            source="recorder",
+            statistic_id=self._statistic_id,
+            unit_of_measurement=self._stat_unit,
+            unit_class=self._unit_class,
+        )
+
+    async def _async_import_history(
         self,
+        stream: StatisticsStream,
         start_date: datetime,
         end_date: datetime,
-    ) -> list[dict]:
-        """Fetch historical readings in ≤31-day chunks to respect the API limit.
-
-        The API returns HTTP 500 with "Date range cannot exceed 31 days" for
-        larger windows, so we split automatically and return all readings merged.
+    ) -> tuple[int, Optional[datetime], Optional[datetime]]:
+        """Stream this counter's readings in ``[start_date, end_date]`` into statistics.
+
+        The installation's shared HistoricalReadingsService hands over one
+        ≤31-day chunk at a time (the API returns HTTP 500 for larger
+        windows). Each chunk is built into rows by ``stream`` in the
+        executor and imported in batches of at most ``_IMPORT_BATCH``
+        rows before the next chunk is looked at, so a year-long backfill
+        never holds more than a chunk of readings and rows. A meter swap
+        found in a chunk is persisted before that chunk is imported.
+
+        Returns the number of rows imported and the first and last hour
+        imported.
         """
-        MAX_CHUNK_DAYS = 31
-        session = async_get_clientsession(self.hass)
-        all_readings: list[dict] = []
-        chunk_end = end_date
-
-        while chunk_end > start_date:
-            chunk_start = max(chunk_end - timedelta(days=MAX_CHUNK_DAYS), start_date)
-            from_str = chunk_start.strftime("%Y-%m-%dT%H:%M:%SZ")
-            to_str = chunk_end.strftime("%Y-%m-%dT%H:%M:%SZ")
+        from homeassistant.components.recorder.statistics import (
+            async_import_statistics,
+        )
 
-            try:
-                response = await session.post(
-                    f"{self._smarthome_base_url}/installations/{self._installation_id}/readings/historical",
-                    json={"from": from_str, "to": to_str},
-                    headers={"ApiKey": self._api_key, "Content-Type": "application/json"},
-                    timeout=aiohttp.ClientTimeout(total=60),
+        service = self._get_history_service()
+        if service is None:
+            _LOGGER.debug(
+                "No history service for installation %s", self._installation_id
+            )
+            return 0, None, None
+
+        metadata = self._statistic_metadata()
+        imported = 0
+        first_start: Optional[datetime] = None
+        last_start: Optional[datetime] = None
+        swap_applied = False
+
+        async def _async_import(rows: list[StatisticData]) -> None:
+            nonlocal imported, first_start, last_start, swap_applied
+            if stream.swap is not None and not swap_applied:
+                swap_applied = True
+                await self._async_apply_swap(stream.swap, self._get_entry_id())
+            if not rows:
+                return
+            for index in range(0, len(rows), _IMPORT_BATCH):
+                async_import_statistics(
+                    self.hass, metadata, rows[index:index + _IMPORT_BATCH]
                 )
+            imported += len(rows)
+            if first_start is None:
+                first_start = rows[0]["start"]
+            last_start = rows[-1]["start"]
 
-                if response.status == 429:
-                    _LOGGER.warning("Rate limit exceeded during chunked history fetch, stopping early")
-                    break
-
-                if response.status in (404, 403):
-                    _LOGGER.warning(
-                        "Installation %s no longer accessible (HTTP %s)",
-                        self._installation_id, response.status,
-                    )
-                    await self._handle_installation_unavailable()
-                    return all_readings
-
-                if not response.ok:
-                    _LOGGER.error(
-                        "Chunked history request failed: HTTP %s (%s to %s)",
-                        response.status, from_str, to_str,
-                    )
-                    break
-
-                data = await response.json()
-                chunk_readings = data.get("readings", [])
-                all_readings.extend(chunk_readings)
-                if chunk_readings:
-                    _LOGGER.info(
-                        "Chunk %s → %s: %d readings", from_str, to_str, len(chunk_readings)
-                    )
-                    # Archive each historical reading. Dedup in the
-                    # readings_log makes overlapping chunks safe.
-                    readings_log = self.hass.data.get(DOMAIN, {}).get(
-                        self._get_entry_id() or "", {}
-                    ).get("readings_logs", {}).get(self._installation_id)
-                    if readings_log is not None:
-                        await readings_log.async_record_many(
-                            chunk_readings, source="historical"
-                        )
-                else:
-                    _LOGGER.debug(
-                        "Chunk %s → %s: 0 readings", from_str, to_str
-                    )
-
-            except asyncio.TimeoutError:
-                _LOGGER.warning("Timeout fetching chunk %s to %s", from_str, to_str)
-                break
-            except aiohttp.ClientError as err:
-                _LOGGER.error("Connection error fetching chunk: %s", err)
-                break
-
-            chunk_end = chunk_start - timedelta(seconds=1)
+        try:
+            async for chunk in service.async_iter_chunks(
+                start_date,
+                end_date,
+                counter_id=self._counter.get("meterCounterId"),
+                # The service lifts the recent chunks to Priority.STATISTICS.
+                priority=Priority.BACKFILL,
+            ):
+                rows = await self.hass.async_add_executor_job(
+                    stream.feed, chunk.readings
+                )
+                await _async_import(rows)
+                self._report_import_progress(chunk, imported)
+            await _async_import(stream.close())
+        except InstallationUnavailableError:
+            await self._handle_installation_unavailable()
+        finally:
+            if self._import_progress is not None:
+                self._import_progress = None
+                self.async_write_ha_state()
+        return imported, first_start, last_start
 
-        return all_readings
+    def _report_import_progress(self, chunk: HistoryChunk, imported: int) -> None:
+        """Log a finished chunk; multi-chunk imports also show it as an attribute."""
+        _LOGGER.debug(
+            "%s: chunk %d/%d (%s) done, %d statistics rows imported so far",
+            self._statistic_id,
+            chunk.index,
+            chunk.total,
+            chunk.start.date().isoformat(),
+            imported,
+        )
+        if chunk.total > 1:
+            self._import_progress = round(100 * chunk.index / chunk.total)
+            self.async_write_ha_state()
 
     async def async_fetch_older_history(self, from_days_ago: int, to_days_ago: int) -> int:
         """Fetch older historical data for a specific date range and insert into statistics."""
@@ -1059,13 +1097,6 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
             _LOGGER.warning("Cannot fetch older history: entity_id not set yet")
             return 0
             
-        from homeassistant.components.recorder.models import (
-            StatisticData,
-            StatisticMeanType,
-            StatisticMetaData,
-        )
-        from homeassistant.components.recorder.statistics import async_import_statistics
-        
         counter_id = self._counter.get("meterCounterId")
         if not counter_id:
             _LOGGER.warning("No meterCounterId available for older history fetch")
@@ -1085,117 +1116,33 @@ class MaalerportalStatisticSensor(MaalerportalPollingSensor, RestoreEntity):
                 start_date_iso, end_date_iso
             )
 
-            readings = await self._fetch_historical_chunked(start_date, fetch_end_date)
-            _LOGGER.debug("Older history: %d total readings across all chunks", len(readings))
-            
-            _LOGGER.debug("Older history API returned %d readings", len(readings))
-            
-            # Filter readings for this counter
-            target_id = str(counter_id)
-            counter_readings = [
-                r for r in readings
-                if str(r.get("meterCounterId") or "") == target_id and r.get("value") is not None
-            ]
-            
-            if not counter_readings:
+            # Counter-type batches subtract their first reading as baseline;
+            # consumption batches start their running sum at 0.
+            stream = StatisticsStream(
+                counter_id,
+                self._reading_type,
+                dt_util.DEFAULT_TIME_ZONE,
+                baseline_from_first=True,
+            )
+            imported, first_start, last_start = await self._async_import_history(
+                stream, start_date, fetch_end_date
+            )
+            if not stream.matched:
                 _LOGGER.info("No older readings found for counter %s", counter_id)
                 return 0
-            
-            # Sort by timestamp
-            counter_readings.sort(key=lambda x: x.get("timestamp", ""))
-            
-            # For counter-type: use the first reading as baseline
-            counter_baseline = None
-            if self._reading_type != "consumption":
-                first_value = counter_readings[0].get("value")
-                if first_value is not None:
-                    if isinstance(first_value, str):
-                        counter_baseline = float(re.sub(r'[^\d.-]', '', first_value.strip()))
-                    else:
-                        counter_baseline = float(first_value)
-            
-            # For consumption type, start cumulative sum at 0 for this batch
-            cumulative_sum = 0.0
-            
-            # Build statistics data
-            statistics: list[StatisticData] = []
-            
-            for reading in counter_readings:
-                try:
-                    timestamp_str = reading.get("timestamp")
-                    if not timestamp_str:
-                        continue
-                    
-                    timestamp = parse_api_timestamp(timestamp_str)
-                    if timestamp is None:
-                        continue
-                    timestamp = _statistics_hour_start(timestamp, self._reading_type)
-                    
-                    if self._reading_type == "consumption":
-                        interval_value = reading.get("value")
-                        if interval_value is None:
-                            continue
-                        if isinstance(interval_value, str):
-                            interval_value = float(re.sub(r'[^\d.-]', '', interval_value.strip()))
-                        else:
-                            interval_value = float(interval_value)
-                        if interval_value > 0:
-                            cumulative_sum += interval_value
-                        statistics.append(
-                            StatisticData(
-                                start=timestamp,
-                                state=interval_value,
-                                sum=cumulative_sum,
-                            )
-                        )
-                    else:
-                        value = reading.get("value")
-                        if value is None:
-                            continue
-                        if isinstance(value, str):
-                            value = float(re.sub(r'[^\d.-]', '', value.strip()))
-                        else:
-                            value = float(value)
-                        relative_sum = value - counter_baseline if counter_baseline is not None else value
-                        statistics.append(
-                            StatisticData(
-                                start=timestamp,
-                                state=value,
-                                sum=relative_sum,
-                            )
-                        )
-                except (ValueError, TypeError) as err:
-                    _LOGGER.debug("Error parsing older reading: %s - %s", reading, err)
-                    continue
-            
-            if not statistics:
+            if not imported:
                 _LOGGER.info("No new older statistics to insert for counter %s", counter_id)
                 return 0
-            
-            # Create metadata
-            metadata = StatisticMetaData(
-                has_mean=False,
-                has_sum=True,
-                mean_type=StatisticMeanType.NONE,
-                name=self.name or f"{self._base_device_name}",
-                source="recorder",
-                statistic_id=self._statistic_id,
-                unit_of_measurement=self._stat_unit,
-                unit_class=self._unit_class,
-            )
-            
-            # Insert older statistics
-            async_import_statistics(self.hass, metadata, statistics)
 
             _LOGGER.info(
                 "Inserted %d older statistics records for %s (from %s to %s)",
-                len(statistics),
+                imported,
                 self._statistic_id,
-                statistics[0]["start"].isoformat() if statistics else "N/A",
-                statistics[-1]["start"].isoformat() if statistics else "N/A",
+                first_start.isoformat(),
+                last_start.isoformat(),
             )
             
-            return len(statistics)
+            return imported
             
         except asyncio.TimeoutError:
             _LOGGER.warning("Timeout fetching older history")
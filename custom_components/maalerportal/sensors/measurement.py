@@ -3,8 +3,9 @@ from __future__ import annotations
 
 import logging
 from collections import defaultdict
-from datetime import datetime, timedelta, timezone
-from typing import Any, Iterable
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Mapping
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -22,9 +23,11 @@ from homeassistant.const import (
     UnitOfPower,
 )
 
-from ..const import DOMAIN, RECENT_BUFFER_SIZE
+from ..const import DOMAIN
 from ..coordinator import MaalerportalCoordinator
-from ..timeutils import parse_api_timestamp
+from ..counter_index import CounterIndex
+from ..timeutils import parse_api_timestamp, to_local
+from ..usage import numeric_value
 from .base import (
     MaalerportalCoordinatorSensor,
     MaalerportalPollingSensor,
@@ -41,61 +44,40 @@ _SV_WEEKDAYS = ["mån", "tis", "ons", "tors", "fre", "lör", "sön"]
 
 def _localize_api_timestamp(timestamp: str | None) -> dict[str, str]:
     """Return local timestamp fields for user-facing table attributes."""
-    parsed = parse_api_timestamp(timestamp)
-    if parsed is None:
+    if not isinstance(timestamp, str):
         return {}
-    local = dt_util.as_local(parsed)
-    return {
-        "timestamp": local.isoformat(),
-        "timestamp_utc": parsed.astimezone(timezone.utc).isoformat(),
-        "date": local.strftime("%Y-%m-%d"),
-        "time": local.strftime("%H:%M"),
-        "timezone": local.tzname() or "",
-    }
-
-
-def _numeric_value(value: Any) -> float | None:
-    try:
-        return float(str(value).replace(",", ".").strip())
-    except (TypeError, ValueError):
-        return None
+    return dict(_localized_fields(timestamp, dt_util.DEFAULT_TIME_ZONE))
 
 
-def _delta_to_liters(delta: float, unit: str | None) -> float:
-    normalized = (unit or "").lower()
-    if normalized in {"m3", "m³", "m^3", "cubic_meter", "cubic_meters"}:
-        return delta * 1000
-    return delta
-
+@lru_cache(maxsize=1024)
+def _localized_fields(
+    timestamp: str, local_tz: tzinfo
+) -> tuple[tuple[str, str], ...]:
+    # The readings table re-renders the same timestamps on every refresh.
+    parsed = parse_api_timestamp(timestamp)
+    if parsed is None:
+        return ()
+    local = to_local(parsed, local_tz)
+    return (
+        ("timestamp", local.isoformat()),
+        ("timestamp_utc", parsed.astimezone(timezone.utc).isoformat()),
+        ("date", local.strftime("%Y-%m-%d")),
+        ("time", local.strftime("%H:%M")),
+        ("timezone", local.tzname() or ""),
+    )
 
-def _dashboard_usage_summary(readings: Iterable[dict[str, Any]]) -> dict[str, Any]:
-    """Build app-style water usage summaries from cumulative readings."""
-    rows: list[tuple[datetime, float, str]] = []
-    for reading in readings:
-        timestamp = parse_api_timestamp(reading.get("timestamp"))
-        value = _numeric_value(reading.get("value"))
-        if timestamp is None or value is None:
-            continue
-        rows.append((timestamp, value, str(reading.get("unit") or "")))
 
-    rows.sort(key=lambda row: row[0])
-    if len(rows) < 2:
-        return {}
+def _usage_summary(hourly_usage: Mapping[datetime, float]) -> dict[str, Any]:
+    """Build the usage summary from liters per UTC hour.
 
+    Walks at most the hours of the usage window, independent of how many
+    readings produced them.
+    """
     daily: dict[str, float] = defaultdict(float)
     hourly: dict[str, float] = defaultdict(float)
-    for previous, current in zip(rows, rows[1:]):
-        previous_ts, previous_value, _ = previous
-        current_ts, current_value, unit = current
-        if current_ts <= previous_ts:
-            continue
-        delta = current_value - previous_value
-        if delta <= 0:
-            continue
-        liters = _delta_to_liters(delta, unit)
-        local = dt_util.as_local(current_ts)
-        local_hour = local.replace(minute=0, second=0, microsecond=0)
-        daily[local.date().isoformat()] += liters
+    for utc_hour, liters in hourly_usage.items():
+        local_hour = to_local(utc_hour, dt_util.DEFAULT_TIME_ZONE)
+        daily[local_hour.date().isoformat()] += liters
         hourly[local_hour.isoformat()] += liters
 
     if not daily:
@@ -212,42 +194,32 @@ class MaalerportalMainSensor(MaalerportalCoordinatorSensor):
             self._attr_native_unit_of_measurement = counter.get("unit")
             self._attr_state_class = SensorStateClass.MEASUREMENT
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update main sensor from primary counter."""
-        our_id = str(self._counter.get("meterCounterId") or "")
-        for counter in meter_counters:
-            counter_id = str(counter.get("meterCounterId") or "")
-            _LOGGER.debug(
-                "Updating %s: comparing counter %s with expected %s",
-                self.entity_id,
-                counter_id,
-                our_id
-            )
-            if our_id and counter_id == our_id:
-                _LOGGER.debug("ID match found for %s", counter_id)
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    # Ensure positive value for meters
-                    if value < 0:
-                        _LOGGER.warning("Negative meter value received, taking absolute value: %s", value)
-                        value = abs(value)
-                    
-                    # Check if value changed before firing event
-                    old_value = self._attr_native_value
-                    self._attr_native_value = value
-                    _LOGGER.debug("Updated main sensor %s value: %s %s", self.entity_id, value, counter.get("unit", ""))
-                    
-                    # Fire event if value changed and hass is available
-                    if self.hass and (old_value is None or old_value != value):
-                        self.hass.bus.fire(EVENT_METER_UPDATED, {
-                            "installation_id": self._installation_id,
-                            "meter_value": value,
-                            "unit": counter.get("unit", ""),
-                            "counter_type": counter.get("counterType", ""),
-                            "timestamp": counter.get("latestTimestamp"),
-                        })
-                        _LOGGER.debug("Fired %s event for installation %s", EVENT_METER_UPDATED, self._installation_id)
-                break
+        reading = self._own_reading(counters)
+        if reading is None or reading.value is None:
+            return
+        value = reading.value
+        # Ensure positive value for meters
+        if value < 0:
+            _LOGGER.warning("Negative meter value received, taking absolute value: %s", value)
+            value = abs(value)
+
+        # Check if value changed before firing event
+        old_value = self._attr_native_value
+        self._attr_native_value = value
+        _LOGGER.debug("Updated main sensor %s value: %s %s", self.entity_id, value, reading.unit)
+
+        # Fire event if value changed and hass is available
+        if self.hass and (old_value is None or old_value != value):
+            self.hass.bus.fire(EVENT_METER_UPDATED, {
+                "installation_id": self._installation_id,
+                "meter_value": value,
+                "unit": reading.unit,
+                "counter_type": reading.counter_type,
+                "timestamp": reading.raw_timestamp,
+            })
+            _LOGGER.debug("Fired %s event for installation %s", EVENT_METER_UPDATED, self._installation_id)
 
 
 class MaalerportalBasicSensor(MaalerportalPollingSensor):
@@ -289,7 +261,7 @@ class MaalerportalBasicSensor(MaalerportalPollingSensor):
             self._attr_state_class = SensorStateClass.MEASUREMENT
 
     async def async_update(self) -> None:
-        """Fetch data from API with throttling."""
+        """Read the latest values from the installation's coordinator."""
         await super().async_update()
 
     def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
@@ -332,25 +304,12 @@ class MaalerportalBatterySensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:battery"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update battery sensor."""
-        our_id = str(self._counter.get("meterCounterId") or "")
-        for counter in meter_counters:
-            counter_id = str(counter.get("meterCounterId") or "")
-            counter_type = counter.get("counterType")
-            
-            _LOGGER.debug(
-                "Checking counter %s for battery matching: type %s (expected BatteryDaysRemaining)",
-                counter_id,
-                counter_type
-            )
-            
-            if counter_type == "BatteryDaysRemaining":
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = int(value)
-                    _LOGGER.debug("Updated battery days: %s", value)
-                break
+        reading = counters.first_of_type("BatteryDaysRemaining")
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = int(reading.value)
+            _LOGGER.debug("Updated battery days: %s", reading.value)
 
 
 class MaalerportalTemperatureSensor(MaalerportalCoordinatorSensor):
@@ -376,17 +335,12 @@ class MaalerportalTemperatureSensor(MaalerportalCoordinatorSensor):
         self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
         self._attr_state_class = SensorStateClass.MEASUREMENT
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update temperature sensor."""
-        our_id = str(self._counter.get("meterCounterId") or "")
-        for counter in meter_counters:
-            counter_id = str(counter.get("meterCounterId") or "")
-            if our_id and counter_id == our_id:
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 1)
-                    _LOGGER.debug("Updated ambient temperature: %s°C", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 1)
+            _LOGGER.debug("Updated ambient temperature: %s°C", reading.value)
 
 
 class MaalerportalWaterTemperatureSensor(MaalerportalCoordinatorSensor):
@@ -412,17 +366,12 @@ class MaalerportalWaterTemperatureSensor(MaalerportalCoordinatorSensor):
         self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
         self._attr_state_class = SensorStateClass.MEASUREMENT
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update water temperature sensor."""
-        our_id = str(self._counter.get("meterCounterId") or "")
-        for counter in meter_counters:
-            counter_id = str(counter.get("meterCounterId") or "")
-            if our_id and counter_id == our_id:
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 1)
-                    _LOGGER.debug("Updated water temperature: %s°C", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 1)
+            _LOGGER.debug("Updated water temperature: %s°C", reading.value)
 
 
 class MaalerportalFlowSensor(MaalerportalCoordinatorSensor):
@@ -448,17 +397,12 @@ class MaalerportalFlowSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:water-pump"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update flow sensor."""
-        our_id = str(self._counter.get("meterCounterId") or "")
-        for counter in meter_counters:
-            counter_id = str(counter.get("meterCounterId") or "")
-            if our_id and counter_id == our_id:
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 3)
-                    _LOGGER.debug("Updated flow: %s L/h", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 3)
+            _LOGGER.debug("Updated flow: %s L/h", reading.value)
 
 
 class MaalerportalCurrentFlowSensor(MaalerportalCoordinatorSensor):
@@ -488,16 +432,11 @@ class MaalerportalCurrentFlowSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:water-sync"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update from coordinator data."""
-        our_id = str(self._counter.get("meterCounterId") or "")
-        for counter in meter_counters:
-            counter_id = str(counter.get("meterCounterId") or "")
-            if our_id and counter_id == our_id:
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 3)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 3)
 
 
 class MaalerportalLastReadingSensor(MaalerportalCoordinatorSensor):
@@ -542,24 +481,17 @@ class MaalerportalLastReadingSensor(MaalerportalCoordinatorSensor):
         override the entity's native_value property would still compute
         the current timestamp correctly, but HA never re-reads it — so
         the state appears frozen at whatever the first refresh produced.
+        Refreshes that changed no counter at all are skipped like in the
+        base class.
         """
+        if not self._needs_state_write(self.coordinator.any_counter_changed):
+            return
         self.async_write_ha_state()
 
     @property
     def native_value(self) -> datetime | None:
-        if not self.coordinator.data:
-            return None
-        latest: datetime | None = None
-        for counter in self.coordinator.data.get("meterCounters", []):
-            ts = counter.get("latestTimestamp")
-            if not ts:
-                continue
-            parsed = parse_api_timestamp(ts)
-            if parsed is None:
-                continue
-            if latest is None or parsed > latest:
-                latest = parsed
-        return latest
+        latest = self.coordinator.counters.latest
+        return latest.timestamp if latest is not None else None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -574,15 +506,18 @@ class MaalerportalLastReadingSensor(MaalerportalCoordinatorSensor):
         attrs: dict[str, Any] = {"installation_id": self._installation_id}
         if not self.coordinator.data:
             return attrs
+        counters = self.coordinator.counters
         per_counter: dict[str, str] = {}
-        primary_counter_id: str | None = None
-        for counter in self.coordinator.data.get("meterCounters", []):
-            counter_type = counter.get("counterType")
-            ts = counter.get("latestTimestamp")
-            if counter_type and ts:
-                per_counter[counter_type] = _localize_api_timestamp(ts).get("timestamp", ts)
-            if counter.get("isPrimary"):
-                primary_counter_id = counter.get("meterCounterId")
+        for reading in counters:
+            ts = reading.raw_timestamp
+            if reading.counter_type and ts:
+                per_counter[reading.counter_type] = _localize_api_timestamp(ts).get(
+                    "timestamp", ts
+                )
+        primary = counters.primary
+        primary_counter_id = (
+            primary.counter.get("meterCounterId") if primary is not None else None
+        )
         if per_counter:
             attrs["per_counter_timestamp"] = per_counter
 
@@ -597,12 +532,9 @@ class MaalerportalLastReadingSensor(MaalerportalCoordinatorSensor):
                 rl = entry_data.get("readings_logs", {}).get(self._installation_id)
                 if rl is None:
                     continue
-                summary_recent = rl.recent_readings(
-                    counter_id=primary_counter_id,
-                    n=RECENT_BUFFER_SIZE,
-                )
-                if summary_recent:
-                    attrs.update(_dashboard_usage_summary(summary_recent))
+                hourly_usage = rl.usage_hourly(primary_counter_id)
+                if hourly_usage:
+                    attrs.update(_usage_summary(hourly_usage))
                 recent = rl.recent_readings(
                     counter_id=primary_counter_id,
                     n=self._recent_readings_count,
@@ -615,7 +547,7 @@ class MaalerportalLastReadingSensor(MaalerportalCoordinatorSensor):
                     attrs["recent_readings"] = [
                         {
                             **_localize_api_timestamp(r.get("timestamp")),
-                            "value": _numeric_value(r.get("value")),
+                            "value": numeric_value(r.get("value")),
                             "unit": r.get("unit"),
                         }
                         for r in recent
@@ -641,15 +573,12 @@ class MaalerportalNoiseSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:volume-high"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update noise sensor."""
-        for counter in meter_counters:
-            if counter.get("counterType") == "AcousticNoise":
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = int(value)
-                    _LOGGER.debug("Updated acoustic noise: %s Hz", value)
-                break
+        reading = counters.first_of_type("AcousticNoise")
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = int(reading.value)
+            _LOGGER.debug("Updated acoustic noise: %s Hz", reading.value)
 
 
 class MaalerportalSecondarySensor(MaalerportalCoordinatorSensor):
@@ -694,31 +623,28 @@ class MaalerportalSecondarySensor(MaalerportalCoordinatorSensor):
         self._attr_unique_id = f"{self._installation_id}_{counter_type.lower()}_secondary"
         self._attr_state_class = SensorStateClass.TOTAL_INCREASING
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update secondary sensor."""
-        for counter in meter_counters:
-            if counter.get("meterCounterId") == self._counter.get("meterCounterId"):
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    if value < 0:
-                        value = abs(value)
-                    
-                    # Check if value changed before firing event
-                    old_value = self._attr_native_value
-                    self._attr_native_value = value
-                    _LOGGER.debug("Updated secondary sensor %s: %s %s", 
-                                self._counter.get("counterType"), value, counter.get("unit", ""))
-                    
-                    # Fire event if value changed and hass is available
-                    if self.hass and (old_value is None or old_value != value):
-                        self.hass.bus.fire(EVENT_METER_UPDATED, {
-                            "installation_id": self._installation_id,
-                            "meter_value": value,
-                            "unit": counter.get("unit", ""),
-                            "counter_type": counter.get("counterType", ""),
-                            "timestamp": counter.get("latestTimestamp"),
-                        })
-                break
+        reading = self._own_reading(counters)
+        if reading is None or reading.value is None:
+            return
+        value = abs(reading.value)
+
+        # Check if value changed before firing event
+        old_value = self._attr_native_value
+        self._attr_native_value = value
+        _LOGGER.debug("Updated secondary sensor %s: %s %s",
+                      reading.counter_type, value, reading.unit)
+
+        # Fire event if value changed and hass is available
+        if self.hass and (old_value is None or old_value != value):
+            self.hass.bus.fire(EVENT_METER_UPDATED, {
+                "installation_id": self._installation_id,
+                "meter_value": value,
+                "unit": reading.unit,
+                "counter_type": reading.counter_type,
+                "timestamp": reading.raw_timestamp,
+            })
 
 
 class MaalerportalSupplyTempSensor(MaalerportalCoordinatorSensor):
@@ -739,15 +665,12 @@ class MaalerportalSupplyTempSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:thermometer-chevron-up"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update supply temperature sensor."""
-        for counter in meter_counters:
-            if counter.get("meterCounterId") == self._counter.get("meterCounterId"):
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 1)
-                    _LOGGER.debug("Updated supply temperature: %s°C", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 1)
+            _LOGGER.debug("Updated supply temperature: %s°C", reading.value)
 
 
 class MaalerportalReturnTempSensor(MaalerportalCoordinatorSensor):
@@ -768,15 +691,12 @@ class MaalerportalReturnTempSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:thermometer-chevron-down"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update return temperature sensor."""
-        for counter in meter_counters:
-            if counter.get("meterCounterId") == self._counter.get("meterCounterId"):
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 1)
-                    _LOGGER.debug("Updated return temperature: %s°C", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 1)
+            _LOGGER.debug("Updated return temperature: %s°C", reading.value)
 
 
 class MaalerportalTempDiffSensor(MaalerportalCoordinatorSensor):
@@ -797,15 +717,12 @@ class MaalerportalTempDiffSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:thermometer-lines"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update temperature difference sensor."""
-        for counter in meter_counters:
-            if counter.get("meterCounterId") == self._counter.get("meterCounterId"):
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 1)
-                    _LOGGER.debug("Updated temperature difference: %s°C", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 1)
+            _LOGGER.debug("Updated temperature difference: %s°C", reading.value)
 
 
 class MaalerportalHeatPowerSensor(MaalerportalCoordinatorSensor):
@@ -826,15 +743,12 @@ class MaalerportalHeatPowerSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:fire"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update heat power sensor."""
-        for counter in meter_counters:
-            if counter.get("meterCounterId") == self._counter.get("meterCounterId"):
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 2)
-                    _LOGGER.debug("Updated heat power: %s kW", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 2)
+            _LOGGER.debug("Updated heat power: %s kW", reading.value)
 
 
 class MaalerportalHeatVolumeSensor(MaalerportalCoordinatorSensor):
@@ -855,12 +769,9 @@ class MaalerportalHeatVolumeSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.TOTAL_INCREASING
         self._attr_icon = "mdi:water-thermometer"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update heat volume sensor."""
-        for counter in meter_counters:
-            if counter.get("meterCounterId") == self._counter.get("meterCounterId"):
-                value = self._parse_counter_value(counter)
-                if value is not None:
-                    self._attr_native_value = round(value, 3)
-                    _LOGGER.debug("Updated heat volume: %s m³", value)
-                break
+        reading = self._own_reading(counters)
+        if reading is not None and reading.value is not None:
+            self._attr_native_value = round(reading.value, 3)
+            _LOGGER.debug("Updated heat volume: %s m³", reading.value)
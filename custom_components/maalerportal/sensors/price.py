@@ -6,6 +6,7 @@ import logging
 from homeassistant.components.sensor import SensorStateClass
 
 from ..coordinator import MaalerportalCoordinator
+from ..counter_index import CounterIndex
 from .base import MaalerportalCoordinatorSensor
 
 _LOGGER = logging.getLogger(__name__)
@@ -30,17 +31,16 @@ class MaalerportalPriceSensor(MaalerportalCoordinatorSensor):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:currency-usd"
 
-    def _update_from_meter_counters(self, meter_counters: list[dict]) -> None:
+    def _update_from_counters(self, counters: CounterIndex) -> None:
         """Update price sensor."""
-        for counter in meter_counters:
-            if (counter.get("meterCounterId") == self._counter.get("meterCounterId") and 
-                counter.get("isPrimary", False)):
-                price_per_unit = counter.get("pricePerUnit")
-                if price_per_unit is not None:
-                    # Convert from hundredths (öre/øre/cent) to main currency unit
-                    price_in_main_unit = price_per_unit / 100
-                    self._attr_native_value = round(price_in_main_unit, 4)
-                    _LOGGER.debug("Updated price per unit: %s %s/%s",
-                                price_in_main_unit, self._attr_native_unit_of_measurement.split("/")[0],
-                                counter.get("unit", ""))
-                break
+        reading = self._own_reading(counters)
+        if reading is None or not reading.is_primary:
+            return
+        price_per_unit = reading.counter.get("pricePerUnit")
+        if price_per_unit is not None:
+            # Convert from hundredths (öre/øre/cent) to main currency unit
+            price_in_main_unit = price_per_unit / 100
+            self._attr_native_value = round(price_in_main_unit, 4)
+            _LOGGER.debug("Updated price per unit: %s %s/%s",
+                          price_in_main_unit, self._attr_native_unit_of_measurement.split("/")[0],
+                          reading.unit)
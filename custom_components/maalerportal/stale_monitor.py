@@ -13,20 +13,20 @@ Store so we don't re-fetch on every poll.
 """
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, timedelta, timezone
 import logging
 from typing import Any
 
-import aiohttp
-
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.storage import Store
 
+from .api import InstallationUnavailableError
 from .const import DOMAIN
 from .coordinator import MaalerportalCoordinator
+from .scheduler import Priority
+from .timeutils import parse_api_timestamp
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -62,13 +62,6 @@ def _issue_id(installation_id: str) -> str:
     return f"stale_data_{installation_id}"
 
 
-def _parse_iso(ts: str) -> datetime | None:
-    try:
-        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
-    except (TypeError, ValueError, AttributeError):
-        return None
-
-
 def _median_delta(timestamps: list[datetime]) -> timedelta | None:
     if len(timestamps) < _MIN_SAMPLES_FOR_AUTOTUNE:
         return None
@@ -108,7 +101,7 @@ class StaleDataStore:
         computed_at = bucket.get("cadence_computed_at")
         if seconds is None or computed_at is None:
             return None
-        cached_dt = _parse_iso(computed_at)
+        cached_dt = parse_api_timestamp(computed_at)
         if cached_dt is None:
             return None
         if datetime.now(timezone.utc) - cached_dt > _CADENCE_CACHE_TTL:
@@ -132,16 +125,10 @@ class StaleDataStore:
 
 
 def _primary_counter_id(coordinator: MaalerportalCoordinator) -> str | None:
-    if not coordinator.data:
-        return None
-    for counter in coordinator.data.get("meterCounters", []):
-        if counter.get("isPrimary"):
-            return counter.get("meterCounterId")
+    counters = coordinator.counters
     # Fallback: first counter we have if no primary marker
-    counters = coordinator.data.get("meterCounters", [])
-    if counters:
-        return counters[0].get("meterCounterId")
-    return None
+    reading = counters.primary or counters.first
+    return reading.counter.get("meterCounterId") if reading is not None else None
 
 
 async def _async_compute_cadence_from_history(
@@ -150,50 +137,37 @@ async def _async_compute_cadence_from_history(
     """Fetch /readings/historical and compute median delta between
     upstream-reported timestamps for the primary counter.
 
-    Returns None on API failure or when there isn't enough data.
+    Goes through the installation's shared history service, so finalized
+    days come from the on-disk day cache. Returns None on API failure or
+    when there isn't enough data.
     """
     primary_id = _primary_counter_id(coordinator)
     if not primary_id:
         return None
 
-    now = datetime.now(timezone.utc)
-    from_dt = (now - timedelta(days=_CADENCE_HISTORY_DAYS)).strftime(
-        "%Y-%m-%dT%H:%M:%SZ"
-    )
-    to_dt = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    service = coordinator.history_service
+    if service is None:
+        return None
 
+    now = datetime.now(timezone.utc)
     try:
-        async with coordinator.session.post(
-            f"{coordinator.base_url}/installations/"
-            f"{coordinator.installation_id}/readings/historical",
-            json={"from": from_dt, "to": to_dt},
-            headers={
-                "ApiKey": coordinator.api_key,
-                "Content-Type": "application/json",
-            },
-            timeout=aiohttp.ClientTimeout(total=30),
-        ) as response:
-            if not response.ok:
-                _LOGGER.debug(
-                    "Cadence history fetch returned HTTP %s for %s",
-                    response.status,
-                    coordinator.installation_id,
-                )
-                return None
-            data = await response.json()
-    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        readings = await service.async_fetch(
+            now - timedelta(days=_CADENCE_HISTORY_DAYS),
+            now,
+            counter_id=primary_id,
+            priority=Priority.FALLBACK,
+        )
+    except InstallationUnavailableError as err:
         _LOGGER.debug(
-            "Cadence history fetch failed for %s: %s",
+            "Cadence history fetch failed for %s: HTTP %s",
             coordinator.installation_id,
             err,
         )
         return None
 
     timestamps: list[datetime] = []
-    for reading in data.get("readings", []) if isinstance(data, dict) else []:
-        if reading.get("meterCounterId") != primary_id:
-            continue
-        parsed = _parse_iso(reading.get("timestamp"))
+    for reading in readings:
+        parsed = parse_api_timestamp(reading.get("timestamp"))
         if parsed is not None:
             timestamps.append(parsed)
 
@@ -216,23 +190,10 @@ async def _async_compute_cadence_from_history(
 
 
 def _latest_observed(coordinator: MaalerportalCoordinator) -> tuple[datetime, str] | None:
-    if not coordinator.data:
-        return None
-    latest_dt: datetime | None = None
-    latest_iso: str | None = None
-    for counter in coordinator.data.get("meterCounters", []):
-        ts_iso = counter.get("latestTimestamp")
-        if not ts_iso:
-            continue
-        parsed = _parse_iso(ts_iso)
-        if parsed is None:
-            continue
-        if latest_dt is None or parsed > latest_dt:
-            latest_dt = parsed
-            latest_iso = ts_iso
-    if latest_dt is None or latest_iso is None:
+    latest = coordinator.counters.latest
+    if latest is None or latest.timestamp is None or latest.raw_timestamp is None:
         return None
-    return latest_dt, latest_iso
+    return latest.timestamp, latest.raw_timestamp
 
 
 async def async_check_stale_data(
@@ -251,8 +212,28 @@ async def async_check_stale_data(
         ir.async_delete_issue(hass, DOMAIN, _issue_id(installation_id))
         return
 
-    latest_dt, _latest_iso = observed
+    # Cadence is derived from upstream-reported timestamps via
+    # /readings/historical, cached in the store for a week. This avoids
+    # the previous poll-time sampling which over-fit to bursts.
+    cadence = store.get_cached_cadence(installation_id)
+    if cadence is None:
+        fresh = await _async_compute_cadence_from_history(coordinator)
+        if fresh is not None:
+            await store.async_set_cadence(installation_id, fresh)
+            cadence = fresh
+    _update_stale_issue(hass, entry, coordinator, observed[0], cadence)
+
 
+@callback
+def _update_stale_issue(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: MaalerportalCoordinator,
+    latest_dt: datetime,
+    cadence: timedelta | None,
+) -> None:
+    """Raise or clear the issue for a known latest timestamp and cadence."""
+    installation_id = coordinator.installation["installationId"]
     factor = float(entry.options.get(CONF_STALE_FACTOR, DEFAULT_STALE_FACTOR))
     fallback = timedelta(
         hours=float(
@@ -262,15 +243,6 @@ async def async_check_stale_data(
         )
     )
 
-    # Cadence is derived from upstream-reported timestamps via
-    # /readings/historical, cached in the store for a week. This avoids
-    # the previous poll-time sampling which over-fit to bursts.
-    cadence = store.get_cached_cadence(installation_id)
-    if cadence is None:
-        fresh = await _async_compute_cadence_from_history(coordinator)
-        if fresh is not None:
-            await store.async_set_cadence(installation_id, fresh)
-            cadence = fresh
     interval = cadence if cadence is not None else fallback
     threshold = max(interval * factor, _THRESHOLD_FLOOR)
 
@@ -310,10 +282,20 @@ def attach_stale_monitor(
     store: StaleDataStore,
 ) -> callback:
     """Subscribe to coordinator updates so each refresh re-evaluates the
-    stale state. Returns the unsubscribe handle."""
+    stale state. Returns the unsubscribe handle.
+
+    Refreshes are evaluated inline while the cadence cache is fresh —
+    the common case — and only schedule a task when the cadence has to
+    be fetched.
+    """
 
     @callback
     def _on_update() -> None:
+        observed = _latest_observed(coordinator)
+        cadence = store.get_cached_cadence(coordinator.installation["installationId"])
+        if observed is not None and cadence is not None:
+            _update_stale_issue(hass, entry, coordinator, observed[0], cadence)
+            return
         hass.async_create_task(
             async_check_stale_data(hass, entry, coordinator, store)
         )
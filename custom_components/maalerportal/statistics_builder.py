@@ -0,0 +1,275 @@
+"""Pure construction of a statistic sensor's hourly statistics rows.
+
+Turning a year of ``/readings/historical`` readings into statistics —
+filtering one counter, sorting, parsing every value and timestamp,
+bucketing into local hours and watching for meter swaps — takes long
+enough to stall Home Assistant's event loop, and at startup every
+statistic sensor does it at the same time. :class:`StatisticsStream`
+does all of it without touching Home Assistant, so the sensors run it
+in the executor and only import the result on the loop.
+
+The stream is fed one history chunk at a time, oldest first, and hands
+back the rows of each chunk as soon as their hours are complete. The
+running sum, swap detection and cursor bookkeeping carry over between
+chunks, so a sensor never holds more than a chunk of readings and rows
+no matter how much history it imports.
+
+Rows come back as ``{"start", "state", "sum"}`` dicts, the shape of the
+recorder's ``StatisticData``. A detected meter swap is exposed as a
+:class:`SwapEvent` for the caller to persist; the stream has already
+applied the new offset to the rows after it.
+
+This module contains no Home Assistant imports so the logic can be unit
+tested in isolation.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+from operator import itemgetter
+import re
+from typing import Any
+
+from .backfill import ResumePoint
+from .import_cursor import REVISION_OVERLAP, ImportCursor, advance_cursor, digest_hour
+from .reconcile import compute_swap_offset, is_meter_swap
+from .timeutils import local_hour_bucket, parse_api_timestamp
+
+_NON_NUMERIC = re.compile(r"[^\d.-]")
+
+# Fraction of the previous raw value a reading must drop below to count
+# as a swap (together with the utility-reported serial change).
+DEFAULT_SWAP_DROP_THRESHOLD = 0.5
+
+
+@dataclass(frozen=True)
+class SwapEvent:
+    """A meter swap detected while building, at statistics hour ``start``."""
+
+    start: datetime
+    previous_value: float
+    value: float
+    old_offset: float
+    new_offset: float
+
+
+def parse_reading_value(raw: Any) -> float:
+    """Parse a historical ``value``; raises ValueError/TypeError if invalid."""
+    if isinstance(raw, str):
+        return float(_NON_NUMERIC.sub("", raw.strip()))
+    return float(raw)
+
+
+def statistics_hour_start(
+    timestamp: datetime, reading_type: str, local_tz: tzinfo
+) -> datetime:
+    """Return the recorder UTC hour after local-time bucketing.
+
+    Målerportal readings are shown by local wall-clock hour in the vendor
+    app, so bucketing happens in ``local_tz`` (ZoneInfo handles DST).
+    Counter readings close the hour before their timestamp.
+    """
+    return local_hour_bucket(
+        timestamp, local_tz, 0 if reading_type == "consumption" else 1
+    )
+
+
+class StatisticsStream:
+    """Builds one counter's hourly statistics rows from chunks of readings.
+
+    Feed chunks oldest first with :meth:`feed`, then call :meth:`close`.
+    Each call returns the rows of the hours it completed; the newest hour
+    stays open until the next chunk or :meth:`close`, since its readings
+    can straddle a chunk boundary.
+
+    With ``previous_digests`` (the hour hashes of an :class:`ImportCursor`)
+    rows are only returned from the first hour whose readings changed;
+    earlier hours are still built so :meth:`next_cursor` can settle them.
+    """
+
+    def __init__(
+        self,
+        counter_id: str,
+        reading_type: str,
+        local_tz: tzinfo,
+        *,
+        after: datetime | None = None,
+        cumulative_sum: float = 0.0,
+        baseline_from_first: bool = False,
+        meter_offset: float = 0.0,
+        previous_value: float | None = None,
+        previous_sum: float | None = None,
+        swap_pending: bool = False,
+        swap_drop_threshold: float = DEFAULT_SWAP_DROP_THRESHOLD,
+        previous_digests: Mapping[datetime, str] | None = None,
+        overlap: timedelta = REVISION_OVERLAP,
+    ) -> None:
+        """Set up the stream.
+
+        Args:
+            counter_id: the ``meterCounterId`` to build rows for.
+            reading_type: ``"counter"`` (cumulative values) or
+                ``"consumption"`` (interval values summed into a running
+                total).
+            local_tz: Home Assistant's time zone, for hour bucketing.
+            after: skip readings whose hour is at or before this one.
+            cumulative_sum: consumption total to continue from.
+            baseline_from_first: counter type only — subtract the first
+                reading from every row instead of applying ``meter_offset``.
+            previous_value / previous_sum: raw value and sum of the row
+                before the first one built, for swap detection.
+            swap_pending: the utility reported a new meter serial.
+            previous_digests: hour hashes of the run being continued.
+            overlap: revision window for :meth:`next_cursor`.
+        """
+        self._counter_id = str(counter_id)
+        self._reading_type = reading_type
+        self._consumption = reading_type == "consumption"
+        self._local_tz = local_tz
+        self._after = after
+        self._want_baseline = baseline_from_first and not self._consumption
+        self._previous_value = previous_value
+        self._previous_sum = previous_sum
+        self._swap_pending = swap_pending
+        self._swap_drop_threshold = swap_drop_threshold
+        self._previous_digests = previous_digests or {}
+        self._sending = previous_digests is None
+        self._overlap = overlap
+
+        # Readings of the counter fed so far.
+        self.matched = 0
+        # Running consumption total after the last built row.
+        self.cumulative_sum = cumulative_sum
+        # Meter offset in effect after the last built row.
+        self.meter_offset = meter_offset
+        # First reading subtracted from every counter row, if requested.
+        self.baseline: float | None = None
+        self.swap: SwapEvent | None = None
+
+        self._open_start: datetime | None = None
+        self._open_raw: list[Any] = []
+        self._open_row: dict[str, Any] | None = None
+        # Built rows inside the revision window plus the newest one before
+        # it, and their hour hashes — all next_cursor needs.
+        self._tail: list[ResumePoint] = []
+        self._tail_digests: dict[datetime, str] = {}
+
+    def feed(self, readings: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """Add one chunk of readings of any counters, in any order."""
+        matched = 0
+        # Each timestamp is parsed once and used for both the sort and the
+        # hour bucketing, instead of relying on the parse cache still
+        # holding it on the second pass.
+        timed: list[tuple[datetime, Mapping[str, Any]]] = []
+        for r in readings:
+            if (
+                str(r.get("meterCounterId") or "") != self._counter_id
+                or r.get("value") is None
+            ):
+                continue
+            matched += 1
+            timestamp = parse_api_timestamp(r.get("timestamp"))
+            if timestamp is not None:
+                timed.append((timestamp, r))
+        if not matched:
+            return []
+        timed.sort(key=itemgetter(0))
+        if self._want_baseline and self.matched == 0 and timed:
+            try:
+                self.baseline = parse_reading_value(timed[0][1].get("value"))
+            except (TypeError, ValueError):
+                self.baseline = None
+        self.matched += matched
+
+        rows: list[dict[str, Any]] = []
+        for timestamp, reading in timed:
+            try:
+                start = statistics_hour_start(
+                    timestamp, self._reading_type, self._local_tz
+                )
+                # Skip hours the caller already has.
+                if self._after is not None and start <= self._after:
+                    continue
+                if start != self._open_start:
+                    rows.extend(self._close_hour())
+                    self._open_start = start
+                raw = reading.get("value")
+                self._open_raw.append(raw)
+                self._add(start, parse_reading_value(raw))
+            except (TypeError, ValueError):
+                continue
+        return rows
+
+    def close(self) -> list[dict[str, Any]]:
+        """Complete the newest hour and return its row, if any."""
+        return self._close_hour()
+
+    def next_cursor(self, previous: ImportCursor | None) -> ImportCursor | None:
+        """The import cursor after everything built so far."""
+        return advance_cursor(self._tail, self._tail_digests, previous, self._overlap)
+
+    def _add(self, start: datetime, value: float) -> None:
+        """Fold one parsed reading into the open hour's row."""
+        if self._consumption:
+            # Only positive intervals move the virtual meter.
+            if value > 0:
+                self.cumulative_sum += value
+            if self._open_row is None:
+                self._open_row = {"start": start, "state": 0.0, "sum": 0.0}
+            # The hour's state is the sum of its intervals.
+            self._open_row["state"] += value
+            self._open_row["sum"] = self.cumulative_sum
+            return
+
+        # Re-anchoring is gated on the utility-reported serial change; see
+        # reconcile.is_meter_swap.
+        if is_meter_swap(
+            self._previous_value,
+            self._previous_sum,
+            value,
+            self._swap_pending,
+            self._swap_drop_threshold,
+        ):
+            new_offset = compute_swap_offset(self._previous_sum, value)
+            self.swap = SwapEvent(
+                start=start,
+                previous_value=self._previous_value,
+                value=value,
+                old_offset=self.meter_offset,
+                new_offset=new_offset,
+            )
+            self.meter_offset = new_offset
+            self._swap_pending = False
+        if self.baseline is not None:
+            displayed = value - self.baseline
+        else:
+            displayed = value + self.meter_offset
+        # A counter hour keeps its last reading.
+        self._open_row = {"start": start, "state": value, "sum": displayed}
+        self._previous_value = value
+        self._previous_sum = displayed
+
+    def _close_hour(self) -> list[dict[str, Any]]:
+        start = self._open_start
+        if start is None:
+            return []
+        row = self._open_row
+        digest = digest_hour(self._open_raw)
+        self._open_start = None
+        self._open_raw = []
+        self._open_row = None
+
+        if not self._sending and self._previous_digests.get(start) != digest:
+            # Hours before this one were imported unchanged already.
+            self._sending = True
+        self._tail_digests[start] = digest
+        if row is not None:
+            self._tail.append(ResumePoint(row["start"], row["state"], row["sum"]))
+            limit = row["start"] - self._overlap
+            while len(self._tail) > 1 and self._tail[1].start <= limit:
+                del self._tail[0]
+            oldest = self._tail[0].start
+            for hour in [h for h in self._tail_digests if h < oldest]:
+                del self._tail_digests[hour]
+        return [row] if row is not None and self._sending else []
@@ -1,7 +1,25 @@
-"""Shared timestamp helpers for the Målerportal integration."""
+"""Shared timestamp helpers for the Målerportal integration.
+
+The same API timestamps are parsed over and over: a poll's readings go
+through the readings log, the dashboard summary and the counter index on
+every refresh. Parsing is therefore memoized per string, and local-hour
+bucketing is memoized per hour, which turns the per-row timezone
+arithmetic of a history chunk into a dictionary lookup. Bulk callers
+such as the statistics stream parse each row once themselves and pass
+the datetime along, so a year of backfill doesn't depend on the parse
+cache's size.
+"""
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+
+# Distinct timestamp strings kept parsed: a 31-day history chunk of a few
+# hourly counters, plus the recent readings of every poll.
+_PARSE_CACHE_SIZE = 8192
+# Distinct (hour, zone, shift) buckets kept: over a year of hours.
+_BUCKET_CACHE_SIZE = 16384
+_HOUR = timedelta(hours=1)
 
 
 def parse_api_timestamp(timestamp: str | None) -> datetime | None:
@@ -14,9 +32,124 @@ def parse_api_timestamp(timestamp: str | None) -> datetime | None:
     if not timestamp:
         return None
     try:
-        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        return _parse_cached(timestamp)
+    except TypeError:
+        # Unhashable, so not a timestamp string either.
+        return None
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_cached(timestamp: str) -> datetime | None:
+    try:
+        # Handles both API forms, ``...T17:00:00.000Z`` and
+        # ``...T19:00:00.000+02:00``, as well as naive timestamps.
+        parsed = datetime.fromisoformat(timestamp)
     except (TypeError, ValueError):
         return None
     if parsed.tzinfo is None:
         return parsed.replace(tzinfo=timezone.utc)
     return parsed
+
+
+def utc_day_start(moment: datetime) -> datetime:
+    """Return UTC midnight of the day containing ``moment``."""
+    return moment.astimezone(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def local_hour_bucket(
+    moment: datetime, local_tz: tzinfo, hours_back: int = 0
+) -> datetime:
+    """Return the UTC start of ``moment``'s local wall-clock hour.
+
+    The local hour is floored in ``local_tz`` and moved ``hours_back``
+    wall-clock hours earlier before converting back to UTC, exactly like
+    ``astimezone`` / ``replace`` / ``astimezone`` would. Results are
+    cached per hour of the timestamp's own offset — the UTC hour for
+    ``...Z`` timestamps — so readings of one hour cost a lookup. If that
+    hour holds a local hour boundary (zones with half-hour offsets) the
+    cache records both sides; hours containing a DST transition are
+    computed directly.
+    """
+    if type(moment.tzinfo) is not timezone:
+        # A zone's wall-clock hour can repeat; key fixed offsets only.
+        moment = moment.astimezone(timezone.utc)
+    split, before, after = _hour_buckets(
+        moment.year,
+        moment.month,
+        moment.day,
+        moment.hour,
+        moment.tzinfo,
+        local_tz,
+        hours_back,
+    )
+    if before is None:
+        return _local_hour_bucket(moment, local_tz, hours_back)
+    if split is not None and moment.minute * 60 + moment.second >= split:
+        return after
+    return before
+
+
+@lru_cache(maxsize=_BUCKET_CACHE_SIZE)
+def _hour_buckets(
+    year: int,
+    month: int,
+    day: int,
+    hour: int,
+    offset: timezone,
+    local_tz: tzinfo,
+    hours_back: int,
+) -> tuple[int | None, datetime | None, datetime | None]:
+    """Local-hour buckets of one hour at a fixed offset.
+
+    Returns ``(split, before, after)``: ``split`` is the second of the
+    hour where a new local hour starts (None if the local hour starts
+    with it), ``before`` / ``after`` the buckets either side. ``before``
+    is None when ``local_tz`` changes its offset during the hour.
+    """
+    start = datetime(year, month, day, hour, tzinfo=offset)
+    local_offset = start.astimezone(local_tz).utcoffset()
+    last = start + _HOUR - timedelta(microseconds=1)
+    if last.astimezone(local_tz).utcoffset() != local_offset:
+        return None, None, None
+    before = _local_hour_bucket(start, local_tz, hours_back)
+    into_local_hour = (local_offset - offset.utcoffset(None)) % _HOUR
+    if not into_local_hour:
+        return None, before, before
+    split = _HOUR - into_local_hour
+    return (
+        int(split.total_seconds()),
+        before,
+        _local_hour_bucket(start + split, local_tz, hours_back),
+    )
+
+
+def _local_hour_bucket(
+    moment: datetime, local_tz: tzinfo, hours_back: int
+) -> datetime:
+    local_hour = moment.astimezone(local_tz).replace(
+        minute=0, second=0, microsecond=0
+    )
+    if hours_back:
+        local_hour = local_hour - timedelta(hours=hours_back)
+    return local_hour.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def to_local(moment: datetime, local_tz: tzinfo) -> datetime:
+    """Return ``moment`` in ``local_tz``, memoized."""
+    return moment.astimezone(local_tz)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def api_timestamp_sort_key(timestamp: str | None) -> datetime:
+    """Chronological sort key for API timestamps.
+
+    Readings can mix the UTC ``...Z`` form (from the ReadingsLog archive)
+    with local-offset strings (from ``/readings/historical``), so plain
+    string ordering isn't chronological. Unparseable values sort first.
+    """
+    return parse_api_timestamp(timestamp) or _EPOCH
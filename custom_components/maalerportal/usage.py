@@ -0,0 +1,115 @@
+"""Rolling water usage per counter, maintained incrementally.
+
+The *Last reading* sensor shows app-style usage bars (14 days, 24 hours)
+built from consecutive cumulative readings. Recomputing them from the
+whole recent buffer on every state write re-parsed and re-sorted up to
+1500 rows each time. :class:`UsageAggregate` instead keeps the liters per
+UTC hour up to date as readings are recorded, so a summary only has to
+walk the buckets of the retained window.
+
+Each positive delta between two consecutive readings is credited to the
+hour of the later reading, as before. Readings may arrive out of order
+(historical backfills), so inserting one between two known readings
+re-splits the delta that used to span them. This module contains no Home
+Assistant imports so the logic can be unit tested in isolation.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+# How much usage is kept: the 14 daily bars plus a day of slack for the
+# local/UTC day boundary.
+USAGE_WINDOW = timedelta(days=15)
+
+_HOUR = 3600
+_CUBIC_METER_UNITS = {"m3", "m³", "m^3", "cubic_meter", "cubic_meters"}
+
+
+def numeric_value(value: Any) -> float | None:
+    """Parse a reading value that may be a number or a decimal string."""
+    try:
+        return float(str(value).replace(",", ".").strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def delta_to_liters(delta: float, unit: str | None) -> float:
+    """Convert a counter delta to liters when the counter counts m³."""
+    if (unit or "").lower() in _CUBIC_METER_UNITS:
+        return delta * 1000
+    return delta
+
+
+class UsageAggregate:
+    """Liters per UTC hour of one cumulative counter."""
+
+    __slots__ = ("_window", "_times", "_values", "_units", "_hourly")
+
+    def __init__(self, window: timedelta = USAGE_WINDOW) -> None:
+        self._window = int(window.total_seconds())
+        # Readings sorted by time: epoch seconds, value, unit.
+        self._times: list[int] = []
+        self._values: list[float] = []
+        self._units: list[str] = []
+        # UTC hour start (epoch seconds) -> liters.
+        self._hourly: dict[int, float] = {}
+
+    def add(self, moment: datetime, value: Any, unit: str | None = "") -> None:
+        """Record one cumulative reading."""
+        parsed = numeric_value(value)
+        if parsed is None:
+            return
+        seconds = int(moment.timestamp())
+        i = bisect_left(self._times, seconds)
+        if i < len(self._times) and self._times[i] == seconds:
+            return
+        if self._times and seconds < self._times[0] <= self._times[-1] - self._window:
+            # Older than the anchor before the window; nothing inside moves.
+            return
+        if 0 < i < len(self._times):
+            # The reading lands between two others; their delta is re-split.
+            self._credit(i - 1, i, -1)
+        self._times.insert(i, seconds)
+        self._values.insert(i, parsed)
+        self._units.insert(i, unit or "")
+        if i > 0:
+            self._credit(i - 1, i, 1)
+        if i + 1 < len(self._times):
+            self._credit(i, i + 1, 1)
+        self._prune()
+
+    def hourly(self) -> dict[datetime, float]:
+        """Liters per UTC hour start, for hours with usage."""
+        return {
+            datetime.fromtimestamp(hour, timezone.utc): liters
+            for hour, liters in sorted(self._hourly.items())
+            if liters > 0
+        }
+
+    def _credit(self, earlier: int, later: int, sign: int) -> None:
+        delta = self._values[later] - self._values[earlier]
+        if delta <= 0:
+            return
+        hour = self._times[later] - self._times[later] % _HOUR
+        liters = self._hourly.get(hour, 0.0) + sign * delta_to_liters(
+            delta, self._units[later]
+        )
+        if sign < 0 and abs(liters) < 1e-9:
+            self._hourly.pop(hour, None)
+        else:
+            self._hourly[hour] = liters
+
+    def _prune(self) -> None:
+        cutoff = self._times[-1] - self._window
+        # Keep the newest reading before the cutoff as the anchor for the
+        # first delta inside the window.
+        drop = bisect_left(self._times, cutoff) - 1
+        if drop > 0:
+            del self._times[:drop]
+            del self._values[:drop]
+            del self._units[:drop]
+        cutoff_hour = cutoff - cutoff % _HOUR
+        for hour in [hour for hour in self._hourly if hour < cutoff_hour]:
+            del self._hourly[hour]
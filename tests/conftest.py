@@ -1,4 +1,5 @@
 """Global fixtures for Målerportal integration tests."""
+import json
 import threading
 from collections.abc import Generator
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -20,7 +21,9 @@ class _MockResponse:
     def __init__(self, json_data):
         self.status = 200
         self.ok = True
+        self.headers = {}
         self.json = AsyncMock(return_value=json_data)
+        self.read = AsyncMock(return_value=json.dumps(json_data).encode())
         self.text = AsyncMock(return_value="")
         self.raise_for_status = MagicMock()
 
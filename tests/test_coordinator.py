@@ -0,0 +1,132 @@
+"""Test the Målerportal coordinator snapshot."""
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.maalerportal.const import DOMAIN
+from custom_components.maalerportal.coordinator import CoordinatorSnapshotStore
+from tests.common import MockConfigEntry
+
+SNAPSHOT_KEY = f"{DOMAIN}.coordinator_snapshot.snapshot_entry"
+
+PAYLOAD = {
+    "meterCounters": [{
+        "meterCounterId": "c1",
+        "counterType": "ElectricityFromGrid",
+        "readingType": "counter",
+        "isPrimary": True,
+        "unit": "kWh",
+        "latestValue": "1000.5",
+        "latestTimestamp": "2026-01-01T12:00:00Z",
+    }]
+}
+
+
+def _stored(buckets: dict) -> dict:
+    return {"version": 1, "minor_version": 1, "key": SNAPSHOT_KEY, "data": buckets}
+
+
+async def test_snapshot_store_rejects_old_and_malformed_snapshots(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Only a recent snapshot holding meter counters is restored."""
+    now = dt_util.utcnow()
+    hass_storage[SNAPSHOT_KEY] = _stored({
+        "fresh": {"saved_at": (now - timedelta(days=6)).isoformat(), "data": PAYLOAD},
+        "old": {"saved_at": (now - timedelta(days=8)).isoformat(), "data": PAYLOAD},
+        "no_saved_at": {"data": PAYLOAD},
+        "bad_saved_at": {"saved_at": "yesterday", "data": PAYLOAD},
+        "naive_saved_at": {
+            "saved_at": now.replace(tzinfo=None).isoformat(),
+            "data": PAYLOAD,
+        },
+        "no_counters": {"saved_at": now.isoformat(), "data": {"error": "x"}},
+        "not_a_bucket": ["fresh"],
+    })
+    store = CoordinatorSnapshotStore(hass, "snapshot_entry")
+    await store.async_load()
+
+    assert store.get("fresh") == PAYLOAD
+    for installation_id in (
+        "old",
+        "no_saved_at",
+        "bad_saved_at",
+        "naive_saved_at",
+        "no_counters",
+        "not_a_bucket",
+        "unknown",
+    ):
+        assert store.get(installation_id) is None, installation_id
+
+
+async def test_snapshot_store_forgets_removed_installations(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """retain() drops the snapshots of installations no longer set up."""
+    store = CoordinatorSnapshotStore(hass, "snapshot_entry")
+    await store.async_load()
+    store.async_save("kept", PAYLOAD)
+    store.async_save("removed", PAYLOAD)
+    store.retain({"kept"})
+
+    assert store.get("kept") == PAYLOAD
+    assert store.get("removed") is None
+
+    # The batched write only holds what was retained.
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+    assert set(hass_storage[SNAPSHOT_KEY]["data"]) == {"kept"}
+
+
+async def test_setup_with_snapshot_does_not_wait_for_the_api(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """A restored snapshot lets setup succeed while the API is down."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="snapshot_entry",
+        data={
+            "api_key": "test_key",
+            "smarthome_base_url": "http://test",
+            "installations": [{
+                "installationId": "123",
+                "installationType": "Electricity",
+                "address": "Test Address",
+                "meterSerial": "M123",
+                "utilityName": "Test Util",
+            }],
+            "email": "test@example.com",
+        },
+    )
+    entry.add_to_hass(hass)
+    hass_storage[SNAPSHOT_KEY] = _stored({
+        "123": {"saved_at": dt_util.utcnow().isoformat(), "data": PAYLOAD},
+    })
+
+    with patch(
+        "custom_components.maalerportal.coordinator.MaalerportalCoordinator._async_update_data",
+        new_callable=AsyncMock,
+        side_effect=UpdateFailed("API down"),
+    ) as mock_update, patch(
+        "custom_components.maalerportal._fetch_fresh_installations",
+        new_callable=AsyncMock,
+        return_value=None,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        # Without the snapshot the failing first refresh would have left
+        # the entry in SETUP_RETRY.
+        assert entry.state is ConfigEntryState.LOADED
+        # The refresh still ran, in the background.
+        mock_update.assert_awaited()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinators"]["123"]
+        assert coordinator.data == PAYLOAD
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
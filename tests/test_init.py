@@ -0,0 +1,147 @@
+"""Test Målerportal setup against the cached /addresses answer."""
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.maalerportal import AddressesCache
+from custom_components.maalerportal.const import DOMAIN
+from tests.common import MockConfigEntry
+
+ADDRESSES_KEY = f"{DOMAIN}.addresses.addresses_entry"
+
+INSTALLATION = {
+    "installationId": "123",
+    "installationType": "Electricity",
+    "address": "Test Address",
+    "meterSerial": "M123",
+    "utilityName": "Test Util",
+}
+# The same installation as _fetch_fresh_installations returns it.
+FRESH = {**INSTALLATION, "timezone": "Europe/Copenhagen", "nickname": ""}
+
+
+def _entry(hass: HomeAssistant) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="addresses_entry",
+        data={
+            "api_key": "test_key",
+            "smarthome_base_url": "http://test",
+            "installations": [INSTALLATION],
+            "email": "test@example.com",
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+def _cached(installations: list, pending_swaps: list | None = None) -> dict:
+    data = {"installations": installations}
+    if pending_swaps is not None:
+        data["pending_swaps"] = pending_swaps
+    return {"version": 1, "minor_version": 1, "key": ADDRESSES_KEY, "data": data}
+
+
+async def _setup(hass: HomeAssistant, entry: MockConfigEntry, fresh) -> None:
+    """Set the entry up without platforms, revalidating against ``fresh``."""
+    with patch(
+        "custom_components.maalerportal.coordinator.MaalerportalCoordinator._async_update_data",
+        new_callable=AsyncMock,
+        return_value={"meterCounters": []},
+    ), patch(
+        "custom_components.maalerportal._fetch_fresh_installations",
+        new_callable=AsyncMock,
+        return_value=fresh,
+    ), patch(
+        "homeassistant.config_entries.ConfigEntries.async_forward_entry_setups"
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_addresses_cache_persists_pending_swaps(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Pending swaps are written out and read back by a new cache."""
+    cache = AddressesCache(hass, "addresses_entry")
+    await cache.async_load()
+    cache.async_set_pending_swaps({"b", "a"})
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+
+    assert hass_storage[ADDRESSES_KEY]["data"]["pending_swaps"] == ["a", "b"]
+    reloaded = AddressesCache(hass, "addresses_entry")
+    await reloaded.async_load()
+    assert reloaded.pending_swaps == {"a", "b"}
+
+
+async def test_serial_change_from_cache_is_kept_as_pending_swap(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """A swap found in the cached answer survives a restart."""
+    entry = _entry(hass)
+    hass_storage[ADDRESSES_KEY] = _cached([{**FRESH, "meterSerial": "M999"}])
+
+    await _setup(hass, entry, [{**FRESH, "meterSerial": "M999"}])
+
+    assert hass.data[DOMAIN][entry.entry_id]["pending_swap_installations"] == {"123"}
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert hass_storage[ADDRESSES_KEY]["data"]["pending_swaps"] == ["123"]
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_pending_swaps_are_restored_at_setup(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """A swap still pending from the last run is applied after a reload."""
+    entry = _entry(hass)
+    hass_storage[ADDRESSES_KEY] = _cached([FRESH], pending_swaps=["123"])
+
+    await _setup(hass, entry, [FRESH])
+
+    assert hass.data[DOMAIN][entry.entry_id]["pending_swap_installations"] == {"123"}
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_revalidation_reloads_when_an_installation_disappears(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """The entry is set up again once /addresses drops an installation."""
+    entry = _entry(hass)
+    hass_storage[ADDRESSES_KEY] = _cached([FRESH])
+
+    with patch.object(
+        hass.config_entries, "async_reload", new_callable=AsyncMock
+    ) as mock_reload:
+        await _setup(hass, entry, [])
+
+    mock_reload.assert_awaited_once_with(entry.entry_id)
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_revalidation_without_changes_does_not_reload(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """An unchanged /addresses answer keeps the running setup."""
+    entry = _entry(hass)
+    hass_storage[ADDRESSES_KEY] = _cached([FRESH])
+
+    with patch.object(
+        hass.config_entries, "async_reload", new_callable=AsyncMock
+    ) as mock_reload:
+        await _setup(hass, entry, [FRESH])
+
+    mock_reload.assert_not_called()
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
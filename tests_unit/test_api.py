@@ -0,0 +1,209 @@
+"""Unit tests for the retrying Målerportal API client."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+import importlib.util
+import json
+from pathlib import Path
+import sys
+import types
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_api():
+    # Only aiohttp's exception and timeout types are used at import time.
+    if "aiohttp" not in sys.modules:
+        aiohttp = types.ModuleType("aiohttp")
+        aiohttp.ClientError = type("ClientError", (Exception,), {})
+        aiohttp.ClientSession = object
+        aiohttp.ClientTimeout = lambda total=None: total
+        sys.modules["aiohttp"] = aiohttp
+    # api imports its HA-free sibling ratelimit.
+    package = types.ModuleType("_maalerportal_api_pkg")
+    package.__path__ = [str(ROOT / "custom_components" / "maalerportal")]
+    sys.modules["_maalerportal_api_pkg"] = package
+    name = "_maalerportal_api_pkg.api"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "custom_components" / "maalerportal" / "api.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+api = _load_api()
+
+
+class _Response:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.ok = 200 <= status < 300
+        self.headers = headers or {}
+        self._body = json.dumps(body).encode()
+        self.released = False
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.released = True
+        return False
+
+
+class _Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(("get", url, kwargs))
+        return self.responses.pop(0)
+
+    def post(self, url, **kwargs):
+        self.calls.append(("post", url, kwargs))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+
+    async def _sleep(delay):
+        waited.append(delay)
+
+    monkeypatch.setattr(api.asyncio, "sleep", _sleep)
+    return waited
+
+
+def _client(session, **kwargs):
+    return api.MaalerportalApiClient(session, "https://api.example/", "key", **kwargs)
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    now = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+    assert api.retry_after_seconds("7", now) == 7.0
+    assert api.retry_after_seconds("Fri, 01 May 2026 12:00:30 GMT", now) == 30.0
+    assert api.retry_after_seconds("Fri, 01 May 2026 11:00:00 GMT", now) == 0.0
+    assert api.retry_after_seconds("soon", now) is None
+    assert api.retry_after_seconds(None, now) is None
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = [api.backoff_delay(retry) for retry in range(12) for _ in range(20)]
+    assert all(0 <= delay <= api.BACKOFF_MAX for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_429_waits_for_retry_after_then_succeeds(sleeps):
+    first = _Response(429, headers={"Retry-After": "3"})
+    session = _Session(first, _Response(200, {"meterCounters": []}))
+
+    data = asyncio.run(_client(session).async_get("/installations/x/readings/latest"))
+
+    assert data == {"meterCounters": []}
+    assert sleeps == [3.0]
+    assert first.released
+    method, url, kwargs = session.calls[0]
+    assert (method, url) == ("get", "https://api.example/installations/x/readings/latest")
+    assert kwargs["headers"] == {"ApiKey": "key"}
+
+
+def test_long_retry_after_is_handed_back_to_the_caller(sleeps):
+    session = _Session(_Response(429, headers={"Retry-After": "600"}))
+
+    with pytest.raises(api.RateLimitedError) as err:
+        asyncio.run(_client(session).async_get("/addresses"))
+
+    assert err.value.retry_after == 600.0
+    assert sleeps == []
+
+
+def test_persistent_429_gives_up_after_the_attempt_budget(sleeps):
+    session = _Session(*(_Response(429) for _ in range(3)))
+
+    with pytest.raises(api.RateLimitedError):
+        asyncio.run(_client(session, attempts=3).async_get("/addresses"))
+
+    assert len(session.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_server_errors_are_retried_and_client_errors_are_not(sleeps):
+    session = _Session(_Response(502), _Response(200, {"readings": []}))
+    body = asyncio.run(
+        _client(session).async_post("/installations/x/readings/historical", {"from": "a"})
+    )
+    assert body == {"readings": []}
+    assert session.calls[0][2]["json"] == {"from": "a"}
+    assert session.calls[0][2]["headers"]["Content-Type"] == "application/json"
+
+    for status, error in ((404, api.InstallationUnavailableError), (400, api.ApiError)):
+        response = _Response(status)
+        with pytest.raises(error):
+            asyncio.run(_client(_Session(response)).async_get("/addresses"))
+        assert response.released
+    assert len(sleeps) == 1
+
+
+def test_429_with_a_limiter_cuts_the_shared_rate_instead_of_sleeping(sleeps):
+    now = [0.0]
+
+    async def _sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+
+    limiter = api.AimdRateLimiter(rate=4.0, clock=lambda: now[0], sleep=_sleep)
+    session = _Session(_Response(429), _Response(200, {"ok": True}))
+
+    body = asyncio.run(_client(session, limiter=limiter).async_get("/addresses"))
+
+    assert body == {"ok": True}
+    assert len(session.calls) == 2
+    # Halved by the 429, then one additive step for the success.
+    assert limiter.rate == pytest.approx(2.0 + 0.1)
+    # The only wait was the limiter pacing the retry, not a client backoff.
+    assert sleeps == [pytest.approx(0.5)]
+
+
+def test_paused_limiter_fails_fast(sleeps):
+    limiter = api.AimdRateLimiter()
+    limiter.on_rate_limited(retry_after=600)
+    session = _Session()
+
+    with pytest.raises(api.RateLimitedError) as err:
+        asyncio.run(_client(session, limiter=limiter).async_get("/addresses"))
+
+    assert err.value.retry_after == pytest.approx(600, abs=1)
+    assert session.calls == []
+
+
+def test_requests_hold_a_scheduler_slot_only_while_in_flight(sleeps):
+    scheduler = api.RequestScheduler(2)
+    seen = []
+
+    class _Tracking(_Session):
+        def post(self, url, **kwargs):
+            seen.append(scheduler.in_use)
+            return super().post(url, **kwargs)
+
+    session = _Tracking(_Response(503), _Response(200, {"readings": []}))
+    client = _client(session, scheduler=scheduler)
+    asyncio.run(
+        client.async_post(
+            "/installations/x/readings/historical",
+            {"from": "a"},
+            priority=api.Priority.BACKFILL,
+        )
+    )
+
+    assert seen == [1, 1]
+    assert scheduler.in_use == 0
+    assert len(sleeps) == 1
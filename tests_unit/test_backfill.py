@@ -0,0 +1,134 @@
+"""Unit tests for the pure startup-backfill planning logic.
+
+These tests have no Home Assistant dependency and run with plain pytest.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import sys
+
+_BACKFILL_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "maalerportal"
+    / "backfill.py"
+)
+_spec = importlib.util.spec_from_file_location("_maalerportal_backfill", _BACKFILL_PATH)
+_module = importlib.util.module_from_spec(_spec)
+# dataclasses resolves annotations through sys.modules.
+sys.modules[_spec.name] = _module
+_spec.loader.exec_module(_module)
+
+GAP_FLOOR = _module.GAP_FLOOR
+find_resume_point = _module.find_resume_point
+gap_threshold = _module.gap_threshold
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _counter_rows(hours, offset=0.0, start_value=100.0):
+    """Hourly counter-type rows at the given hour offsets from T0."""
+    return [
+        {
+            "start": T0 + timedelta(hours=h),
+            "state": start_value + h,
+            "sum": start_value + h + offset,
+        }
+        for h in hours
+    ]
+
+
+def test_no_rows_means_full_fetch():
+    assert find_resume_point([], "counter") is None
+
+
+def test_contiguous_rows_resume_after_newest():
+    rows = _counter_rows(range(48))
+    point = find_resume_point(rows, "counter")
+    assert point is not None
+    assert point.start == T0 + timedelta(hours=47)
+    assert point.state == 147.0
+    assert point.sum == 147.0
+
+
+def test_resumes_before_first_gap():
+    # Hours 0-23, then a 3-day hole, then hours 96-119.
+    rows = _counter_rows(list(range(24)) + list(range(96, 120)))
+    point = find_resume_point(rows, "counter")
+    assert point.start == T0 + timedelta(hours=23)
+
+
+def test_earliest_gap_wins():
+    rows = _counter_rows(
+        list(range(10)) + list(range(30, 40)) + list(range(80, 90))
+    )
+    point = find_resume_point(rows, "counter")
+    assert point.start == T0 + timedelta(hours=9)
+
+
+def test_row_order_does_not_matter():
+    rows = _counter_rows(list(range(24)) + list(range(96, 120)))
+    point = find_resume_point(list(reversed(rows)), "counter")
+    assert point.start == T0 + timedelta(hours=23)
+
+
+def test_short_hole_below_floor_is_not_a_gap():
+    # A missing few hours on an hourly meter is normal API jitter.
+    rows = _counter_rows(list(range(10)) + list(range(14, 30)))
+    point = find_resume_point(rows, "counter")
+    assert point.start == T0 + timedelta(hours=29)
+
+
+def test_threshold_adapts_to_sparse_meters():
+    # A meter reporting every 12 hours shouldn't see every spacing as a gap.
+    starts = [T0 + timedelta(hours=12 * i) for i in range(20)]
+    assert gap_threshold(starts) == timedelta(hours=48)
+    rows = [{"start": s, "state": float(i), "sum": float(i)} for i, s in enumerate(starts)]
+    assert find_resume_point(rows, "counter").start == starts[-1]
+
+
+def test_threshold_never_below_floor():
+    starts = [T0 + timedelta(minutes=15 * i) for i in range(10)]
+    assert gap_threshold(starts) == GAP_FLOOR
+    assert gap_threshold([T0]) == GAP_FLOOR
+
+
+def test_counter_rows_honour_meter_offset():
+    rows = _counter_rows(range(24), offset=1973.614)
+    point = find_resume_point(rows, "counter", meter_offset=1973.614)
+    assert point is not None
+    assert point.sum == rows[-1]["sum"]
+
+
+def test_baseline_anchored_counter_rows_fall_back_to_full_fetch():
+    # First-install imports subtract the first reading as a baseline, so
+    # sum != state + offset. Continuing from such a row would put a step
+    # in the Energy Dashboard.
+    rows = [
+        {"start": T0 + timedelta(hours=h), "state": 100.0 + h, "sum": float(h)}
+        for h in range(24)
+    ]
+    assert find_resume_point(rows, "counter") is None
+
+
+def test_counter_row_without_state_falls_back_to_full_fetch():
+    rows = _counter_rows(range(5))
+    rows[-1]["state"] = None
+    assert find_resume_point(rows, "counter") is None
+
+
+def test_consumption_rows_resume_with_running_sum():
+    rows = [
+        {"start": T0 + timedelta(hours=h), "state": 0.5, "sum": 0.5 * (h + 1)}
+        for h in range(24)
+    ]
+    point = find_resume_point(rows, "consumption")
+    assert point.start == T0 + timedelta(hours=23)
+    assert point.sum == 12.0
+
+
+def test_rows_without_datetime_start_are_ignored():
+    rows = _counter_rows(range(5)) + [{"start": None, "state": 1.0, "sum": 1.0}]
+    assert find_resume_point(rows, "counter").start == T0 + timedelta(hours=4)
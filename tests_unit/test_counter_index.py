@@ -0,0 +1,147 @@
+"""Unit tests for the coordinator's per-poll counter index.
+
+These tests have no Home Assistant dependency and run with plain pytest.
+"""
+from __future__ import annotations
+
+import copy
+from datetime import datetime, timezone
+import importlib.util
+from pathlib import Path
+import sys
+import types
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_counter_index():
+    # counter_index imports its HA-free sibling timeutils.
+    package = types.ModuleType("_maalerportal_index_pkg")
+    package.__path__ = [str(ROOT / "custom_components" / "maalerportal")]
+    sys.modules["_maalerportal_index_pkg"] = package
+    name = "_maalerportal_index_pkg.counter_index"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "custom_components" / "maalerportal" / "counter_index.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+counter_index = _load_counter_index()
+CounterIndex = counter_index.CounterIndex
+parse_counter_value = counter_index.parse_counter_value
+
+PAYLOAD = {
+    "meterCounters": [
+        {
+            "meterCounterId": 101,
+            "counterType": "ColdWater",
+            "unit": "m3",
+            "isPrimary": True,
+            "latestValue": " 123.456 ",
+            "latestTimestamp": "2026-05-01T10:00:00Z",
+        },
+        {
+            "meterCounterId": "102",
+            "counterType": "AcousticNoise",
+            "latestValue": 17,
+            "latestTimestamp": "2026-05-01T11:30:00+02:00",
+        },
+        {
+            "meterCounterId": "103",
+            "counterType": "BatteryDaysRemaining",
+            "latestValue": None,
+            "latestTimestamp": None,
+        },
+        {
+            "meterCounterId": "104",
+            "counterType": "AcousticNoise",
+            "latestValue": "n/a",
+            "latestTimestamp": "not a timestamp",
+        },
+    ]
+}
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        (12, 12.0),
+        (1.5, 1.5),
+        (" 42.5 m³ ", 42.5),
+        ("-3", -3.0),
+        ("n/a", None),
+        ("", None),
+        (None, None),
+        (float("nan"), None),
+        ({"value": 1}, None),
+    ],
+)
+def test_parse_counter_value(raw, expected):
+    assert parse_counter_value(raw) == expected
+
+
+def test_lookup_by_id_accepts_ints_and_strings():
+    index = CounterIndex.from_payload(PAYLOAD)
+    assert len(index) == 4
+    reading = index.get("101")
+    assert reading is index.get(101)
+    assert reading.value == pytest.approx(123.456)
+    assert reading.unit == "m3"
+    assert reading.is_primary
+    assert reading.timestamp == datetime(2026, 5, 1, 10, tzinfo=timezone.utc)
+    assert reading.raw_timestamp == "2026-05-01T10:00:00Z"
+    assert index.get("999") is None
+    assert index.get(None) is None
+
+
+def test_unparseable_fields_become_none():
+    index = CounterIndex.from_payload(PAYLOAD)
+    battery = index.get("103")
+    assert battery.value is None and battery.timestamp is None
+    broken = index.get("104")
+    assert broken.value is None and broken.timestamp is None
+    assert broken.raw_timestamp == "not a timestamp"
+
+
+def test_type_primary_and_latest_lookups():
+    index = CounterIndex.from_payload(PAYLOAD)
+    # The first counter of a type wins, like the scans it replaced.
+    assert index.first_of_type("AcousticNoise").counter_id == "102"
+    assert index.primary.counter_id == "101"
+    assert index.first.counter_id == "101"
+    # 11:30+02:00 is 09:30Z, older than the primary's 10:00Z.
+    assert index.latest.counter_id == "101"
+
+
+def test_empty_payloads():
+    for data in (None, {}, {"meterCounters": None}, {"meterCounters": []}):
+        index = CounterIndex.from_payload(data)
+        assert len(index) == 0
+        assert index.primary is None and index.first is None
+        assert index.latest is None
+
+
+def test_reading_keeps_the_original_counter():
+    index = CounterIndex.from_payload(PAYLOAD)
+    assert index.get("101").counter is PAYLOAD["meterCounters"][0]
+    with pytest.raises(AttributeError):
+        index.get("101").value = 1.0
+
+
+def test_changed_since_reports_only_counters_that_differ():
+    previous = CounterIndex.from_payload(PAYLOAD)
+    counters = copy.deepcopy(PAYLOAD["meterCounters"])
+    counters[0]["latestValue"] = " 123.500 "
+    counters[1]["isFallback"] = True
+    counters.append({"meterCounterId": "105", "counterType": "HeatEnergy"})
+    current = CounterIndex.from_payload({"meterCounters": counters})
+
+    assert current.changed_since(previous) == {"101", "102", "105"}
+    # An identical poll changes nothing; a first poll changes everything.
+    assert current.changed_since(current) == frozenset()
+    assert previous.changed_since(None) == {"101", "102", "103", "104"}
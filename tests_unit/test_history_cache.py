@@ -0,0 +1,188 @@
+"""Unit tests for the on-disk historical day cache."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import sys
+import types
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+INSTALLATION = "0b7c1f4e-2d7a-4c55-9a51-3f1c2e9d8a10"
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _load_history_cache():
+    # history_cache only needs HomeAssistant for a type annotation; its
+    # sibling imports (reconcile, timeutils) are HA-free.
+    core = sys.modules.get("homeassistant.core") or types.ModuleType(
+        "homeassistant.core"
+    )
+    if not hasattr(core, "HomeAssistant"):
+        core.HomeAssistant = object
+    sys.modules.setdefault("homeassistant", types.ModuleType("homeassistant"))
+    sys.modules["homeassistant.core"] = core
+
+    package = types.ModuleType("_maalerportal_cache_pkg")
+    package.__path__ = [str(ROOT / "custom_components" / "maalerportal")]
+    sys.modules["_maalerportal_cache_pkg"] = package
+    name = "_maalerportal_cache_pkg.history_cache"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "custom_components" / "maalerportal" / "history_cache.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+history_cache = _load_history_cache()
+
+
+def _hass(tmp_path):
+    config = types.SimpleNamespace(path=lambda *parts: str(tmp_path.joinpath(*parts)))
+    return types.SimpleNamespace(config=config)
+
+
+def _reading(moment: datetime, value: float) -> dict:
+    return {
+        "timestamp": moment.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "meterCounterId": "c1",
+        "value": value,
+    }
+
+
+def _hourly(start: datetime, hours: int) -> list[dict]:
+    return [_reading(start + timedelta(hours=h), float(h)) for h in range(hours)]
+
+
+def test_day_is_final_only_a_week_after_it_ends():
+    day = T0
+    assert not history_cache.is_final(day, day + timedelta(days=7, hours=23))
+    assert history_cache.is_final(day, day + timedelta(days=8))
+
+
+def test_store_keeps_final_days_and_skips_the_open_tail(tmp_path):
+    cache = history_cache.HistoryDayCache(_hass(tmp_path), INSTALLATION)
+    fetched_at = T0 + timedelta(days=10, hours=12)
+    readings = _hourly(T0, 10 * 24 + 12)
+
+    stored = asyncio.run(
+        cache.async_store(readings, T0, T0 + timedelta(days=31), fetched_at)
+    )
+
+    # Days 0-2 ended at least a week before the fetch; days 3-10 may
+    # still change.
+    assert stored == [T0 + timedelta(days=d) for d in range(3)]
+    resume, cached = asyncio.run(
+        cache.async_cached_prefix(T0, fetched_at)
+    )
+    assert resume == T0 + timedelta(days=3)
+    assert len(cached) == 3 * 24
+
+
+def test_cache_survives_reload_from_disk(tmp_path):
+    hass = _hass(tmp_path)
+    cache = history_cache.HistoryDayCache(hass, INSTALLATION)
+    asyncio.run(
+        cache.async_store(
+            _hourly(T0, 48), T0, T0 + timedelta(days=2), T0 + timedelta(days=10)
+        )
+    )
+    assert (tmp_path / "maalerportal" / "history_cache" / INSTALLATION / "2026-03.json").exists()
+
+    reloaded = history_cache.HistoryDayCache(hass, INSTALLATION)
+    resume, cached = asyncio.run(
+        reloaded.async_cached_prefix(T0, T0 + timedelta(days=5))
+    )
+    assert resume == T0 + timedelta(days=2)
+    assert cached == _hourly(T0, 48)
+
+
+def test_empty_day_before_later_readings_is_cached(tmp_path):
+    cache = history_cache.HistoryDayCache(_hass(tmp_path), INSTALLATION)
+    day_two = _hourly(T0 + timedelta(days=1), 24)
+    stored = asyncio.run(
+        cache.async_store(day_two, T0, T0 + timedelta(days=2), T0 + timedelta(days=10))
+    )
+    assert stored == [T0, T0 + timedelta(days=1)]
+    resume, cached = asyncio.run(
+        cache.async_cached_prefix(T0, T0 + timedelta(days=2))
+    )
+    assert resume == T0 + timedelta(days=2)
+    assert cached == day_two
+
+
+def test_days_after_the_newest_reading_are_not_cached(tmp_path):
+    # Late grid data: nothing has arrived for the last days yet.
+    cache = history_cache.HistoryDayCache(_hass(tmp_path), INSTALLATION)
+    fetched_at = T0 + timedelta(days=20)
+    stored = asyncio.run(
+        cache.async_store(_hourly(T0, 30), T0, T0 + timedelta(days=5), fetched_at)
+    )
+    assert stored == [T0, T0 + timedelta(days=1)]
+    assert asyncio.run(
+        cache.async_store([], T0, T0 + timedelta(days=5), fetched_at)
+    ) == []
+    resume, _ = asyncio.run(cache.async_cached_prefix(T0, T0 + timedelta(days=5)))
+    assert resume == T0 + timedelta(days=2)
+
+
+def test_partially_covered_day_is_not_cached(tmp_path):
+    cache = history_cache.HistoryDayCache(_hass(tmp_path), INSTALLATION)
+    start = T0 + timedelta(hours=6)
+    stored = asyncio.run(
+        cache.async_store(
+            _hourly(start, 42), start, T0 + timedelta(days=2), T0 + timedelta(days=10)
+        )
+    )
+    # Day 0 was only covered from 06:00, so only day 1 is complete.
+    assert stored == [T0 + timedelta(days=1)]
+    resume, _ = asyncio.run(cache.async_cached_prefix(T0, T0 + timedelta(days=2)))
+    assert resume == T0
+
+
+def test_days_of_an_unwritable_month_are_not_reported_stored(tmp_path, monkeypatch):
+    cache = history_cache.HistoryDayCache(_hass(tmp_path), INSTALLATION)
+
+    def _fail(key, days):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache, "_write_month", _fail)
+    stored = asyncio.run(
+        cache.async_store(
+            _hourly(T0, 24), T0, T0 + timedelta(days=1), T0 + timedelta(days=10)
+        )
+    )
+    assert stored == []
+    resume, _ = asyncio.run(cache.async_cached_prefix(T0, T0 + timedelta(days=1)))
+    assert resume == T0
+
+
+def test_only_recent_months_stay_in_memory(tmp_path):
+    cache = history_cache.HistoryDayCache(_hass(tmp_path), INSTALLATION)
+    fetched_at = T0 + timedelta(days=200)
+    for month in range(4):
+        start = datetime(2026, 3 + month, 1, tzinfo=timezone.utc)
+        asyncio.run(
+            cache.async_store(
+                _hourly(start, 24), start, start + timedelta(days=1), fetched_at
+            )
+        )
+
+    assert list(cache._months) == ["2026-05", "2026-06"]
+    # An evicted month is read back from disk.
+    resume, cached = asyncio.run(
+        cache.async_cached_prefix(T0, T0 + timedelta(days=1))
+    )
+    assert resume == T0 + timedelta(days=1)
+    assert cached == _hourly(T0, 24)
+    assert list(cache._months) == ["2026-06", "2026-03"]
+
+
+def test_unsafe_installation_id_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        history_cache.HistoryDayCache(_hass(tmp_path), "../etc")
@@ -0,0 +1,319 @@
+"""Unit tests for the shared /readings/historical fetcher."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import sys
+import types
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+INSTALLATION = "0b7c1f4e-2d7a-4c55-9a51-3f1c2e9d8a10"
+FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+
+def _load_history_service():
+    # Only aiohttp's exception and timeout types are used at import time.
+    if "aiohttp" not in sys.modules:
+        aiohttp = types.ModuleType("aiohttp")
+        aiohttp.ClientError = type("ClientError", (Exception,), {})
+        aiohttp.ClientSession = object
+        aiohttp.ClientTimeout = lambda total=None: total
+        sys.modules["aiohttp"] = aiohttp
+    # HomeAssistant is only used for type annotations.
+    core = sys.modules.get("homeassistant.core") or types.ModuleType(
+        "homeassistant.core"
+    )
+    if not hasattr(core, "HomeAssistant"):
+        core.HomeAssistant = object
+    sys.modules.setdefault("homeassistant", types.ModuleType("homeassistant"))
+    sys.modules["homeassistant.core"] = core
+
+    package = types.ModuleType("_maalerportal_history_pkg")
+    package.__path__ = [str(ROOT / "custom_components" / "maalerportal")]
+    sys.modules["_maalerportal_history_pkg"] = package
+    name = "_maalerportal_history_pkg.history_service"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "custom_components" / "maalerportal" / "history_service.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+history_service = _load_history_service()
+api = sys.modules["_maalerportal_history_pkg.api"]
+history_cache = sys.modules["_maalerportal_history_pkg.history_cache"]
+Priority = sys.modules["_maalerportal_history_pkg.scheduler"].Priority
+
+SPAN = history_service._CHUNK_SPAN
+# A grid-aligned chunk start well in the past (2025).
+GRID = history_service._GRID_ORIGIN + 650 * SPAN
+NOON = timedelta(hours=12)
+
+
+class _Hass:
+    def __init__(self, tmp_path: Path | None = None) -> None:
+        self.config = types.SimpleNamespace(
+            path=lambda *parts: str(Path(tmp_path).joinpath(*parts))
+        )
+
+    def async_create_task(self, coro, name=None):
+        return asyncio.get_running_loop().create_task(coro, name=name)
+
+
+class _Client:
+    """Answers /readings/historical with a noon reading per day and counter.
+
+    ``fail`` maps a request's ``from`` to an exception raised once. With
+    ``gated`` set each request waits until its ``from`` is released.
+    """
+
+    def __init__(self, fail=None, gated=False):
+        self.calls: list[tuple[str, Priority]] = []
+        self.fail = dict(fail or {})
+        self.gates: dict[str, asyncio.Event] | None = {} if gated else None
+        self.active = 0
+        self.peak = 0
+
+    def release(self, *starts):
+        for start in starts:
+            self.gates.setdefault(_from(start), asyncio.Event()).set()
+
+    async def async_post(self, path, body, timeout=None, priority=None):
+        self.calls.append((body["from"], priority))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.gates is not None:
+                await self.gates.setdefault(body["from"], asyncio.Event()).wait()
+            else:
+                await asyncio.sleep(0)
+            error = self.fail.pop(body["from"], None)
+            if error is not None:
+                raise error
+        finally:
+            self.active -= 1
+        start = datetime.strptime(body["from"], "%Y-%m-%dT%H:%M:%SZ").replace(
+            tzinfo=timezone.utc
+        )
+        end = datetime.strptime(body["to"], "%Y-%m-%dT%H:%M:%SZ").replace(
+            tzinfo=timezone.utc
+        )
+        readings = []
+        day = start.replace(hour=0, minute=0, second=0) + NOON
+        while day <= end:
+            for counter in ("c1", "c2"):
+                readings.append(
+                    {
+                        "timestamp": day.strftime(FORMAT),
+                        "meterCounterId": counter,
+                        "value": 1.0,
+                    }
+                )
+            day += timedelta(days=1)
+        return {"readings": readings}
+
+
+class _Log:
+    """ReadingsLog stand-in with nothing archived yet."""
+
+    def __init__(self):
+        self.covered: list[list[datetime]] = []
+
+    def archived_prefix_end(self, start, end):
+        return start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    async def async_record_many(self, readings, *, source, covered_days=()):
+        self.covered.append(list(covered_days))
+        return len(readings)
+
+
+def _service(client, hass=None, **kwargs):
+    return history_service.HistoricalReadingsService(
+        hass or _Hass(), client, INSTALLATION, **kwargs
+    )
+
+
+def _from(start):
+    return start.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _end(chunks):
+    return GRID + chunks * SPAN - timedelta(seconds=1)
+
+
+async def _collect(service, start, end, counter_id=None):
+    return [chunk async for chunk in service.async_iter_chunks(start, end, counter_id)]
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_chunk_starts_cover_the_range_on_a_fixed_grid_oldest_first():
+    starts = history_service.chunk_starts(
+        GRID + timedelta(days=3), GRID + 2 * SPAN + timedelta(days=1)
+    )
+    assert starts == [GRID, GRID + SPAN, GRID + 2 * SPAN]
+    assert history_service.chunk_starts(GRID, GRID - timedelta(seconds=1)) == []
+
+
+def test_recent_chunks_are_lifted_to_statistics_priority():
+    now = GRID + 3 * SPAN
+    recent = now - SPAN + timedelta(days=2)
+    assert history_service.chunk_priority(
+        recent, Priority.BACKFILL, now
+    ) == Priority.STATISTICS
+    assert history_service.chunk_priority(
+        now - 2 * SPAN, Priority.BACKFILL, now
+    ) == Priority.BACKFILL
+    # More urgent callers keep their own priority.
+    assert history_service.chunk_priority(
+        recent, Priority.FALLBACK, now
+    ) == Priority.FALLBACK
+
+
+def test_chunks_are_yielded_oldest_first_for_one_counter():
+    client = _Client()
+    start = GRID + timedelta(days=2)
+    chunks = asyncio.run(_collect(_service(client), start, _end(3), "c1"))
+
+    assert [(c.start, c.index, c.total) for c in chunks] == [
+        (GRID + i * SPAN, i + 1, 3) for i in range(3)
+    ]
+    assert {r["meterCounterId"] for c in chunks for r in c.readings} == {"c1"}
+    # The first chunk is clipped to the requested start.
+    assert len(chunks[0].readings) == 31 - 2
+    assert chunks[0].readings[0]["timestamp"] == (start + NOON).strftime(FORMAT)
+    assert [call[0] for call in client.calls] == [_from(c.start) for c in chunks]
+
+
+def test_concurrent_callers_share_one_download_per_chunk():
+    async def run():
+        client = _Client(gated=True)
+        service = _service(client, parallelism=2)
+        both = asyncio.gather(
+            service.async_fetch(GRID, _end(2), "c1"),
+            service.async_fetch(GRID, _end(2), "c2"),
+        )
+        await _settle()
+        client.release(GRID, GRID + SPAN)
+        return client, await both
+
+    client, (c1, c2) = asyncio.run(run())
+    assert sorted(call[0] for call in client.calls) == [
+        _from(GRID),
+        _from(GRID + SPAN),
+    ]
+    assert len(c1) == len(c2) == 2 * 31
+
+
+def test_finished_chunks_are_reused_for_five_minutes():
+    async def run():
+        client = _Client()
+        service = _service(client)
+        await service.async_fetch(GRID, _end(1))
+        await service.async_fetch(GRID, _end(1))
+        within_ttl = len(client.calls)
+        service._chunks[GRID].fetched_at -= timedelta(minutes=6)
+        await service.async_fetch(GRID, _end(1))
+        return within_ttl, len(client.calls)
+
+    assert asyncio.run(run()) == (1, 2)
+
+
+def test_downloads_run_at_most_parallelism_ahead_of_the_consumer():
+    async def run():
+        client = _Client()
+        service = _service(client, parallelism=3)
+        requested = []
+        async for _chunk in service.async_iter_chunks(GRID, _end(6)):
+            requested.append(len(client.calls))
+        return client, requested
+
+    client, requested = asyncio.run(run())
+    assert client.peak == 3
+    # The first chunk is handed over before the whole range is requested.
+    assert requested[0] == 3
+    assert len(client.calls) == 6
+
+
+def test_rate_limit_in_the_window_falls_back_to_sequential():
+    client = _Client(fail={_from(GRID + SPAN): api.RateLimitedError()})
+    service = _service(client, parallelism=3)
+    chunks = asyncio.run(_collect(service, GRID, _end(4)))
+
+    assert [c.start for c in chunks] == [GRID + i * SPAN for i in range(4)]
+    assert [call[0] for call in client.calls].count(_from(GRID + SPAN)) == 2
+    assert service._current_parallelism() == 1
+
+
+def test_rate_limit_while_sequential_stops_after_the_older_chunks():
+    client = _Client(fail={_from(GRID + SPAN): api.RateLimitedError()})
+    chunks = asyncio.run(_collect(_service(client), GRID, _end(3)))
+
+    assert [c.start for c in chunks] == [GRID]
+    assert len(client.calls) == 2
+
+
+def test_failed_chunk_ends_the_fetch():
+    client = _Client(fail={_from(GRID + SPAN): api.ApiError(500)})
+    chunks = asyncio.run(_collect(_service(client), GRID, _end(3)))
+    assert [c.start for c in chunks] == [GRID]
+
+
+def test_unavailable_installation_is_raised():
+    client = _Client(fail={_from(GRID): api.InstallationUnavailableError(404)})
+    with pytest.raises(api.InstallationUnavailableError):
+        asyncio.run(_collect(_service(client), GRID, _end(2)))
+
+
+def test_abandoned_iteration_leaves_the_read_ahead_downloads_running():
+    async def run():
+        client = _Client(gated=True)
+        service = _service(client, parallelism=3)
+        chunks = service.async_iter_chunks(GRID, _end(5))
+        first = asyncio.ensure_future(chunks.__anext__())
+        await _settle()
+        client.release(GRID)
+        first = await first
+        await chunks.aclose()
+        pending = list(service._inflight.values())
+        # Only the waits were cancelled; the downloads finish for others.
+        assert len(pending) == 2 and not any(task.done() for task in pending)
+        client.release(GRID + SPAN, GRID + 2 * SPAN)
+        await asyncio.gather(*pending)
+        return first, client, service
+
+    first, client, service = asyncio.run(run())
+    assert first.start == GRID
+    assert len(client.calls) == 3
+    assert sorted(service._chunks) == [GRID, GRID + SPAN, GRID + 2 * SPAN]
+
+
+def test_final_days_are_kept_by_the_day_cache_only(tmp_path):
+    async def run():
+        hass = _Hass(tmp_path)
+        cache = history_cache.HistoryDayCache(hass, INSTALLATION)
+        log = _Log()
+        client = _Client()
+        first = await _service(
+            client, hass, day_cache=cache, readings_log=log
+        ).async_fetch(GRID, _end(1))
+        # A new service starts with an empty memo and reads the cache.
+        again = await _service(
+            client, hass, day_cache=cache, readings_log=log
+        ).async_fetch(GRID, _end(1))
+        return client, log, first, again
+
+    client, log, first, again = asyncio.run(run())
+    assert len(client.calls) == 1
+    assert again == first
+    # Every final day went to the cache, so none to the archive ledger.
+    assert log.covered == [[]]
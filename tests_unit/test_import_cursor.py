@@ -0,0 +1,76 @@
+"""Unit tests for the statistics delta-import cursor."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import sys
+import types
+
+ROOT = Path(__file__).resolve().parents[1]
+T0 = datetime(2026, 5, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def _load_import_cursor():
+    # import_cursor imports its HA-free sibling backfill.
+    package = types.ModuleType("_maalerportal_cursor_pkg")
+    package.__path__ = [str(ROOT / "custom_components" / "maalerportal")]
+    sys.modules["_maalerportal_cursor_pkg"] = package
+    name = "_maalerportal_cursor_pkg.import_cursor"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "custom_components" / "maalerportal" / "import_cursor.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+import_cursor = _load_import_cursor()
+ImportCursor = import_cursor.ImportCursor
+ResumePoint = sys.modules["_maalerportal_cursor_pkg.backfill"].ResumePoint
+
+
+def _rows(count, start=T0):
+    return [
+        ResumePoint(start=start + i * HOUR, state=float(i), sum=float(i))
+        for i in range(count)
+    ]
+
+
+def test_digest_hour_changes_with_the_readings():
+    digest = import_cursor.digest_hour([1.0, 1.5])
+    assert digest == import_cursor.digest_hour([1.0, 1.5])
+    # A revised value or an extra reading changes the hash.
+    assert import_cursor.digest_hour([1.0, 1.6]) != digest
+    assert import_cursor.digest_hour([1.0]) != digest
+
+
+def test_advance_cursor_settles_outside_the_overlap():
+    rows = _rows(10)
+    digests = {row.start: import_cursor.digest_hour([row.state]) for row in rows}
+    cursor = import_cursor.advance_cursor(rows, digests, None)
+    # Newest row at +9h, overlap 3h: the row at +6h is the last settled.
+    assert cursor.settled == rows[6]
+    assert sorted(cursor.digests) == [row.start for row in rows[7:]]
+
+
+def test_advance_cursor_keeps_previous_when_nothing_settles():
+    assert import_cursor.advance_cursor(_rows(2), {}, None) is None
+    previous = ImportCursor(settled=ResumePoint(T0 - HOUR, 5.0, 5.0))
+    cursor = import_cursor.advance_cursor(_rows(2), {T0: "a", T0 + HOUR: "b"}, previous)
+    assert cursor.settled == previous.settled
+    assert cursor.digests == {T0: "a", T0 + HOUR: "b"}
+    assert import_cursor.advance_cursor([], {}, previous) is previous
+
+
+def test_cursor_round_trips_through_its_dict():
+    local = timezone(timedelta(hours=2))
+    cursor = ImportCursor(
+        settled=ResumePoint(T0, 12.5, 40.0),
+        digests={datetime(2026, 5, 1, 4, tzinfo=local): "abc"},
+    )
+    assert ImportCursor.from_dict(cursor.as_dict()) == cursor
+    for broken in (None, {}, {"start": "yesterday"}, {"start": "2026-05-01T00:00:00"}):
+        assert ImportCursor.from_dict(broken) is None
@@ -0,0 +1,77 @@
+"""Unit tests for cadence-aware poll scheduling.
+
+These tests have no Home Assistant dependency and run with plain pytest.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+
+_POLLING_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "maalerportal"
+    / "polling.py"
+)
+_spec = importlib.util.spec_from_file_location("_maalerportal_polling", _POLLING_PATH)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+ARRIVAL_GRACE = _module.ARRIVAL_GRACE
+MAX_POLL_DELAY = _module.MAX_POLL_DELAY
+estimate_report_lag = _module.estimate_report_lag
+next_poll_delay = _module.next_poll_delay
+
+NOW = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+BASE = timedelta(minutes=30)
+
+
+def _delay(cadence, last_reading, report_lag=timedelta(0)):
+    return next_poll_delay(
+        base_interval=BASE,
+        cadence=cadence,
+        last_reading=last_reading,
+        now=NOW,
+        report_lag=report_lag,
+    )
+
+
+def test_unknown_cadence_or_reading_uses_base_interval():
+    assert _delay(None, NOW) == BASE
+    assert _delay(timedelta(hours=1), None) == BASE
+    assert _delay(timedelta(0), NOW) == BASE
+
+
+def test_slow_meter_is_polled_right_after_its_next_report():
+    # Hourly meter, last reading 40 minutes ago, 10 minutes upstream lag.
+    delay = _delay(
+        timedelta(hours=1),
+        NOW - timedelta(minutes=40),
+        report_lag=timedelta(minutes=10),
+    )
+    assert delay == timedelta(minutes=30) + ARRIVAL_GRACE
+
+
+def test_fast_meter_is_aligned_but_not_polled_more_often():
+    # 15-minute meter: the next report after a full interval is chosen.
+    delay = _delay(timedelta(minutes=15), NOW - timedelta(minutes=5))
+    assert BASE <= delay < BASE + timedelta(minutes=15)
+    assert (delay - ARRIVAL_GRACE + timedelta(minutes=5)) % timedelta(minutes=15) == timedelta(0)
+
+
+def test_overdue_reading_falls_back_to_base_interval():
+    assert _delay(timedelta(hours=1), NOW - timedelta(hours=2)) == BASE
+
+
+def test_sparse_meter_is_capped():
+    delay = _delay(timedelta(days=1), NOW - timedelta(hours=1))
+    assert delay == MAX_POLL_DELAY
+
+
+def test_report_lag_estimate_takes_the_smallest_sample():
+    lags = [timedelta(minutes=m) for m in (25, 7, 40)]
+    assert estimate_report_lag(lags) == timedelta(minutes=7)
+    assert estimate_report_lag([]) == timedelta(0)
+    # Clock skew never yields a negative lag.
+    assert estimate_report_lag([timedelta(minutes=-3)]) == timedelta(0)
@@ -0,0 +1,133 @@
+"""Unit tests for the AIMD request-rate limiter.
+
+These tests have no Home Assistant dependency and run with plain pytest.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+_RATELIMIT_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "maalerportal"
+    / "ratelimit.py"
+)
+_spec = importlib.util.spec_from_file_location("_maalerportal_ratelimit", _RATELIMIT_PATH)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+AimdRateLimiter = _module.AimdRateLimiter
+DECREASE_HOLDOFF = _module.DECREASE_HOLDOFF
+
+
+class _Clock:
+    """Manual clock whose sleep advances time instead of waiting."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.slept.append(delay)
+        self.now += delay
+
+
+def _limiter(clock, **kwargs):
+    return AimdRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_burst_then_paced_at_rate():
+    clock = _Clock()
+    limiter = _limiter(clock, rate=2.0, burst=3)
+
+    async def run():
+        for _ in range(7):
+            await limiter.async_acquire()
+
+    asyncio.run(run())
+    # Three from the bucket, then one every half second.
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_success_increases_additively_up_to_the_ceiling():
+    limiter = _limiter(_Clock(), rate=1.0, increase=0.5, max_rate=2.0)
+    limiter.on_success()
+    assert limiter.rate == 1.5
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == 2.0
+
+
+def test_rate_limit_cuts_multiplicatively_once_per_event():
+    clock = _Clock()
+    limiter = _limiter(clock, rate=4.0, min_rate=0.5)
+    # Three concurrent requests hit the same 429 wave.
+    for _ in range(3):
+        limiter.on_rate_limited()
+    assert limiter.rate == 2.0
+
+    clock.now += DECREASE_HOLDOFF
+    limiter.on_rate_limited()
+    clock.now += DECREASE_HOLDOFF
+    limiter.on_rate_limited()
+    clock.now += DECREASE_HOLDOFF
+    limiter.on_rate_limited()
+    assert limiter.rate == 0.5
+
+
+def test_rate_limit_empties_the_bucket():
+    clock = _Clock()
+    limiter = _limiter(clock, rate=2.0, burst=5)
+    limiter.on_rate_limited()
+    assert not limiter.try_acquire()
+    # Refills at the halved rate: one token per second.
+    assert limiter.delay() == pytest.approx(1.0)
+
+
+def test_retry_after_pauses_every_request_without_a_burst_after():
+    clock = _Clock()
+    limiter = _limiter(clock, rate=2.0, burst=5)
+    limiter.on_rate_limited(retry_after=30)
+    assert limiter.delay() == pytest.approx(30)
+
+    async def run():
+        await limiter.async_acquire()
+
+    asyncio.run(run())
+    # 30s pause, then a fresh token at the reduced rate of 1/s.
+    assert clock.now == pytest.approx(31)
+    assert not limiter.try_acquire()
+
+
+def test_converges_below_a_hard_limit():
+    clock = _Clock()
+    limiter = _limiter(clock, rate=1.0, increase=0.1)
+    capacity = 3.0  # requests per second the server tolerates
+
+    async def run():
+        served = 0
+        window_start, in_window = 0.0, 0
+        while clock.now < 600:
+            await limiter.async_acquire()
+            if clock.now - window_start >= 1:
+                window_start, in_window = clock.now, 0
+            in_window += 1
+            if in_window > capacity:
+                limiter.on_rate_limited()
+            else:
+                limiter.on_success()
+                served += 1
+        return served
+
+    served = asyncio.run(run())
+    # Sawtooth around the limit: most of the capacity is used and the
+    # rate never runs away.
+    assert served > 0.5 * capacity * 600
+    assert limiter.rate < 2 * capacity
@@ -0,0 +1,470 @@
+"""Unit tests for the ReadingsLog archive, its coverage ledger and storage engines."""
+from __future__ import annotations
+
+import asyncio
+import csv
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import sys
+import tracemalloc
+import types
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+INSTALLATION = "0b7c1f4e-2d7a-4c55-9a51-3f1c2e9d8a10"
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _load_readings_log():
+    # readings_log only needs HomeAssistant for a type annotation; its
+    # sibling imports (const, reconcile, timeutils) are HA-free.
+    core = sys.modules.get("homeassistant.core") or types.ModuleType(
+        "homeassistant.core"
+    )
+    if not hasattr(core, "HomeAssistant"):
+        core.HomeAssistant = object
+    sys.modules.setdefault("homeassistant", types.ModuleType("homeassistant"))
+    sys.modules["homeassistant.core"] = core
+
+    package = types.ModuleType("_maalerportal_log_pkg")
+    package.__path__ = [str(ROOT / "custom_components" / "maalerportal")]
+    sys.modules["_maalerportal_log_pkg"] = package
+    name = "_maalerportal_log_pkg.readings_log"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "custom_components" / "maalerportal" / "readings_log.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+readings_log = _load_readings_log()
+readings_store = sys.modules["_maalerportal_log_pkg.readings_store"]
+
+
+def _hass(tmp_path):
+    config = types.SimpleNamespace(path=lambda *parts: str(tmp_path.joinpath(*parts)))
+    return types.SimpleNamespace(config=config)
+
+
+def _reading(moment: datetime, value: float, counter: str = "c1") -> dict:
+    # /readings/historical reports local time with an explicit offset.
+    return {
+        "timestamp": moment.astimezone(timezone(timedelta(hours=1))).isoformat(),
+        "meterCounterId": counter,
+        "counterType": "ColdWater",
+        "value": value,
+        "unit": "m³",
+    }
+
+
+async def _loaded_log(tmp_path):
+    log = readings_log.ReadingsLog(_hass(tmp_path), INSTALLATION)
+    await log.async_load()
+    return log
+
+
+def test_covered_days_round_trip_through_the_ledger(tmp_path):
+    async def run():
+        log = await _loaded_log(tmp_path)
+        readings = [_reading(T0 + timedelta(hours=h), float(h)) for h in range(72)]
+        await log.async_record_many(
+            readings,
+            covered_days=[T0, T0 + timedelta(days=1), T0 + timedelta(days=2)],
+        )
+        reloaded = await _loaded_log(tmp_path)
+        return reloaded
+
+    log = asyncio.run(run())
+    assert log.archived_prefix_end(T0, T0 + timedelta(days=10)) == T0 + timedelta(days=3)
+    # A range starting mid-way still walks from that day's midnight.
+    assert log.archived_prefix_end(
+        T0 + timedelta(days=1, hours=5), T0 + timedelta(days=10)
+    ) == T0 + timedelta(days=3)
+    assert log.archived_prefix_end(T0 + timedelta(days=5), T0 + timedelta(days=10)) == (
+        T0 + timedelta(days=5)
+    )
+
+
+def test_read_historical_returns_api_shaped_rows_in_range(tmp_path):
+    async def run():
+        log = await _loaded_log(tmp_path)
+        await log.async_record_many(
+            [_reading(T0 + timedelta(hours=h), float(h)) for h in range(48)]
+        )
+        return await log.async_read_historical(T0, T0 + timedelta(days=1))
+
+    rows = asyncio.run(run())
+    # Only the first day, UTC timestamps, float values.
+    assert len(rows) == 24
+    assert rows[0] == {
+        "timestamp": "2026-03-01T00:00:00.000Z",
+        "meterCounterId": "c1",
+        "counterType": "ColdWater",
+        "value": 0.0,
+        "unit": "m³",
+    }
+    assert rows[-1]["timestamp"] == "2026-03-01T23:00:00.000Z"
+
+
+@pytest.mark.parametrize("engine", ["csv", "sqlite"])
+def test_covered_day_keeps_a_reading_first_logged_by_a_live_poll(tmp_path, engine):
+    async def run():
+        log = readings_log.ReadingsLog(_hass(tmp_path), INSTALLATION, engine)
+        await log.async_load()
+        # The live poll logs 10:00 before the historical fetch does.
+        await log.async_record(
+            timestamp="2026-03-01T10:00:00.000Z",
+            counter_type="ColdWater",
+            meter_counter_id="c1",
+            value=10.0,
+            source="latest",
+        )
+        await log.async_record_many(
+            [_reading(T0 + timedelta(hours=h), float(h)) for h in range(24)],
+            covered_days=[T0],
+        )
+        rows = await log.async_read_historical(T0, T0 + timedelta(days=1))
+        covered_until = log.archived_prefix_end(T0, T0 + timedelta(days=1))
+        await log.async_close()
+        return rows, covered_until
+
+    rows, covered_until = asyncio.run(run())
+    assert covered_until == T0 + timedelta(days=1)
+    assert len(rows) == 24
+    assert rows[10]["timestamp"] == "2026-03-01T10:00:00.000Z"
+    assert rows[10]["value"] == 10.0
+
+
+def test_failed_write_does_not_mark_days_covered(tmp_path, monkeypatch):
+    async def run():
+        log = await _loaded_log(tmp_path)
+
+        def _fail(rows):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(log, "_append_rows", _fail)
+        await log.async_record_many(
+            [_reading(T0 + timedelta(hours=1), 1.0)], covered_days=[T0]
+        )
+        return log
+
+    log = asyncio.run(run())
+    assert log.archived_prefix_end(T0, T0 + timedelta(days=1)) == T0
+
+
+def test_sqlite_backend_imports_existing_csv_once(tmp_path):
+    async def run():
+        csv_log = await _loaded_log(tmp_path)
+        await csv_log.async_record_many(
+            [_reading(T0 + timedelta(hours=h), float(h)) for h in range(24)],
+            covered_days=[T0],
+        )
+
+        db_log = readings_log.ReadingsLog(_hass(tmp_path), INSTALLATION, "sqlite")
+        await db_log.async_load()
+        imported = await db_log.async_read_historical(T0, T0 + timedelta(days=1))
+        archived_until = db_log.archived_prefix_end(T0, T0 + timedelta(days=2))
+        recent = db_log.recent_readings(n=5)
+        await db_log.async_close()
+
+        # Rows recorded after the switch land only in the database, and a
+        # second load doesn't import the CSV again.
+        await csv_log.async_record(
+            timestamp="2026-03-02T00:00:00Z",
+            counter_type="ColdWater",
+            meter_counter_id="c1",
+            value=24,
+            source="historical",
+        )
+        again = readings_log.ReadingsLog(_hass(tmp_path), INSTALLATION, "sqlite")
+        await again.async_load()
+        rows = await again.async_read_historical(T0, T0 + timedelta(days=2))
+        await again.async_close()
+        return imported, archived_until, recent, rows
+
+    imported, archived_until, recent, rows = asyncio.run(run())
+    assert len(imported) == 24
+    assert archived_until == T0 + timedelta(days=1)
+    assert [r["timestamp"] for r in recent][-1] == "2026-03-01T23:00:00.000Z"
+    assert len(rows) == 24
+
+
+def test_sqlite_backend_dedups_on_primary_key(tmp_path):
+    async def run():
+        log = readings_log.ReadingsLog(_hass(tmp_path), INSTALLATION, "sqlite")
+        await log.async_load()
+        first = await log.async_record(
+            timestamp="2026-03-01T10:00:00Z",
+            counter_type="ColdWater",
+            meter_counter_id="c1",
+            value=1.5,
+        )
+        # Same instant in local time is the same row.
+        second = await log.async_record(
+            timestamp="2026-03-01T11:00:00+01:00",
+            counter_type="ColdWater",
+            meter_counter_id="c1",
+            value=1.5,
+        )
+        other_counter = await log.async_record(
+            timestamp="2026-03-01T10:00:00Z",
+            counter_type="HotWater",
+            meter_counter_id="c2",
+            value=0.5,
+        )
+        recent = log.recent_readings(n=10)
+        await log.async_close()
+        return first, second, other_counter, recent
+
+    first, second, other_counter, recent = asyncio.run(run())
+    assert (first, second, other_counter) == (True, False, True)
+    assert len(recent) == 2
+
+
+def test_record_many_writes_a_batch_through_one_append(tmp_path, monkeypatch):
+    async def run():
+        log = await _loaded_log(tmp_path)
+        calls = []
+        original = log._append_rows
+
+        def _counting(rows):
+            calls.append(len(rows))
+            return original(rows)
+
+        monkeypatch.setattr(log, "_append_rows", _counting)
+        readings = [_reading(T0 + timedelta(hours=h), float(h)) for h in range(48)]
+        # Duplicates inside the batch never reach the engine; duplicates of
+        # archived rows are dropped by it.
+        first = await log.async_record_many(readings + readings[:5])
+        second = await log.async_record_many(
+            readings[40:] + [_reading(T0 + timedelta(days=2), 48.0)]
+        )
+        return log, calls, first, second
+
+    log, calls, first, second = asyncio.run(run())
+    assert calls == [48, 9]
+    assert (first, second) == (48, 1)
+    recent = log.recent_readings(n=100)
+    assert len(recent) == 49
+    assert recent == sorted(recent, key=lambda r: r["timestamp"])
+
+
+def test_recent_readings_for_one_counter_are_the_newest_oldest_first(tmp_path):
+    async def run():
+        log = await _loaded_log(tmp_path)
+        await log.async_record_many(
+            [
+                _reading(T0 + timedelta(hours=h), float(h), "c1" if h % 3 else "c2")
+                for h in range(12)
+            ]
+        )
+        return log
+
+    log = asyncio.run(run())
+    c1 = log.recent_readings(counter_id="c1", n=3)
+    assert [r["value"] for r in c1] == [8.0, 10.0, 11.0]
+    c2 = log.recent_readings(counter_id="c2", n=10)
+    assert [r["value"] for r in c2] == [0.0, 3.0, 6.0, 9.0]
+    assert log.recent_readings(counter_id="c3") == []
+
+
+def _write_csv(tmp_path, rows):
+    directory = tmp_path / "maalerportal"
+    directory.mkdir(parents=True, exist_ok=True)
+    with (directory / f"{INSTALLATION}.csv").open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(readings_store.HEADER)
+        writer.writerows(rows)
+
+
+def _hourly_rows(hours, counters=("c1", "c2")):
+    return [
+        [
+            (T0 + timedelta(hours=h)).strftime(readings_store.CANONICAL_FORMAT),
+            "ColdWater",
+            counter,
+            str(float(h)),
+            "m³",
+            "historical",
+        ]
+        for h in range(hours)
+        for counter in counters
+    ]
+
+
+def test_csv_load_reads_only_the_tail(tmp_path):
+    # 200 days of two hourly counters: 9600 rows.
+    _write_csv(tmp_path, _hourly_rows(200 * 24))
+
+    async def run():
+        log = await _loaded_log(tmp_path)
+        store = log._store
+        window = len(store._window)
+        newest = log.recent_readings(n=1)
+        recent = log.recent_readings(n=readings_store.RECENT_BUFFER_SIZE)
+        # A re-fetch of the last days is deduplicated against the window.
+        again = await log.async_record_many(
+            [_reading(T0 + timedelta(hours=h), float(h)) for h in range(4790, 4800)]
+        )
+        return store, window, newest, recent, again
+
+    store, window, newest, recent, again = asyncio.run(run())
+    assert newest[0]["timestamp"] == "2026-09-16T23:00:00.000Z"
+    assert len(recent) == readings_store.RECENT_BUFFER_SIZE
+    assert recent == sorted(recent, key=lambda r: r["timestamp"])
+    # Seven days of keys for two counters, not the whole archive.
+    assert window <= 2 * 24 * 8
+    assert again == 0
+    assert store._index is None
+
+
+def test_csv_old_rows_dedup_through_a_lazy_index(tmp_path):
+    _write_csv(tmp_path, _hourly_rows(60 * 24, counters=("c1",)))
+
+    async def run():
+        log = await _loaded_log(tmp_path)
+        old_existing = await log.async_record_many([_reading(T0, 0.0)])
+        old_new = await log.async_record_many([_reading(T0, 1.0, counter="c9")])
+        newer = await log.async_record_many(
+            [_reading(T0 + timedelta(days=61), 2.0)]
+        )
+        return log._store, old_existing, old_new, newer
+
+    store, old_existing, old_new, newer = asyncio.run(run())
+    assert (old_existing, old_new, newer) == (0, 1, 1)
+    assert store._index is not None
+    with (tmp_path / "maalerportal" / f"{INSTALLATION}.csv").open() as f:
+        assert sum(1 for _ in f) == 1 + 60 * 24 + 2
+
+
+def test_csv_reload_after_appending_older_history(tmp_path):
+    # Live polls first, then "Fetch more history" appends older days.
+    live_start = datetime(2026, 9, 28, tzinfo=timezone.utc)
+    older_start = live_start + timedelta(days=3) - timedelta(days=300)
+    path = tmp_path / "maalerportal" / f"{INSTALLATION}.csv"
+
+    async def run():
+        log = await _loaded_log(tmp_path)
+        for h in range(72):
+            await log.async_record(
+                timestamp=(live_start + timedelta(hours=h)).strftime(
+                    readings_store.CANONICAL_FORMAT
+                ),
+                counter_type="ColdWater",
+                meter_counter_id="c1",
+                value=float(h),
+            )
+        await log.async_record_many(
+            [_reading(older_start + timedelta(hours=h), 0.5) for h in range(100 * 24)]
+        )
+
+        reloaded = await _loaded_log(tmp_path)
+        newest = reloaded.recent_readings(n=1)
+        with path.open() as f:
+            lines = sum(1 for _ in f)
+        again = await reloaded.async_record(
+            timestamp="2026-09-30T23:00:00.000Z",
+            counter_type="ColdWater",
+            meter_counter_id="c1",
+            value=71.0,
+        )
+        return newest, lines, again
+
+    newest, lines, again = asyncio.run(run())
+    assert newest[0]["timestamp"] == "2026-09-30T23:00:00.000Z"
+    assert again is False
+    with path.open() as f:
+        assert sum(1 for _ in f) == lines == 1 + 72 + 100 * 24
+
+
+def test_csv_with_legacy_timestamps_is_migrated(tmp_path):
+    rows = _hourly_rows(48, counters=("c1",))
+    # The same instant once in local time, as written by old versions.
+    rows.insert(0, ["2026-03-01T01:00:00.000+01:00"] + rows[0][1:])
+    _write_csv(tmp_path, rows)
+
+    async def run():
+        log = await _loaded_log(tmp_path)
+        return log.recent_readings(n=100)
+
+    recent = asyncio.run(run())
+    assert len(recent) == 48
+    with (tmp_path / "maalerportal" / f"{INSTALLATION}.csv").open() as f:
+        assert "+01:00" not in f.read()
+
+
+def _traced(build):
+    """Return ``build()`` and the bytes it still holds afterwards."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def test_key_index_memory_benchmark():
+    # Three years of two hourly counters.
+    def keys():
+        for h in range(3 * 365 * 24):
+            ts = (T0 + timedelta(hours=h)).strftime(readings_store.CANONICAL_FORMAT)
+            for counter in ("966e9613-5c0e-4f3a-9b1a-0d6c1f2e3a4b", "c2"):
+                yield (counter, ts)
+
+    index, compact = _traced(lambda: readings_store.ReadingKeyIndex(keys()))
+    baseline_set, baseline = _traced(lambda: set(keys()))
+
+    rows = len(baseline_set)
+    assert len(index) == rows
+    assert all(key in index for key in list(baseline_set)[:1000])
+    assert ("c2", "2020-01-01T00:00:00.000Z") not in index
+    # Kilobytes per thousand rows, an order of magnitude below tuples.
+    assert compact / rows * 1000 < 10 * 1024
+    assert compact * 10 < baseline
+
+
+def test_recent_buffer_memory_benchmark():
+    rows = [
+        {
+            "timestamp": (T0 + timedelta(hours=h)).strftime(
+                readings_store.CANONICAL_FORMAT
+            ),
+            "counter_type": "ColdWater",
+            "meter_counter_id": "966e9613-5c0e-4f3a-9b1a-0d6c1f2e3a4b",
+            "value": f"{h * 0.001:.3f}",
+            "unit": "m³",
+            "source": "historical",
+        }
+        for h in range(readings_store.RECENT_BUFFER_SIZE)
+    ]
+    ring, compact = _traced(lambda: [readings_log._RecentRow.from_row(r) for r in rows])
+    copies, baseline = _traced(lambda: [dict(r) for r in rows])
+
+    assert [r.as_dict() for r in ring] == copies
+    assert compact * 2 < baseline
+
+
+def test_usage_is_tracked_as_rows_are_recorded(tmp_path):
+    async def run():
+        log = await _loaded_log(tmp_path)
+        await log.async_record_many(
+            [_reading(T0 + timedelta(hours=h), 1.0 + h * 0.01) for h in range(0, 24, 2)]
+        )
+        # A backfill filling the odd hours re-splits the existing deltas.
+        await log.async_record_many(
+            [_reading(T0 + timedelta(hours=h), 1.0 + h * 0.01) for h in range(1, 24, 2)]
+        )
+        reloaded = await _loaded_log(tmp_path)
+        return log.usage_hourly("c1"), reloaded.usage_hourly("c1")
+
+    live, reloaded = asyncio.run(run())
+    assert len(live) == 23
+    assert all(abs(liters - 10.0) < 1e-6 for liters in live.values())
+    assert {k: round(v, 6) for k, v in reloaded.items()} == {
+        k: round(v, 6) for k, v in live.items()
+    }
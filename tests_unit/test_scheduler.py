@@ -0,0 +1,141 @@
+"""Unit tests for the priority-aware request scheduler.
+
+These tests have no Home Assistant dependency and run with plain pytest.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+_SCHEDULER_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "maalerportal"
+    / "scheduler.py"
+)
+_spec = importlib.util.spec_from_file_location("_maalerportal_scheduler", _SCHEDULER_PATH)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+Priority = _module.Priority
+RequestScheduler = _module.RequestScheduler
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrency_is_capped():
+    async def run():
+        scheduler = RequestScheduler(3, reserved=0)
+        peak = 0
+        release = asyncio.Event()
+
+        async def request():
+            nonlocal peak
+            async with scheduler.slot(Priority.BACKFILL):
+                peak = max(peak, scheduler.in_use)
+                await release.wait()
+
+        tasks = [asyncio.create_task(request()) for _ in range(10)]
+        await _settle()
+        assert scheduler.in_use == 3
+        assert scheduler.waiting == 7
+        release.set()
+        await asyncio.gather(*tasks)
+        assert peak == 3
+        assert scheduler.in_use == 0
+
+    asyncio.run(run())
+
+
+def test_freed_slots_go_to_the_most_urgent_waiter():
+    async def run():
+        scheduler = RequestScheduler(1, reserved=0)
+        order: list[str] = []
+        gate = asyncio.Event()
+
+        async def request(name, priority, hold=None):
+            async with scheduler.slot(priority):
+                order.append(name)
+                if hold is not None:
+                    await hold.wait()
+
+        first = asyncio.create_task(request("backfill-1", Priority.BACKFILL, gate))
+        await _settle()
+        queued = [
+            asyncio.create_task(request("backfill-2", Priority.BACKFILL)),
+            asyncio.create_task(request("stats", Priority.STATISTICS)),
+            asyncio.create_task(request("cadence", Priority.FALLBACK)),
+            asyncio.create_task(request("backfill-3", Priority.BACKFILL)),
+            asyncio.create_task(request("latest", Priority.LIVE)),
+        ]
+        await _settle()
+        gate.set()
+        await asyncio.gather(first, *queued)
+        assert order == [
+            "backfill-1",
+            "latest",
+            "cadence",
+            "stats",
+            "backfill-2",
+            "backfill-3",
+        ]
+
+    asyncio.run(run())
+
+
+def test_reserved_slot_keeps_live_polls_moving_during_backfill():
+    async def run():
+        scheduler = RequestScheduler(3, reserved=1)
+        release = asyncio.Event()
+
+        async def backfill():
+            async with scheduler.slot(Priority.BACKFILL):
+                await release.wait()
+
+        backfills = [asyncio.create_task(backfill()) for _ in range(5)]
+        await _settle()
+        # Background traffic never takes the reserved slot.
+        assert scheduler.in_use == 2
+
+        async def latest():
+            async with scheduler.slot(Priority.LIVE):
+                return "fresh"
+
+        assert await asyncio.wait_for(latest(), 1) == "fresh"
+        release.set()
+        await asyncio.gather(*backfills)
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        scheduler = RequestScheduler(1, reserved=0)
+        gate = asyncio.Event()
+
+        async def request(hold=None):
+            async with scheduler.slot(Priority.BACKFILL):
+                if hold is not None:
+                    await hold.wait()
+
+        holder = asyncio.create_task(request(gate))
+        await _settle()
+        waiter = asyncio.create_task(request())
+        await _settle()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        gate.set()
+        await holder
+        assert scheduler.in_use == 0
+        assert scheduler.waiting == 0
+        # The slot is still usable.
+        await asyncio.wait_for(request(), 1)
+
+    asyncio.run(run())
@@ -0,0 +1,197 @@
+"""Unit tests for the HA-free statistics builder."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import sys
+import types
+from zoneinfo import ZoneInfo
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SWEDEN = ZoneInfo("Europe/Stockholm")
+
+
+def _load_statistics_builder():
+    # statistics_builder imports its HA-free siblings (import_cursor,
+    # reconcile, timeutils).
+    package = types.ModuleType("_maalerportal_builder_pkg")
+    package.__path__ = [str(ROOT / "custom_components" / "maalerportal")]
+    sys.modules["_maalerportal_builder_pkg"] = package
+    name = "_maalerportal_builder_pkg.statistics_builder"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "custom_components" / "maalerportal" / "statistics_builder.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+builder = _load_statistics_builder()
+StatisticsStream = builder.StatisticsStream
+ImportCursor = sys.modules["_maalerportal_builder_pkg.import_cursor"].ImportCursor
+
+
+def _reading(timestamp, value, counter_id="c1"):
+    return {"meterCounterId": counter_id, "timestamp": timestamp, "value": value}
+
+
+def _utc(text):
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+
+
+def _build(readings, reading_type="counter", **kwargs):
+    stream = StatisticsStream("c1", reading_type, SWEDEN, **kwargs)
+    rows = stream.feed(readings) + stream.close()
+    return stream, rows
+
+
+def test_counter_readings_are_filtered_sorted_and_bucketed_per_hour():
+    readings = [
+        _reading("2026-05-11T10:45:00Z", "12.5"),
+        _reading("2026-05-11T10:15:00Z", 12.0),
+        _reading("2026-05-11T11:05:00Z", 13.0),
+        _reading("2026-05-11T11:10:00Z", 99.0, counter_id="other"),
+        _reading("2026-05-11T11:20:00Z", None),
+    ]
+    stream, rows = _build(readings, meter_offset=100.0)
+
+    assert stream.matched == 3
+    # Counter readings close the previous hour; the hour keeps its last value.
+    assert rows == [
+        {"start": _utc("2026-05-11T09:00:00"), "state": 12.5, "sum": 112.5},
+        {"start": _utc("2026-05-11T10:00:00"), "state": 13.0, "sum": 113.0},
+    ]
+    assert stream.swap is None
+
+
+def test_consumption_intervals_are_summed_per_hour():
+    readings = [
+        _reading("2026-05-11T10:00:00Z", 0.5),
+        _reading("2026-05-11T10:30:00Z", 0.25),
+        _reading("2026-05-11T11:00:00Z", -0.1),
+    ]
+    stream, rows = _build(readings, "consumption", cumulative_sum=10.0)
+
+    assert [row["state"] for row in rows] == [0.75, -0.1]
+    # Negative intervals don't move the virtual meter.
+    assert [row["sum"] for row in rows] == [10.75, 10.75]
+    assert stream.cumulative_sum == 10.75
+
+
+def test_rows_at_or_before_after_are_skipped():
+    readings = [
+        _reading("2026-05-11T10:05:00Z", 1.0),
+        _reading("2026-05-11T11:05:00Z", 2.0),
+    ]
+    stream, rows = _build(readings, after=_utc("2026-05-11T09:00:00"))
+    assert stream.matched == 2
+    assert [row["start"] for row in rows] == [_utc("2026-05-11T10:00:00")]
+
+
+def test_first_reading_baseline():
+    readings = [
+        _reading("2026-05-11T10:05:00Z", "500.0"),
+        _reading("2026-05-11T11:05:00Z", "501.5"),
+    ]
+    stream, rows = _build(readings, baseline_from_first=True)
+    assert stream.baseline == 500.0
+    assert [row["sum"] for row in rows] == [0.0, 1.5]
+
+
+def test_swap_is_reported_and_applied_to_later_rows():
+    readings = [
+        _reading("2026-05-11T10:05:00Z", 900.0),
+        _reading("2026-05-11T11:05:00Z", 2.0),
+        _reading("2026-05-11T12:05:00Z", 3.0),
+    ]
+    stream, rows = _build(
+        readings, previous_value=899.0, previous_sum=899.0, swap_pending=True
+    )
+
+    assert stream.swap is not None
+    assert stream.swap.start == _utc("2026-05-11T10:00:00")
+    assert (stream.swap.old_offset, stream.swap.new_offset) == (0.0, 898.0)
+    assert stream.meter_offset == 898.0
+    assert [row["sum"] for row in rows] == [900.0, 900.0, 901.0]
+
+
+def test_unparseable_values_are_skipped():
+    readings = [
+        _reading("2026-05-11T10:05:00Z", "n/a"),
+        _reading("not a timestamp", 1.0),
+        _reading("2026-05-11T11:05:00Z", 2.0),
+    ]
+    _stream, rows = _build(readings)
+    assert [row["state"] for row in rows] == [2.0]
+
+
+def test_chunked_feed_matches_a_single_pass():
+    readings = [
+        _reading(f"2026-05-{day:02d}T{hour:02d}:{minute:02d}:00Z", day * 100 + hour + minute / 60)
+        for day in (10, 11)
+        for hour in range(24)
+        for minute in (0, 30)
+    ]
+    _stream, expected = _build(readings, "consumption")
+
+    stream = StatisticsStream("c1", "consumption", SWEDEN)
+    rows = []
+    for chunk in (readings[:47], readings[47:48], readings[48:]):
+        built = stream.feed(chunk)
+        # The newest hour stays open until the next chunk or close().
+        assert all(row["start"] < expected[-1]["start"] for row in built)
+        rows += built
+    rows += stream.close()
+    assert rows == expected
+
+
+def test_cursor_digests_hold_back_unchanged_hours():
+    readings = [_reading(f"2026-05-11T{hour:02d}:05:00Z", float(hour)) for hour in range(1, 9)]
+    first, rows = _build(readings)
+    cursor = first.next_cursor(None)
+    # Newest hour 07:00 UTC, 3h overlap: 04:00 is the last settled row.
+    assert cursor.settled.start == _utc("2026-05-11T04:00:00")
+    assert sorted(cursor.digests) == [row["start"] for row in rows[-3:]]
+
+    # Same readings again: nothing is resent and the cursor stays put.
+    again, resent = _build(
+        readings[4:],
+        after=cursor.settled.start,
+        previous_digests=cursor.digests,
+    )
+    assert resent == []
+    assert again.next_cursor(cursor) == cursor
+
+    # A revised reading resends from its hour (06:00 UTC) on.
+    revised = readings[4:6] + [_reading("2026-05-11T07:05:00Z", 6.5)] + readings[7:]
+    _stream, resent = _build(
+        revised, after=cursor.settled.start, previous_digests=cursor.digests
+    )
+    assert [row["start"] for row in resent] == [
+        _utc("2026-05-11T06:00:00"),
+        _utc("2026-05-11T07:00:00"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("timestamp", "expected"),
+    [
+        # 12:05 CEST closes the 11:00 local hour, 09:00 UTC.
+        ("2026-05-11T10:05:00+00:00", "2026-05-11T09:00:00+00:00"),
+        # Winter: 11:05 CET closes 10:00 CET, 09:00 UTC.
+        ("2026-01-15T10:05:00+00:00", "2026-01-15T09:00:00+00:00"),
+    ],
+)
+def test_statistics_hour_start(timestamp, expected):
+    bucket = builder.statistics_hour_start(
+        datetime.fromisoformat(timestamp), "counter", SWEDEN
+    )
+    assert bucket.isoformat() == expected
+    consumption = builder.statistics_hour_start(
+        datetime.fromisoformat(timestamp), "consumption", SWEDEN
+    )
+    assert consumption == bucket + timedelta(hours=1)
@@ -91,6 +91,13 @@ def _install_package_stubs() -> None:
     coordinator = types.ModuleType("custom_components.maalerportal.coordinator")
     coordinator.MaalerportalCoordinator = object
 
+    api = types.ModuleType("custom_components.maalerportal.api")
+    api.ApiError = type("ApiError", (Exception,), {})
+    api.InstallationUnavailableError = type(
+        "InstallationUnavailableError", (api.ApiError,), {}
+    )
+    api.RateLimitedError = type("RateLimitedError", (api.ApiError,), {})
+
     base = types.ModuleType("custom_components.maalerportal.sensors.base")
     base.MaalerportalCoordinatorSensor = type("MaalerportalCoordinatorSensor", (), {})
     base.MaalerportalPollingSensor = type("MaalerportalPollingSensor", (), {})
@@ -101,6 +108,7 @@ def _install_package_stubs() -> None:
             "custom_components.maalerportal": maalerportal,
             "custom_components.maalerportal.sensors": sensors,
             "custom_components.maalerportal.coordinator": coordinator,
+            "custom_components.maalerportal.api": api,
             "custom_components.maalerportal.sensors.base": base,
         }
     )
@@ -156,7 +164,15 @@ def test_dashboard_summary_builds_liter_deltas_by_local_day():
         {"timestamp": "2026-05-20T10:00:00Z", "value": "5.159", "unit": "m³"},
     ]
 
-    summary = measurement._dashboard_usage_summary(readings)
+    usage = sys.modules["custom_components.maalerportal.usage"].UsageAggregate()
+    for reading in readings:
+        usage.add(
+            measurement.parse_api_timestamp(reading["timestamp"]),
+            reading["value"],
+            reading["unit"],
+        )
+
+    summary = measurement._usage_summary(usage.hourly())
 
     assert summary["today_liters"] == 59
     assert summary["yesterday_liters"] == 100
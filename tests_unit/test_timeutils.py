@@ -0,0 +1,191 @@
+"""Unit tests for the memoized timestamp helpers."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import importlib.util
+import os
+from pathlib import Path
+import time
+from zoneinfo import ZoneInfo
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SWEDEN = ZoneInfo("Europe/Stockholm")
+
+
+def _load_timeutils():
+    spec = importlib.util.spec_from_file_location(
+        "_maalerportal_timeutils",
+        ROOT / "custom_components" / "maalerportal" / "timeutils.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+timeutils = _load_timeutils()
+
+
+def _reference_parse(timestamp):
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _reference_bucket(moment, local_tz, hours_back):
+    local_hour = moment.astimezone(local_tz).replace(
+        minute=0, second=0, microsecond=0
+    )
+    if hours_back:
+        local_hour = local_hour - timedelta(hours=hours_back)
+    return local_hour.astimezone(timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2026-05-11T10:00:00.000Z",
+        "2026-05-11T12:00:00.000+02:00",
+        "2026-01-15T10:00:00-05:00",
+        "2026-05-11T10:00:00",
+        "2026-05-11",
+        "yesterday",
+        "",
+        "Z",
+        None,
+        12,
+        ["2026-05-11T10:00:00Z"],
+    ],
+)
+def test_parse_matches_the_plain_parser(timestamp):
+    expected = _reference_parse(timestamp) if isinstance(timestamp, str) else None
+    parsed = timeutils.parse_api_timestamp(timestamp)
+    assert parsed == expected
+    if expected is not None:
+        assert parsed.utcoffset() == expected.utcoffset()
+
+
+@pytest.mark.parametrize(
+    ("zone", "start"),
+    [
+        # Spring forward and fall back.
+        ("Europe/Stockholm", datetime(2026, 3, 28, tzinfo=timezone.utc)),
+        ("Europe/Stockholm", datetime(2026, 10, 24, tzinfo=timezone.utc)),
+        # Half-hour offset: every UTC hour holds two local hours.
+        ("Asia/Kolkata", datetime(2026, 5, 1, tzinfo=timezone.utc)),
+        # Half-hour DST shift.
+        ("Australia/Lord_Howe", datetime(2026, 4, 4, tzinfo=timezone.utc)),
+        ("Australia/Lord_Howe", datetime(2026, 10, 3, tzinfo=timezone.utc)),
+    ],
+)
+def test_local_hour_bucket_matches_plain_conversion_across_transitions(zone, start):
+    local_tz = ZoneInfo(zone)
+    for step in range(3 * 24 * 12):
+        moment = start + timedelta(minutes=5 * step, seconds=step % 7)
+        for hours_back in (0, 1):
+            assert timeutils.local_hour_bucket(
+                moment, local_tz, hours_back
+            ) == _reference_bucket(moment, local_tz, hours_back), (moment, hours_back)
+
+
+@pytest.mark.parametrize("offset", [timedelta(hours=2), timedelta(hours=5, minutes=30)])
+def test_local_hour_bucket_matches_for_offset_timestamps(offset):
+    start = datetime(2026, 10, 24, tzinfo=timezone(offset))
+    for step in range(2 * 24 * 4):
+        moment = start + timedelta(minutes=15 * step)
+        for hours_back in (0, 1):
+            assert timeutils.local_hour_bucket(
+                moment, SWEDEN, hours_back
+            ) == _reference_bucket(moment, SWEDEN, hours_back), (moment, hours_back)
+
+
+def test_local_hour_bucket_of_zoned_datetimes():
+    # Both 02:30 wall-clock times of the autumn fold.
+    first = datetime(2026, 10, 25, 2, 30, tzinfo=SWEDEN)
+    second = first.replace(fold=1)
+    assert timeutils.local_hour_bucket(first, SWEDEN) == datetime(
+        2026, 10, 25, 0, tzinfo=timezone.utc
+    )
+    assert timeutils.local_hour_bucket(second, SWEDEN) == datetime(
+        2026, 10, 25, 1, tzinfo=timezone.utc
+    )
+
+
+def test_to_local_is_memoized_per_instant():
+    moment = datetime(2026, 5, 11, 10, tzinfo=timezone.utc)
+    local = timeutils.to_local(moment, SWEDEN)
+    assert local.isoformat() == "2026-05-11T12:00:00+02:00"
+    # Same instant with another offset: same local value.
+    other = timeutils.to_local(moment.astimezone(timezone(timedelta(hours=5))), SWEDEN)
+    assert other == local and other.tzinfo is SWEDEN
+
+
+def _chunk_rows():
+    # One 31-day chunk of a half-hourly counter in the historical format.
+    t0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    return [
+        (t0 + timedelta(minutes=30 * i)).astimezone(SWEDEN).isoformat(
+            timespec="milliseconds"
+        )
+        for i in range(31 * 48)
+    ]
+
+
+def test_repeated_rows_are_cache_hits():
+    # Read twice like the dashboard tables and readings log do on every
+    # refresh: sort, then bucket.
+    rows = _chunk_rows()
+    timeutils._parse_cached.cache_clear()
+    timeutils._hour_buckets.cache_clear()
+
+    sorted(rows, key=timeutils.api_timestamp_sort_key)
+    for ts in rows:
+        timeutils.local_hour_bucket(timeutils.parse_api_timestamp(ts), SWEDEN, 1)
+
+    parse = timeutils._parse_cached.cache_info()
+    assert (parse.misses, parse.hits) == (len(rows), len(rows))
+    # Each hour of the chunk is computed once, both of its readings reuse it.
+    buckets = timeutils._hour_buckets.cache_info()
+    assert buckets.misses == 31 * 24
+    assert buckets.hits == len(rows) - buckets.misses
+
+
+def _per_row_ns(rows, work):
+    started = time.perf_counter()
+    work(rows)
+    return (time.perf_counter() - started) / len(rows) * 1e9
+
+
+@pytest.mark.skipif(
+    not os.environ.get("MAALERPORTAL_BENCHMARK"),
+    reason="timing benchmark; set MAALERPORTAL_BENCHMARK=1 and run with -s",
+)
+def test_per_row_cost_benchmark():
+    rows = _chunk_rows()
+
+    def reference(timestamps):
+        sorted(timestamps, key=_reference_parse)
+        for ts in timestamps:
+            _reference_bucket(_reference_parse(ts), SWEDEN, 1)
+
+    def memoized(timestamps):
+        sorted(timestamps, key=timeutils.api_timestamp_sort_key)
+        for ts in timestamps:
+            timeutils.local_hour_bucket(
+                timeutils.parse_api_timestamp(ts), SWEDEN, 1
+            )
+
+    baseline = min(_per_row_ns(rows, reference) for _ in range(3))
+    timeutils._parse_cached.cache_clear()
+    timeutils._hour_buckets.cache_clear()
+    cold = _per_row_ns(rows, memoized)
+    warm = min(_per_row_ns(rows, memoized) for _ in range(3))
+    print(
+        f"\nper row: plain {baseline:.0f} ns, memoized cold {cold:.0f} ns, "
+        f"warm {warm:.0f} ns"
+    )
@@ -0,0 +1,86 @@
+"""Unit tests for the incrementally maintained water usage aggregates.
+
+These tests have no Home Assistant dependency and run with plain pytest.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import importlib.util
+from pathlib import Path
+import random
+
+_USAGE_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "maalerportal"
+    / "usage.py"
+)
+_spec = importlib.util.spec_from_file_location("_maalerportal_usage", _USAGE_PATH)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+UsageAggregate = _module.UsageAggregate
+delta_to_liters = _module.delta_to_liters
+
+T0 = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+
+def _hourly(aggregate):
+    return {hour: round(liters, 6) for hour, liters in aggregate.hourly().items()}
+
+
+def test_deltas_are_credited_to_the_later_reading_hour():
+    usage = UsageAggregate()
+    usage.add(T0, "5.000", "m³")
+    usage.add(T0 + timedelta(minutes=90), "5.010", "m³")
+    usage.add(T0 + timedelta(hours=3), 5.025, "m³")
+
+    assert _hourly(usage) == {
+        T0 + timedelta(hours=1): 10.0,
+        T0 + timedelta(hours=3): 15.0,
+    }
+
+
+def test_out_of_order_readings_match_sorted_insertion():
+    readings = [(T0 + timedelta(hours=h), 100 + h * 0.004) for h in range(200)]
+    in_order = UsageAggregate()
+    for moment, value in readings:
+        in_order.add(moment, value, "m3")
+
+    shuffled = readings[:]
+    random.Random(7).shuffle(shuffled)
+    out_of_order = UsageAggregate()
+    for moment, value in shuffled:
+        out_of_order.add(moment, value, "m3")
+
+    assert _hourly(out_of_order) == _hourly(in_order)
+
+
+def test_meter_resets_and_duplicates_add_nothing():
+    usage = UsageAggregate()
+    usage.add(T0, 10.0, "L")
+    usage.add(T0 + timedelta(hours=1), 12.0, "L")
+    usage.add(T0 + timedelta(hours=1), 99.0, "L")
+    usage.add(T0 + timedelta(hours=2), 1.0, "L")
+
+    assert _hourly(usage) == {T0 + timedelta(hours=1): 2.0}
+
+
+def test_window_keeps_only_recent_hours():
+    usage = UsageAggregate(window=timedelta(days=2))
+    for h in range(5 * 24):
+        usage.add(T0 + timedelta(hours=h), h * 0.001, "m³")
+
+    hours = list(usage.hourly())
+    newest = T0 + timedelta(hours=5 * 24 - 1)
+    assert hours[0] == newest - timedelta(days=2)
+    assert len(hours) == 2 * 24 + 1
+    # Late readings from before the window are ignored.
+    usage.add(T0 + timedelta(hours=5, minutes=30), 0.0, "m³")
+    assert list(usage.hourly()) == hours
+
+
+def test_delta_to_liters_only_scales_cubic_meters():
+    assert delta_to_liters(0.5, "m³") == 500
+    assert delta_to_liters(0.5, "M3") == 500
+    assert delta_to_liters(0.5, "kWh") == 0.5